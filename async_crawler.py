@@ -0,0 +1,407 @@
+import asyncio
+import sqlite3
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from curl_cffi.requests import AsyncSession
+import db_schema
+import http_cache
+import crawl_frontier
+import cassettes
+import sync_metrics
+from main import (
+    BASE_URL, TEAM_ID, TEAM_ROSTER_URL, TEAM_MEET_RESULTS_URL, EXTRA_SWIMMERS, DB_PATH,
+    parse_roster, parse_swimmer_meets, parse_meet_results, parse_team_meet_results, parse_splits,
+    BatchWriter, plan_swimmer_meets, queue_missing_splits, result_has_splits,
+)
+
+# Concurrent Swimcloud crawl engine (asyncio + curl_cffi AsyncSession).
+#
+# Same traversal and the same parsers/writers as main.SwimcloudCrawler, but:
+#   - up to `concurrency` requests in flight, paced by a token bucket per host
+#     instead of a fixed sleep after every request;
+#   - HTML is parsed in worker threads and rows are written by a single DB
+#     thread, so parsing and SQLite writes overlap network waits; the DB
+#     thread batches them through main.BatchWriter (one transaction per meet);
+#   - work is leased from the same crawl_tasks frontier, so interrupted crawls
+#     resume and several processes can share a crawl (--resume only drains it).
+#
+# by_meet=True (--by-meet) crawls meet-centric: the distinct meets the
+# swimmers still miss are fetched once each from the team results page and
+# the rows fanned out to swimmers, so requests scale with meets instead of
+# swimmers x meets. Swimmers missing from that page fall back to their own page.
+#
+#   python async_crawler.py [limit] [--concurrency 8] [--rate 3] [--by-meet] [--resume]
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 3.0      # requests/second per host
+DEFAULT_BURST = 3
+# Meets-list tasks leased (and fetched concurrently) per planning round
+PLAN_CHUNK = 50
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, bursts up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """Bounded-concurrency GETs through one impersonating AsyncSession."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST, cache=None, metrics=None):
+        self.session = AsyncSession(impersonate="chrome120", max_clients=concurrency)
+        self.cache = cache
+        self.metrics = metrics
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def _get(self, url, headers):
+        async with self.semaphore:
+            await self._bucket(url).acquire()
+            self.requests += 1
+            # Timed after the semaphore and rate limit, so it is network latency only
+            if self.metrics is not None:
+                with self.metrics.stage("fetch") as obs:
+                    response = await self.session.get(cassettes.route(url), timeout=15, headers=headers)
+                    obs["bytes"] = len(response.content)
+            else:
+                response = await self.session.get(cassettes.route(url), timeout=15, headers=headers)
+            cassettes.record(url, response.status_code, response.headers, response.content)
+            self.bytes += len(response.content)
+            return response.status_code, response.headers, response.content
+
+    async def fetch(self, url):
+        """Page text, or None on error (logged like SwimcloudCrawler.get_page)."""
+        print(f"Navigating to {url}...")
+        try:
+            if self.cache is not None:
+                body = await self.cache.aget(url, self._get)
+            else:
+                status, _, body = await self._get(url, {})
+                if status != 200:
+                    raise http_cache.HttpStatusError(url, status)
+            return body.decode('utf-8', errors='replace')
+        except Exception as e:
+            self.errors += 1
+            print(f"Error loading {url}: {e}")
+            return None
+
+    async def close(self):
+        await self.session.close()
+
+
+class AsyncSwimcloudCrawler:
+    def __init__(self, db_path=DB_PATH, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST, cache=None):
+        self.db_path = db_path
+        self.cache = cache if cache is not None else http_cache.HttpCache()
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        # Every DB call runs on this one thread (sqlite3 connections are not
+        # shared across threads); parsing uses the default thread pool.
+        self.db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="swimcloud-db")
+        self.conn = None
+        self.writer = None
+        self.frontier = None
+        self.frontier_summary = ""
+        self.fetcher = None
+        self.metrics = sync_metrics.SyncRun("swimcloud-async")
+
+    async def _db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.db_thread, fn, self.conn, *args)
+
+    async def _write(self, method, *args):
+        """Calls a BatchWriter / CrawlFrontier method on the DB thread."""
+        return await asyncio.get_running_loop().run_in_executor(self.db_thread, method, *args)
+
+    async def _parse(self, fn, html):
+        return await asyncio.to_thread(self.metrics.timed, "parse", fn, html)
+
+    async def open(self):
+        def connect(_):
+            conn = sqlite3.connect(self.db_path)
+            db_schema.migrate(conn)
+            return conn
+        self.conn = await self._db(connect)
+        self.writer = await self._db(lambda conn: BatchWriter(conn, metrics=self.metrics))
+        self.frontier = await self._db(crawl_frontier.CrawlFrontier)
+        self.fetcher = AsyncFetcher(self.concurrency, self.rate, self.burst, self.cache, self.metrics)
+
+    async def close(self, status="ok", error=None):
+        if self.fetcher:
+            await self.fetcher.close()
+        if self.writer:
+            await self._write(self.writer.flush)
+        if self.frontier:
+            # Unfinished leases go straight back to the queue for the next run
+            await self._write(self.frontier.release)
+            self.frontier_summary = await self._write(self.frontier.summary)
+        if self.conn:
+            await self._db(self.metrics.finish, status, error)
+            await self._db(lambda conn: conn.close())
+        self.db_thread.shutdown()
+        self.cache.close()
+
+    async def crawl_roster(self, limit=None, by_meet=False):
+        print("  > Scraping Men's and Women's Roster...")
+        pages = await asyncio.gather(
+            self.fetcher.fetch(TEAM_ROSTER_URL + "?gender=M"),
+            self.fetcher.fetch(TEAM_ROSTER_URL + "?gender=F"),
+        )
+        unique_swimmers = {}
+        for html in pages:
+            if html is not None:
+                unique_swimmers.update(await self._parse(parse_roster, html))
+        print(f"Found {len(unique_swimmers)} unique swimmers in TOTAL roster.")
+
+        for extra in EXTRA_SWIMMERS:
+            if extra['id'] not in unique_swimmers:
+                unique_swimmers[extra['id']] = extra
+                print(f"Added extra swimmer: {extra['name']}")
+
+        selected = list(unique_swimmers.values())
+        if limit and len(selected) > limit:
+            print(f"Limit of {limit} reached.")
+            selected = selected[:limit]
+
+        for data in selected:
+            await self._write(self.writer.add_swimmer, data)
+        await self._write(self.writer.flush)
+        await self.crawl_swimmers([data['id'] for data in selected], by_meet=by_meet)
+
+    async def crawl_swimmers(self, swimmer_ids, by_meet=False, revisit_after=crawl_frontier.SWIMMER_MEETS_REVISIT):
+        queued = await self._write(self.frontier.add_many, crawl_frontier.SWIMMER_MEETS, [
+            (f"{BASE_URL}/swimmer/{s_id}/meets/", {'swimmer_id': s_id}) for s_id in swimmer_ids
+        ], revisit_after)
+        print(f"Queued {queued} of {len(swimmer_ids)} swimmers (the rest were crawled recently).")
+        await self.run_tasks(by_meet=by_meet)
+
+    async def crawl_swimmer_meets(self, swimmer_id):
+        await self.crawl_swimmers([swimmer_id], revisit_after=0)
+
+    async def run_tasks(self, by_meet=False):
+        """Drains the frontier: meets lists, then result pages and splits."""
+        # 1. Meets lists, fetched concurrently a chunk at a time. Meets are
+        #    registered in lease (roster) order, as the sequential crawler
+        #    does: meets.url keeps the first swimmer's results link.
+        #    Failed lists are retried when due within MAX_RETRY_WAIT, as in _drain.
+        while True:
+            tasks = await self._write(self.frontier.lease, [crawl_frontier.SWIMMER_MEETS], PLAN_CHUNK)
+            if not tasks:
+                wait = await self._write(self.frontier.next_due, [crawl_frontier.SWIMMER_MEETS])
+                if wait is None or wait > crawl_frontier.MAX_RETRY_WAIT:
+                    break
+                await asyncio.sleep(wait)
+                continue
+            meet_lists = await asyncio.gather(*(self._swimmer_meets(t.payload['swimmer_id'], t.url) for t in tasks),
+                                              return_exceptions=True)
+            for task, meets in zip(tasks, meet_lists):
+                if isinstance(meets, Exception):
+                    await self._fail(task, meets)
+                    continue
+                await self._db(plan_swimmer_meets, self.writer, self.frontier, task.payload['swimmer_id'], meets)
+                await self._write(self.frontier.complete, [task])
+
+        # 2. Meet-centric: one team page per distinct meet still queued
+        if by_meet:
+            await self._team_meets()
+
+        # 3. Per-swimmer result pages (and by-meet fallbacks), then their splits
+        await self._drain([crawl_frontier.MEET_RESULTS, crawl_frontier.SPLITS])
+
+    async def _fail(self, task, error):
+        state = await self._write(self.frontier.fail, task, error)
+        print(f"  ! {task.kind} {task.url}: {error} ({'will retry' if state == 'pending' else 'giving up'})")
+
+    async def _drain(self, kinds):
+        """`concurrency` workers leasing one task at a time until none is ready."""
+        handlers = {
+            crawl_frontier.MEET_RESULTS: lambda t: self.process_meet_results(t.payload['meet_id'], t.payload['swimmer_id'], t.url),
+            crawl_frontier.SPLITS: lambda t: self.get_splits(t.url, t.payload['result_id']),
+        }
+        busy = [0]
+
+        async def worker():
+            while True:
+                tasks = await self._write(self.frontier.lease, kinds, 1)
+                if not tasks:
+                    # Busy workers may still queue splits; retries may come due soon
+                    wait = await self._write(self.frontier.next_due, kinds)
+                    if not busy[0] and (wait is None or wait > crawl_frontier.MAX_RETRY_WAIT):
+                        return
+                    await asyncio.sleep(min(wait if wait is not None else 0.2, 1.0))
+                    continue
+                task = tasks[0]
+                busy[0] += 1
+                try:
+                    await handlers[task.kind](task)
+                except Exception as e:
+                    await self._fail(task, e)
+                else:
+                    await self._write(self.frontier.complete, [task])
+                finally:
+                    busy[0] -= 1
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _swimmer_meets(self, swimmer_id, url):
+        html = await self.fetcher.fetch(url)
+        if html is None:
+            raise RuntimeError(f"could not load {url}")
+        meets = await self._parse(parse_swimmer_meets, html)
+        print(f"  - Swimmer {swimmer_id}: found {len(meets)} meet headers.")
+        return meets
+
+    async def process_meet_results(self, meet_id, swimmer_id, url):
+        html = await self.fetcher.fetch(url)
+        if html is None:
+            raise RuntimeError(f"could not load {url}")
+        results = await self._parse(parse_meet_results, html)
+        print(f"  > Processing Meet {meet_id}: {len(results)} events found.")
+
+        for result in results:
+            await self._write(self.writer.add_result, meet_id, swimmer_id, result)
+        # One transaction per meet, then its /times/ pages go to the frontier
+        await self._write(self.writer.flush)
+        await self._db(queue_missing_splits, self.frontier, meet_id, [swimmer_id])
+
+    async def _team_meets(self):
+        tasks = await self._write(self.frontier.lease, [crawl_frontier.MEET_RESULTS], None)
+        by_meet_tasks = {}
+        for task in tasks:
+            by_meet_tasks.setdefault(task.payload['meet_id'], []).append(task)
+        print(f"  > {len(by_meet_tasks)} distinct meets to fetch for {len(tasks)} (meet, swimmer) pairs.")
+        await asyncio.gather(*(self._safe(self.process_team_meet(meet_id, meet_tasks), f"meet {meet_id}")
+                               for meet_id, meet_tasks in by_meet_tasks.items()))
+        # Whatever the team pages did not cover goes back for the per-swimmer pass
+        await self._write(self.frontier.release)
+
+    async def _safe(self, coro, label):
+        # One meet's failure must not cancel the rest of the crawl
+        try:
+            return await coro
+        except Exception as e:
+            print(f"Error processing {label}: {e}")
+            return None
+
+    async def process_team_meet(self, meet_id, tasks):
+        """One team results page for `meet_id`, fanned out to its swimmers' meet_results tasks.
+
+        Completes the tasks of the swimmers the page lists; the others stay
+        leased for the caller to release to the per-swimmer pass.
+        """
+        url = TEAM_MEET_RESULTS_URL.format(base=BASE_URL, meet_id=meet_id, team_id=TEAM_ID)
+        html = await self.fetcher.fetch(url)
+        rows = await self._parse(parse_team_meet_results, html) if html is not None else []
+
+        wanted = [task.payload['swimmer_id'] for task in tasks]
+        by_swimmer = {}
+        for row in rows:
+            if row['swimmer_id'] in wanted:
+                by_swimmer.setdefault(row['swimmer_id'], []).append(row)
+        print(f"  > Meet {meet_id}: {sum(map(len, by_swimmer.values()))} results for "
+              f"{len(by_swimmer)}/{len(wanted)} swimmers from the team page.")
+        if not by_swimmer:
+            return
+
+        # Same write order as the per-swimmer path: swimmer by swimmer, page order
+        for swimmer_id in wanted:
+            for row in by_swimmer.get(swimmer_id, []):
+                await self._write(self.writer.add_result, meet_id, swimmer_id, row)
+        await self._write(self.writer.flush)
+        await self._db(queue_missing_splits, self.frontier, meet_id, list(by_swimmer))
+        await self._write(self.frontier.complete, [t for t in tasks if t.payload['swimmer_id'] in by_swimmer])
+
+    async def get_splits(self, url, result_id):
+        # A retried task may find its splits already stored
+        if await self._db(result_has_splits, result_id):
+            return
+        html = await self.fetcher.fetch(url)
+        if html is None:
+            raise RuntimeError(f"could not load {url}")
+        splits = await self._parse(parse_splits, html)
+        splits_found = await self._write(self.writer.add_splits, result_id, splits)
+        await self._write(self.writer.flush)
+        if splits_found:
+            print(f"    + Saved {splits_found} splits.")
+
+    def summary(self, elapsed):
+        f = self.fetcher
+        rate = f.requests / elapsed if elapsed else 0
+        return (f"{f.requests} requests ({f.errors} errors, {f.bytes / 1e6:.1f} MB) "
+                f"in {elapsed:.1f}s, {rate:.2f} req/s\n{self.writer.summary()}\n"
+                f"{self.frontier_summary}\n{self.cache.summary()}\n{self.metrics.summary()}")
+
+
+async def run(coro_factory, db_path=DB_PATH, **options):
+    """Opens a crawler, awaits coro_factory(crawler), prints a summary."""
+    crawler = AsyncSwimcloudCrawler(db_path, **options)
+    start = time.perf_counter()
+    await crawler.open()
+    status, error = "ok", None
+    try:
+        await coro_factory(crawler)
+    except asyncio.CancelledError:
+        status = "interrupted"
+        raise
+    except Exception as e:
+        status, error = "error", e
+        raise
+    finally:
+        # close() flushes the last batch, so report afterwards
+        await crawler.close(status, error)
+        print(crawler.summary(time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent Swimcloud team crawl.")
+    parser.add_argument("limit", nargs="?", type=int, default=None)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests/second per host")
+    parser.add_argument("--by-meet", action="store_true", help="fetch each meet's team results once (meet-centric)")
+    parser.add_argument("--resume", action="store_true",
+                        help="only drain the queued crawl tasks (skip the roster); also joins a running crawl")
+    parser.add_argument("--max-age", type=float, default=http_cache.DEFAULT_MAX_AGE,
+                        help="seconds a cached page is served without revalidating (0 = always revalidate)")
+    args = parser.parse_args()
+
+    try:
+        if args.resume:
+            crawl = lambda c: c.run_tasks(by_meet=args.by_meet)
+        else:
+            crawl = lambda c: c.crawl_roster(limit=args.limit, by_meet=args.by_meet)
+        asyncio.run(run(crawl, args.db,
+                        concurrency=args.concurrency, rate=args.rate,
+                        cache=http_cache.HttpCache(max_age=args.max_age)))
+    except KeyboardInterrupt:
+        print("\nStopping crawler...")
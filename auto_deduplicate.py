@@ -1,124 +1,186 @@
-import sqlite3
-import pandas as pd
 import os
+import sys
+import time
+import db_schema
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "natacion.db")
 
-def run_deduplicator():
+# Deduplicacion de torneos y resultados, en SQL.
+#
+# Huella de un resultado: (swimmer_id, prueba sin espacios ni mayusculas,
+# tiempo sin espacios). Si una huella aparece bajo dos torneos distintos, el
+# nadador hizo el mismo tiempo en la misma prueba en "dos" torneos: son el
+# mismo torneo guardado con dos IDs (Swimcloud, Fechida, Meet Mobile).
+#
+# plan_dedup() calcula todo con funciones de ventana antes de escribir nada:
+#   temp.dedup_merge  torneo perdedor -> torneo ganador. Los torneos unidos por
+#                     huellas compartidas (tambien en cadena: A~B, B~C) forman
+#                     un grupo y todos van al mejor: primero los "Resultados
+#                     Completos", luego los de Fechida/Meet Mobile (F_, MM_), y
+#                     a igualdad el que tiene el resultado compartido mas antiguo
+#                     (menor id), como antes.
+#   temp.dedup_drop   ids de resultados repetidos exactos (swimmer_id, meet_id ya
+#                     fusionado, event_name, time); sobrevive el menor id.
+# apply_dedup() aplica ambos con tres sentencias en la misma transaccion.
+#
+#   python auto_deduplicate.py [--dry-run] [--db data/natacion.db]
+#
+# bench_dedup.py compara contra el motor anterior (pandas) en una DB sintetica.
+
+
+def _event_key(text):
+    # Igual que pandas .str.strip().str.lower(): no-texto no tiene huella
+    return text.strip().lower() if isinstance(text, str) else None
+
+
+def _time_key(text):
+    return text.strip() if isinstance(text, str) else None
+
+
+def _meet_rank(meet_id, name):
+    """0: 'Resultados Completos', 1: Fechida/Meet Mobile, 2: el resto (Swimcloud)."""
+    if isinstance(name, str) and "resultados completos" in name.lower():
+        return 0
+    if isinstance(meet_id, str) and meet_id.startswith(("F_", "MM_")):
+        return 1
+    return 2
+
+
+def register_functions(conn):
+    conn.create_function("dedup_event", 1, _event_key, deterministic=True)
+    conn.create_function("dedup_time", 1, _time_key, deterministic=True)
+    conn.create_function("dedup_meet_rank", 2, _meet_rank, deterministic=True)
+
+
+_STAGING = '''
+    DROP TABLE IF EXISTS temp.dedup_merge;
+    DROP TABLE IF EXISTS temp.dedup_drop;
+    CREATE TEMP TABLE dedup_merge (loser TEXT PRIMARY KEY, winner TEXT NOT NULL);
+    CREATE TEMP TABLE dedup_drop (id INTEGER PRIMARY KEY)
+'''
+
+_MERGE_MAP = '''
+    INSERT INTO temp.dedup_merge (loser, winner)
+    WITH RECURSIVE
+    keyed AS (
+        SELECT r.id, r.swimmer_id, r.meet_id, dedup_event(r.event_name) AS ev, dedup_time(r.time) AS tm
+        FROM results r JOIN meets m ON m.id = r.meet_id
+        WHERE r.swimmer_id IS NOT NULL
+    ),
+    -- Resultados cuya huella aparece bajo mas de un torneo; lo = menor torneo de la huella
+    shared AS (
+        SELECT id, meet_id, lo FROM (
+            SELECT id, meet_id, MIN(meet_id) OVER w AS lo, MAX(meet_id) OVER w AS hi
+            FROM keyed WHERE ev IS NOT NULL AND tm IS NOT NULL
+            WINDOW w AS (PARTITION BY swimmer_id, ev, tm)
+        ) WHERE lo <> hi
+    ),
+    candidate AS (
+        SELECT s.meet_id AS meet, dedup_meet_rank(m.id, m.name) AS rank, MIN(s.id) AS first_id
+        FROM shared s JOIN meets m ON m.id = s.meet_id
+        GROUP BY s.meet_id
+    ),
+    -- Unir cada torneo con el menor de su huella basta para conectar el grupo
+    link(a, b) AS (
+        SELECT meet_id, lo FROM shared WHERE meet_id <> lo
+        UNION SELECT lo, meet_id FROM shared WHERE meet_id <> lo
+    ),
+    reach(meet, other) AS (
+        SELECT meet, meet FROM candidate
+        UNION SELECT r.meet, l.b FROM reach r JOIN link l ON l.a = r.other
+    ),
+    ranked AS (
+        SELECT r.meet, c.meet AS winner,
+               ROW_NUMBER() OVER (PARTITION BY r.meet ORDER BY c.rank, c.first_id) AS rn
+        FROM reach r JOIN candidate c ON c.meet = r.other
+    )
+    SELECT meet, winner FROM ranked WHERE rn = 1 AND meet <> winner
+'''
+
+# Mismo criterio que el antiguo GROUP BY + DELETE ... WHERE col = ?: las filas
+# con alguna columna NULL nunca se consideraban repetidas
+_DUPLICATES = '''
+    INSERT INTO temp.dedup_drop (id)
+    SELECT id FROM (
+        SELECT r.id, ROW_NUMBER() OVER (
+                   PARTITION BY r.swimmer_id, COALESCE(g.winner, r.meet_id), r.event_name, r.time
+                   ORDER BY r.id) AS rn
+        FROM results r LEFT JOIN temp.dedup_merge g ON g.loser = r.meet_id
+        WHERE r.swimmer_id IS NOT NULL AND r.meet_id IS NOT NULL
+          AND r.event_name IS NOT NULL AND r.time IS NOT NULL
+    ) WHERE rn > 1
+'''
+
+
+def plan_dedup(conn):
+    """Llena temp.dedup_merge y temp.dedup_drop sin tocar los datos. Devuelve (fusiones, repetidos)."""
+    register_functions(conn)
+    for statement in _STAGING.split(';'):
+        conn.execute(statement)
+    conn.execute(_MERGE_MAP)
+    conn.execute(_DUPLICATES)
+    merges = conn.execute("SELECT COUNT(*) FROM temp.dedup_merge").fetchone()[0]
+    dupes = conn.execute("SELECT COUNT(*) FROM temp.dedup_drop").fetchone()[0]
+    return merges, dupes
+
+
+def print_plan(conn):
+    rows = conn.execute('''
+        SELECT g.loser, lm.name, g.winner, wm.name,
+               (SELECT COUNT(*) FROM results WHERE meet_id = g.loser)
+        FROM temp.dedup_merge g
+        JOIN meets lm ON lm.id = g.loser
+        JOIN meets wm ON wm.id = g.winner
+        ORDER BY g.winner, g.loser
+    ''').fetchall()
+    for loser_id, loser_name, winner_id, winner_name, moved in rows:
+        print(f"[MEET MERGE DETECTADO] Transfiriendo del torneo '{loser_id}' al oficial '{winner_id}' "
+              f"debido a huella de tiempos. ({moved} resultados: '{loser_name}' -> '{winner_name}')")
+
+
+def apply_dedup(conn):
+    """Aplica el plan (dentro de la transaccion del llamador). Devuelve (torneos, resultados) borrados."""
+    results_deleted = conn.execute("DELETE FROM results WHERE id IN (SELECT id FROM temp.dedup_drop)").rowcount
+    # Todos los resultados del perdedor, no solo los que hicieron match: el torneo entero es duplicado
+    conn.execute('''
+        UPDATE results SET meet_id = (SELECT winner FROM temp.dedup_merge WHERE loser = results.meet_id)
+        WHERE meet_id IN (SELECT loser FROM temp.dedup_merge)
+    ''')
+    meets_merged = conn.execute("DELETE FROM meets WHERE id IN (SELECT loser FROM temp.dedup_merge)").rowcount
+    return meets_merged, results_deleted
+
+
+def run_deduplicator(dry_run=False):
     print(f"Abriendo DB para deduplicacion: {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
-    
-    # 1. Cargar todos los resultados y torneos
-    results_query = """
-        SELECT r.id as result_id, r.swimmer_id, r.event_name, r.time, r.meet_id, m.name as meet_name, m.date as meet_date
-        FROM results r
-        JOIN meets m ON r.meet_id = m.id
-    """
-    df = pd.read_sql(results_query, conn)
-    
-    if df.empty:
-        print("No hay resultados para deduplicar.")
+    conn = db_schema.connect(DB_PATH)
+    start = time.perf_counter()
+    try:
+        # El plan y su aplicacion ven la misma foto de la DB: nadie escribe entre medio
+        conn.execute("BEGIN" if dry_run else "BEGIN IMMEDIATE")
+        merges, dupes = plan_dedup(conn)
+        planned = time.perf_counter() - start
+        if dry_run:
+            print("\n--- Plan de Limpieza (simulacion, no se modifica la DB) ---")
+        print_plan(conn)
+        if dry_run:
+            conn.rollback()
+            meets_merged, results_deleted = merges, dupes
+        else:
+            meets_merged, results_deleted = apply_dedup(conn)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         conn.close()
-        return {"meets_merged": 0, "results_deleted": 0}
-
-    # Limpiamos el texto del evento por si hay pequeñas diferencias de espacios
-    df['event_norm'] = df['event_name'].str.strip().str.lower()
-    df['time_norm'] = df['time'].str.strip()
-    
-    # 2. Agrupar por (swimmer_id, event_norm, time_norm)
-    # Buscamos grupos que pertenezcan a MÁS DE UN MEET DIFERENTE.
-    groups = df.groupby(['swimmer_id', 'event_norm', 'time_norm'])
-    
-    # Mapeo de meet_id a consolidar: meet_a_eliminar -> meet_destino
-    meet_merges_proposed = set()
-    
-    for (sid, en, tn), group in groups:
-        if len(group) > 1:
-            unique_meets = group['meet_id'].unique()
-            if len(unique_meets) > 1:
-                # ¡Hemos encontrado un match matemático! El nadador hizo el mismo tiempo en la misma prueba
-                # pero está guardado bajo dos (o más) IDs de torneo distintos.
-                # Asumimos que son el mismo torneo si los dates son parecidos o simplemente porque es un match.
-                
-                # Coleccionamos los nombres de los torneos para resolver quién gana.
-                these_meets = group[['meet_id', 'meet_name']].drop_duplicates()
-                
-                meet_list = these_meets.to_dict('records')
-                
-                # Lógica para elegir "Ganador"
-                # Regla 1: Torneos que empiezan con "Resultados Completos" ganan.
-                # Regla 2: El torneo que NO tenga ID numerico crudo (Swimcloud)
-                
-                winner = None
-                for m in meet_list:
-                    if "resultados completos" in m['meet_name'].lower():
-                        winner = m
-                        break
-                
-                # Si ninguno dice "resultados completos", gana el de Fechida (empieza con F_ o MM_)
-                if not winner:
-                    for m in meet_list:
-                        if m['meet_id'].startswith("F_") or m['meet_id'].startswith("MM_"):
-                            winner = m
-                            break
-                            
-                # Si sigue sin haber ganador, elegimos el primero
-                if not winner:
-                    winner = meet_list[0]
-                    
-                winner_id = winner['meet_id']
-                
-                current_merges = [(m['meet_id'], winner_id) for m in meet_list if m['meet_id'] != winner_id]
-                for cm in current_merges:
-                    meet_merges_proposed.add(cm)
-
-    # 3. Aplicar las fusiones de torneos a nivel global
-    c = conn.cursor()
-    merged_meets_count = 0
-    meet_drops = set()
-    
-    for loser_id, winner_id in meet_merges_proposed:
-        if loser_id == winner_id:
-            continue
-            
-        print(f"[MEET MERGE DETECTADO] Transfiriendo del torneo '{loser_id}' al oficial '{winner_id}' debido a huella de tiempos.")
-        
-        # Actualizamos TODOS los resultados (no solo el que hizo match, asumimos que si hizo match, el TORNEO entero es duplicado)
-        c.execute("UPDATE results SET meet_id = ? WHERE meet_id = ?", (winner_id, loser_id))
-        
-        # Eliminamos el torneo perdedor
-        c.execute("DELETE FROM meets WHERE id = ?", (loser_id,))
-        merged_meets_count += 1
-        meet_drops.add(loser_id)
-
-    # 4. Ahora que todos están en el mismo torneo (el ganador), DEDUPLICAR filas exactas en `results`
-    # Porque si fusionamos los torneos, el nadador quedó con el mismo evento y tiempo 2 veces dentro del MISMO torneo.
-    print("\nBuscando filas duplicadas exactas dentro de los resultados consolidados...")
-    # Buscamos registros donde (swimmer_id, meet_id, event_name, time) se repitan.
-    c.execute("""
-        SELECT MIN(id), swimmer_id, meet_id, event_name, time
-        FROM results
-        GROUP BY swimmer_id, meet_id, event_name, time
-        HAVING COUNT(*) > 1
-    """)
-    dupes_groups = c.fetchall()
-    
-    results_deleted = 0
-    for min_id, sid, mid, en, tn in dupes_groups:
-        # Dejar MIN(id) vivo, y borrar los demás que tengan exacta misma combinación
-        c.execute("""
-            DELETE FROM results 
-            WHERE swimmer_id = ? AND meet_id = ? AND event_name = ? AND time = ? AND id != ?
-        """, (sid, mid, en, tn, min_id))
-        results_deleted += c.rowcount
-
-    conn.commit()
-    conn.close()
-    
-    print(f"\n--- Resumen de Limpieza ---")
-    print(f"Torneos fusionados/eliminados: {merged_meets_count}")
+
+    print(f"\n--- Resumen de Limpieza{' (simulacion)' if dry_run else ''} ---")
+    print(f"Torneos fusionados/eliminados: {meets_merged}")
     print(f"Resultados idénticos repetidos eliminados: {results_deleted}")
-    return {"meets_merged": merged_meets_count, "results_deleted": results_deleted}
+    print(f"Tiempo: plan {planned:.2f}s, total {time.perf_counter() - start:.2f}s")
+    return {"meets_merged": meets_merged, "results_deleted": results_deleted, "dry_run": dry_run}
 
 if __name__ == "__main__":
-    run_deduplicator()
+    if "--db" in sys.argv:
+        DB_PATH = sys.argv[sys.argv.index("--db") + 1]
+    run_deduplicator(dry_run="--dry-run" in sys.argv)
@@ -1,6 +1,7 @@
 import sqlite3
-import time
-from main import SwimcloudCrawler
+import sys
+import asyncio
+import async_crawler
 
 DB_PATH = 'data/natacion.db'
 
@@ -15,32 +16,19 @@ def get_swimcloud_swimmers():
     conn.close()
     return rows
 
-def backfill():
+def backfill(by_meet=False):
     swimmers = get_swimcloud_swimmers()
     print(f"Found {len(swimmers)} swimmers eligible for Swimcloud backfill.")
-    
-    crawler = SwimcloudCrawler()
-    
-    # We want to be careful not to crash, so we'll wrap in try/except block in loop
-    count = 0
-    for s_id, s_name in swimmers:
-        count += 1
-        print(f"\n[{count}/{len(swimmers)}] Processing: {s_name} ({s_id})")
-        
-        try:
-            # crawl_swimmer_meets is the method in main.py that:
-            # 1. Goes to profile
-            # 2. Lists meets
-            # 3. If meet missing in DB, scrapes it
-            crawler.crawl_swimmer_meets(s_id)
-        except Exception as e:
-            print(f"Error processing {s_name}: {e}")
-            # Try to recover driver if needed? 
-            # Usually SwimcloudCrawler handles some errors, but let's be safe.
-            time.sleep(2)
-            
-    crawler.close()
+
+    # For each swimmer: list meets, scrape the ones missing in the DB.
+    # Swimmers are crawled concurrently (see async_crawler.py) from the
+    # crawl_tasks frontier: failed pages are retried with backoff and an
+    # interrupted backfill resumes where it stopped when run again.
+    # --by-meet fetches each missing meet once for the whole team instead of
+    # once per swimmer.
+    ids = [s_id for s_id, _ in swimmers]
+    asyncio.run(async_crawler.run(lambda crawler: crawler.crawl_swimmers(ids, by_meet=by_meet), DB_PATH))
     print("\nBackfill Complete.")
 
 if __name__ == "__main__":
-    backfill()
+    backfill(by_meet="--by-meet" in sys.argv[1:])
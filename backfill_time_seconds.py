@@ -0,0 +1,15 @@
+import db_schema
+
+# Fills results.time_seconds/time_status for rows written by older scripts
+# that still insert only the text `time` column. Migration 003 already did the
+# full backfill once; this only touches rows with no status yet.
+
+def run():
+    conn = db_schema.connect()
+    count = db_schema.backfill_time_seconds(conn, only_missing=True)
+    conn.commit()
+    conn.close()
+    print(f"Backfilled time_seconds for {count} results.")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,183 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import pandas as pd
+import auto_deduplicate
+import db_schema
+
+# Checks auto_deduplicate's SQL engine against the pandas engine it replaced
+# (kept below as legacy_deduplicate) on a synthetic DB, and times both.
+#
+# The DB has `results` rows spread over meets of the three id styles
+# (Swimcloud numbers, F_, MM_), plus:
+#   - shadow meets: another id for an existing meet holding a copy of part of
+#     its results, some with the event name re-cased / padded and the time
+#     padded (what the engines must merge);
+#   - exact repeats of existing rows (what the purge must delete).
+# Each shadow copies a single meet, so the legacy engine's merge order cannot
+# matter and both engines must leave identical `results` and `meets`.
+#
+#   python bench_dedup.py [--results 1000000] [--db /tmp/dedup_bench.db] [--no-legacy]
+#
+# The synthetic DB is built once at --db and reused (copied) for each engine.
+
+EVENTS = [f"{d} {s}" for d in ("50", "100", "200", "400", "800", "1500")
+          for s in ("Libre", "Espalda", "Pecho", "Mariposa", "Combinado")]
+SHADOW_SHARE = 0.05
+SHADOW_COPY = 0.6
+REPEAT_SHARE = 0.01
+RESULTS_PER_MEET = 500
+RESULTS_PER_SWIMMER = 20
+
+
+def _meet_id(i):
+    return (str(100000 + i), f"F_{i}", f"MM_{i}")[i % 3]
+
+
+def _time_text(rng):
+    t = rng.uniform(25, 1200)
+    return f"{int(t // 60)}:{t % 60:05.2f}" if t >= 60 else f"{t:.2f}"
+
+
+def build_db(path, n_results, seed=0):
+    rng = random.Random(seed)
+    for sfx in ("", "-wal", "-shm"):
+        if os.path.exists(path + sfx):
+            os.remove(path + sfx)
+    conn = db_schema.connect(path)
+    n_meets = max(10, n_results // RESULTS_PER_MEET)
+    n_swimmers = max(10, n_results // RESULTS_PER_SWIMMER)
+    meets = [(_meet_id(i), f"Torneo {i}", f"2024-{i % 12 + 1:02d}-01") for i in range(n_meets)]
+
+    rows = []
+    for i in range(int(n_results / (1 + SHADOW_SHARE * SHADOW_COPY + REPEAT_SHARE))):
+        rows.append((f"S{rng.randrange(n_swimmers)}", meets[rng.randrange(n_meets)][0], rng.choice(EVENTS), _time_text(rng)))
+    by_meet = {}
+    for row in rows:
+        by_meet.setdefault(row[1], []).append(row)
+
+    shadows = []
+    for k, (mid, name, date) in enumerate(rng.sample(meets, int(n_meets * SHADOW_SHARE))):
+        # Shadows of Swimcloud meets carry the official Fechida name
+        shadow_id = f"F_R{k}" if mid[0].isdigit() else str(900000 + k)
+        shadow_name = f"Resultados Completos {name}" if mid[0].isdigit() and k % 2 else f"{name} (copia)"
+        shadows.append((shadow_id, shadow_name, date))
+        for swimmer, _, event, time_text in by_meet.get(mid, []):
+            if rng.random() < SHADOW_COPY:
+                kind = rng.random()
+                if kind < 0.2:
+                    event = event.upper()
+                elif kind < 0.3:
+                    event, time_text = f" {event} ", f"{time_text} "
+                rows.append((swimmer, shadow_id, event, time_text))
+    rows += rng.sample(rows, int(len(rows) * REPEAT_SHARE))
+
+    conn.executemany("INSERT INTO meets (id, name, date) VALUES (?, ?, ?)", meets + shadows)
+    conn.executemany("INSERT INTO results (swimmer_id, meet_id, event_name, time) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return len(rows), len(meets) + len(shadows), len(shadows)
+
+
+def legacy_deduplicate(conn):
+    """auto_deduplicate.run_deduplicator as it was: pandas groupby + one statement per merge/group."""
+    df = pd.read_sql("""
+        SELECT r.id as result_id, r.swimmer_id, r.event_name, r.time, r.meet_id, m.name as meet_name, m.date as meet_date
+        FROM results r
+        JOIN meets m ON r.meet_id = m.id
+    """, conn)
+    if df.empty:
+        return {"meets_merged": 0, "results_deleted": 0}
+    df['event_norm'] = df['event_name'].str.strip().str.lower()
+    df['time_norm'] = df['time'].str.strip()
+    meet_merges_proposed = set()
+    for (sid, en, tn), group in df.groupby(['swimmer_id', 'event_norm', 'time_norm']):
+        if len(group) > 1 and len(group['meet_id'].unique()) > 1:
+            meet_list = group[['meet_id', 'meet_name']].drop_duplicates().to_dict('records')
+            winner = next((m for m in meet_list if "resultados completos" in m['meet_name'].lower()), None)
+            if not winner:
+                winner = next((m for m in meet_list if m['meet_id'].startswith("F_") or m['meet_id'].startswith("MM_")), None)
+            if not winner:
+                winner = meet_list[0]
+            for m in meet_list:
+                if m['meet_id'] != winner['meet_id']:
+                    meet_merges_proposed.add((m['meet_id'], winner['meet_id']))
+
+    c = conn.cursor()
+    merged_meets_count = 0
+    for loser_id, winner_id in meet_merges_proposed:
+        c.execute("UPDATE results SET meet_id = ? WHERE meet_id = ?", (winner_id, loser_id))
+        c.execute("DELETE FROM meets WHERE id = ?", (loser_id,))
+        merged_meets_count += 1
+    c.execute("""
+        SELECT MIN(id), swimmer_id, meet_id, event_name, time
+        FROM results
+        GROUP BY swimmer_id, meet_id, event_name, time
+        HAVING COUNT(*) > 1
+    """)
+    results_deleted = 0
+    for min_id, sid, mid, en, tn in c.fetchall():
+        c.execute("""
+            DELETE FROM results
+            WHERE swimmer_id = ? AND meet_id = ? AND event_name = ? AND time = ? AND id != ?
+        """, (sid, mid, en, tn, min_id))
+        results_deleted += c.rowcount
+    conn.commit()
+    return {"meets_merged": merged_meets_count, "results_deleted": results_deleted}
+
+
+def new_deduplicate(db_path):
+    auto_deduplicate.DB_PATH = db_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        return auto_deduplicate.run_deduplicator()
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    state = (conn.execute("SELECT id, meet_id FROM results ORDER BY id").fetchall(),
+             conn.execute("SELECT id FROM meets ORDER BY id").fetchall())
+    conn.close()
+    return state
+
+
+def run(opts):
+    if not os.path.exists(opts.db) or opts.rebuild:
+        start = time.perf_counter()
+        n_rows, n_meets, n_shadows = build_db(opts.db, opts.results)
+        print(f"Built {opts.db}: {n_rows} results, {n_meets} meets ({n_shadows} shadows) "
+              f"in {time.perf_counter() - start:.1f}s")
+    workdir = tempfile.mkdtemp(prefix="bench_dedup_")
+    try:
+        engines = [("sql", new_deduplicate)]
+        if opts.legacy:
+            engines.insert(0, ("legacy", lambda path: legacy_deduplicate(db_schema.connect(path))))
+        states = {}
+        print(f"  {'engine':>7} {'seconds':>8} {'merged':>7} {'deleted':>8}")
+        for name, engine in engines:
+            path = os.path.join(workdir, f"{name}.db")
+            shutil.copyfile(opts.db, path)
+            start = time.perf_counter()
+            result = engine(path)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:>7} {elapsed:8.2f} {result['meets_merged']:>7} {result['results_deleted']:>8}")
+            states[name] = snapshot(path)
+        if len(states) == 2:
+            print("  same results/meets as legacy" if states["legacy"] == states["sql"]
+                  else "  ! results/meets differ from legacy")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "dedup_bench.db"))
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the synthetic DB even if it exists")
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="time the SQL engine only")
+    run(parser.parse_args())
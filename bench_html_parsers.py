@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import html_backends
+import main
+
+# Parses every page in fixtures/swimcloud/ with each installed html_backends
+# backend, asserts they all extract the same records as the original bs4 +
+# html.parser path, and reports the per-page parse time. The fixtures are
+# hand-built in Swimcloud's markup and hold only what the parsers read (no site
+# header/footer or inline scripts), so real pages parse slower; drop real saved
+# pages (same file name prefixes) next to them to validate a backend before
+# making it the default.
+# The page kind comes from the file name prefix (see PARSERS).
+#
+#   python bench_html_parsers.py [repeats]   (default 20)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "swimcloud")
+PARSERS = [
+    ("team_meet_results_", main.parse_team_meet_results),
+    ("swimmer_meets_", main.parse_swimmer_meets),
+    ("meet_results_", main.parse_meet_results),
+    ("roster_", main.parse_roster),
+    ("times_", main.parse_splits),
+]
+
+
+def parser_for(filename):
+    for prefix, fn in PARSERS:
+        if filename.startswith(prefix):
+            return fn
+    return None
+
+
+def timed(fn, html, backend, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn(html, backend=backend)
+    return out, (time.perf_counter() - start) / repeats
+
+
+def run(repeats=20):
+    backends = list(html_backends.BACKENDS)
+    pages = sorted(f for f in os.listdir(FIXTURES) if f.endswith(".html") and parser_for(f))
+    print(f"{len(pages)} pages x {repeats} repeats, backends: {', '.join(backends)} "
+          f"(default: {html_backends.DEFAULT_BACKEND})")
+    print(f"  {'page':<34} {'records':>7}" + "".join(f" {b + ' ms':>14}" for b in backends))
+
+    totals = dict.fromkeys(backends, 0.0)
+    for page in pages:
+        with open(os.path.join(FIXTURES, page), encoding="utf-8") as f:
+            html = f.read()
+        fn = parser_for(page)
+        reference = None
+        cells = []
+        for backend in backends:
+            records, elapsed = timed(fn, html, backend, repeats)
+            if reference is None:
+                reference = records
+            assert records == reference, f"{page}: {backend} records differ from {backends[0]}"
+            totals[backend] += elapsed
+            cells.append(f" {elapsed * 1000:14.2f}")
+        assert reference, f"{page}: no records extracted"
+        print(f"  {page:<34} {len(reference):>7}" + "".join(cells))
+
+    base = totals[backends[0]]
+    print(f"  {'total':<34} {'':>7}" + "".join(f" {t * 1000:14.2f}" for t in totals.values()))
+    print("  speedup vs " + backends[0] + ": " + ", ".join(f"{b} x{base / t:.1f}" for b, t in totals.items() if b != backends[0]))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,162 @@
+import random
+import sys
+import time
+import unicodedata
+from fuzzywuzzy import fuzz
+import name_matcher
+
+# Checks name_matcher.NameMatcher against the full roster scans it replaced
+# (scraper_fechida_pdf: SequenceMatcher > 0.75 with the birth-year check;
+# sync_meet_mobile: extractOne token_set_ratio >= 90) on a synthetic roster,
+# then times both as the roster grows. Queries are roster names the way the
+# sources print them ("SURNAME, Name", no accents, typos, a dropped second
+# surname, another birth year, compound given names merged or split: "Ana
+# María" / "Anamaría") plus names that are not on the roster.
+#
+#   python bench_name_matcher.py [queries] [roster sizes]   (default 300 1000,5000,20000)
+
+GIVEN = ["María", "José", "Juan", "Sofía", "Martina", "Benjamín", "Vicente", "Agustín", "Florencia", "Isidora",
+         "Tomás", "Matías", "Catalina", "Antonia", "Valentina", "Joaquín", "Amanda", "Josefa", "Ignacio", "Lucas",
+         "Emilia", "Trinidad", "Maximiliano", "Fernanda", "Cristóbal", "Javiera", "Sebastián", "Renata", "Gaspar",
+         "Constanza", "Baltazar", "Lourdes", "Francisca", "Diego", "Camila", "Pedro", "Gabriela", "Andrés"]
+SURNAMES = ["González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez", "Sepúlveda",
+            "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya", "Flores", "Espinoza",
+            "Valenzuela", "Castillo", "Ramírez", "Reyes", "Gutiérrez", "Castro", "Vargas", "Álvarez", "Vásquez",
+            "Tapia", "Fernández", "Sánchez", "Carrasco", "Gómez", "Cortés", "Herrera", "Núñez", "Jara", "Vergara",
+            "Rivera", "Figueroa", "Acuña", "Aguirre", "Amaro", "Bravo", "Cáceres", "Zúñiga", "Villalobos", "Olivares"]
+CURRENT_YEAR = name_matcher.NameMatcher().current_year
+
+
+def synthetic_roster(size, seed=0):
+    rng = random.Random(seed)
+    roster = []
+    for i in range(size):
+        given = rng.choice(GIVEN) + (f" {rng.choice(GIVEN)}" if rng.random() < 0.3 else "")
+        if " " in given and rng.random() < 0.2:
+            given = given.replace(" ", "").capitalize()
+        name = f"{given} {rng.choice(SURNAMES)} {rng.choice(SURNAMES)}"
+        birth = None if rng.random() < 0.4 else f"{rng.randint(1960, 2018)}-{rng.randint(1, 12):02d}-01"
+        roster.append((f"S{i}", name, birth))
+    return roster
+
+
+def _strip_accents(text):
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ascii")
+
+
+def _typo(text, rng):
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + rng.choice("aeiourslnz") + text[i + 1:]
+
+
+def _merge_or_split(tokens, rng):
+    # "Ana María Pérez" <-> "Anamaría Pérez": the token blocks no longer line up
+    if len(tokens) > 3:
+        return [tokens[0] + tokens[1].lower()] + tokens[2:]
+    first = tokens[0]
+    cut = rng.randrange(2, len(first) - 1) if len(first) > 4 else None
+    return [first[:cut], first[cut:].capitalize()] + tokens[1:] if cut else tokens
+
+
+def synthetic_queries(roster, count, seed=1):
+    """(display name, 'SURNAME, Name' as in the PDFs, reported age or None)."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        sid, name, birth = rng.choice(roster)
+        if rng.random() < 0.15:
+            name = f"{rng.choice(GIVEN)} {rng.choice(SURNAMES)}"
+        tokens = name.split()
+        kind = rng.random()
+        if kind < 0.3:
+            tokens = [_strip_accents(t) for t in tokens]
+        elif kind < 0.5:
+            j = rng.randrange(len(tokens))
+            tokens[j] = _typo(tokens[j], rng)
+        elif kind < 0.6:
+            tokens = tokens[:-1]
+        elif kind < 0.7:
+            tokens = _merge_or_split(tokens, rng)
+        given, surnames = " ".join(tokens[:-2] or tokens[:1]), " ".join(tokens[-2:] if len(tokens) > 2 else tokens[1:])
+        age = None
+        if birth and rng.random() < 0.8:
+            age = CURRENT_YEAR - int(birth[:4]) + rng.choice([0, 0, 0, 1, -1, 3, 4, 6])
+        queries.append((f"{given} {surnames}", f"{surnames.upper()}, {given}", age))
+    return queries
+
+
+def fechida_scan(roster, formatted_name, age):
+    """scraper_fechida_pdf's former loop over every swimmer."""
+    best_id, best_score = None, 0
+    for sid, sname, sbirth in roster:
+        score = name_matcher.sequence_ratio(formatted_name.lower(), sname.lower())
+        if score > 0.75:
+            plausible = True
+            year = name_matcher.birth_year(sbirth)
+            if age is not None and year is not None and abs(CURRENT_YEAR - year - age) > 3:
+                plausible = False
+            if plausible and score > best_score:
+                best_id, best_score = sid, score
+    return best_id if best_score > 0.75 else None
+
+
+def meet_mobile_scan(names, ids, s_name):
+    """sync_meet_mobile's former process.extractOne over every local name."""
+    best, score = None, -1
+    for name, sid in zip(names, ids):
+        s = fuzz.token_set_ratio(s_name, name)
+        if s > score:
+            best, score = sid, s
+    return best if score >= 90 else None
+
+
+def format_fechida_name(raw):
+    # Same as scraper_fechida_pdf.format_fechida_name (not imported: pdfplumber)
+    surname, _, given = raw.partition(",")
+    return f"{given.strip()} {surname.strip()}".title()
+
+
+def run(count=300, sizes=(1000, 5000, 20000)):
+    print(f"{count} queries per roster size")
+    print(f"  {'roster':>7} {'scan s':>8} {'matcher s':>10} {'speedup':>8} {'scored/query':>13} {'diff':>5}  source")
+    for size in sizes:
+        roster = synthetic_roster(size)
+        queries = synthetic_queries(roster, count)
+
+        start = time.perf_counter()
+        expected = [fechida_scan(roster, format_fechida_name(raw), age) for _, raw, age in queries]
+        t_scan = time.perf_counter() - start
+        start = time.perf_counter()
+        matcher = name_matcher.NameMatcher(((sid, n.lower(), b) for sid, n, b in roster), min_score=0.75)
+        got = []
+        for _, raw, age in queries:
+            sid, score = matcher.match(format_fechida_name(raw).lower(), age)
+            got.append(sid if score > 0.75 else None)
+        t_match = time.perf_counter() - start
+        diff = sum(a != b for a, b in zip(expected, got))
+        print(f"  {size:>7} {t_scan:8.2f} {t_match:10.2f} {t_scan / t_match:7.1f}x "
+              f"{matcher.stats['scored'] / count:13.1f} {diff:>5}  fechida")
+
+        names, ids = [n for _, n, _ in roster], [sid for sid, _, _ in roster]
+        start = time.perf_counter()
+        expected = [meet_mobile_scan(names, ids, name) for name, _, _ in queries]
+        t_scan = time.perf_counter() - start
+        start = time.perf_counter()
+        matcher = name_matcher.NameMatcher(((sid, n, None) for sid, n, _ in roster),
+                                           scorer=fuzz.token_set_ratio, min_score=90)
+        got = []
+        for name, _, _ in queries:
+            sid, score = matcher.match(name)
+            got.append(sid if score >= 90 else None)
+        t_match = time.perf_counter() - start
+        diff = sum(a != b for a, b in zip(expected, got))
+        print(f"  {size:>7} {t_scan:8.2f} {t_match:10.2f} {t_scan / t_match:7.1f}x "
+              f"{matcher.stats['scored'] / count:13.1f} {diff:>5}  meet_mobile")
+        if diff:
+            print("  ! decisions differ from the full scan")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    sizes = tuple(int(n) for n in sys.argv[2].split(",")) if len(sys.argv) > 2 else (1000, 5000, 20000)
+    run(count, sizes)
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import async_crawler
+import cassettes
+import db_schema
+import http_cache
+import main
+
+# End-to-end sync benchmark over recorded HTTP traffic (see cassettes.py).
+#
+# `record` runs the syncs live once, capturing every response into a cassette.
+# `replay` (the default) serves that cassette from a local ReplayServer with the
+# given latency and runs each sync on a fresh copy of the base DB (default: an
+# empty schema, i.e. a full sync) with a cold HTTP cache, reporting wall-clock
+# time, requests served and rows written per table.
+#
+#   python bench_sync.py record [--cassette data/cassettes/sync.db] [--jobs swimcloud-async,fechida]
+#   python bench_sync.py [replay] [--latency 0.1] [--jitter 0.05] [--no-pacing] [--base-db data/natacion.db]
+#
+# Pacing (the sequential crawler's sleeps, the async crawler's --rate) is kept
+# by default so the numbers match a real sync; --no-pacing measures the code alone.
+
+TABLES = ("swimmers", "meets", "results", "splits")
+
+
+def _swimcloud(db_path, cache, opts):
+    crawler = main.SwimcloudCrawler(db_path, cache=cache)
+    if not opts.pacing:
+        crawler.pace = None
+    try:
+        crawler.crawl_roster(limit=opts.limit)
+    finally:
+        crawler.close()
+
+
+def _swimcloud_async(by_meet):
+    def job(db_path, cache, opts):
+        rate = opts.rate if opts.pacing else 1e6
+        asyncio.run(async_crawler.run(lambda c: c.crawl_roster(limit=opts.limit, by_meet=by_meet), db_path,
+                                      concurrency=opts.concurrency, rate=rate, burst=opts.concurrency, cache=cache))
+    return job
+
+
+# Imported per job: pdfplumber / fuzzywuzzy are only needed by these syncs
+def _fechida(db_path, cache, opts):
+    import scraper_fechida_pdf
+    scraper_fechida_pdf.DB_PATH = db_path
+    scraper_fechida_pdf.scrape_fechida(cache=cache)
+
+
+def _enrich_pools(db_path, cache, opts):
+    # Needs Meet Mobile meets in the base DB (--base-db)
+    import enrich_pools
+    enrich_pools.enrich_pools(db_path, cache=cache)
+
+
+JOBS = {
+    "swimcloud": _swimcloud,
+    "swimcloud-async": _swimcloud_async(False),
+    "swimcloud-by-meet": _swimcloud_async(True),
+    "fechida": _fechida,
+    "enrich-pools": _enrich_pools,
+}
+DEFAULT_JOBS = "swimcloud,swimcloud-async,swimcloud-by-meet,fechida"
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in TABLES}
+    finally:
+        conn.close()
+
+
+def prepare_db(workdir, base_db):
+    path = os.path.join(workdir, "bench.db")
+    if base_db:
+        shutil.copyfile(base_db, path)
+    db_schema.connect(path).close()
+    return path
+
+
+def run_job(name, opts, workdir):
+    db_path = prepare_db(workdir, opts.base_db)
+    cache = http_cache.HttpCache(os.path.join(workdir, f"cache_{name}.db"))
+    before = table_counts(db_path)
+    out = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    try:
+        with contextlib.nullcontext() if opts.verbose else contextlib.redirect_stdout(out):
+            JOBS[name](db_path, cache, opts)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    after = table_counts(db_path)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    return elapsed, {t: after[t] - before[t] for t in TABLES}, error
+
+
+def report_row(name, elapsed, requests, misses, rows, error):
+    cells = "".join(f" {rows[t]:>8}" for t in TABLES)
+    line = f"  {name:<18} {elapsed:8.2f} {requests:>8} {misses:>6} {sum(rows.values()):>8}{cells}"
+    print(line + (f"  ! {error}" if error else ""))
+
+
+def run(opts):
+    jobs = [j.strip() for j in opts.jobs.split(",") if j.strip()]
+    unknown = [j for j in jobs if j not in JOBS]
+    if unknown:
+        raise SystemExit(f"Unknown jobs: {', '.join(unknown)} (available: {', '.join(JOBS)})")
+
+    server = None
+    if opts.mode == "record":
+        cassettes.use("record", opts.cassette)
+        store = cassettes.CassetteStore(opts.cassette)
+        print(f"Recording live traffic into {opts.cassette}")
+    else:
+        if not os.path.exists(opts.cassette):
+            raise SystemExit(f"No cassette at {opts.cassette}; run `python bench_sync.py record` first")
+        server = cassettes.ReplayServer(opts.cassette, latency=opts.latency, jitter=opts.jitter)
+        cassettes.use("replay", server.start())
+        print(f"Replaying {opts.cassette} from {server.url}, latency {opts.latency * 1000:.0f}"
+              f"+{opts.jitter * 1000:.0f} ms, pacing {'on' if opts.pacing else 'off'}, "
+              f"base DB {opts.base_db or '(empty)'}")
+
+    print(f"  {'job':<18} {'wall s':>8} {'requests':>8} {'misses':>6} {'rows':>8}" + "".join(f" {t:>8}" for t in TABLES))
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_sync_") as workdir:
+            for name in jobs:
+                if server is not None:
+                    server.reset_stats()
+                    elapsed, rows, error = run_job(name, opts, workdir)
+                    requests, misses = server.stats["requests"], server.stats["misses"]
+                else:
+                    recorded = store.stats()["responses"]
+                    elapsed, rows, error = run_job(name, opts, workdir)
+                    requests, misses = store.stats()["responses"] - recorded, 0
+                report_row(name, elapsed, requests, misses, rows, error)
+    finally:
+        cassettes.use(None)
+        if server is not None:
+            server.stop()
+        else:
+            store.close()
+    if opts.mode == "record":
+        print("  (requests = new responses recorded)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end sync benchmark over recorded HTTP traffic.")
+    parser.add_argument("mode", nargs="?", choices=("replay", "record"), default="replay")
+    parser.add_argument("--cassette", default=cassettes.DEFAULT_CASSETTE)
+    parser.add_argument("--jobs", default=DEFAULT_JOBS, help=f"comma-separated, from: {', '.join(JOBS)}")
+    parser.add_argument("--base-db", default=None, help="DB each job starts from (default: empty schema)")
+    parser.add_argument("--limit", type=int, default=None, help="swimmers per Swimcloud crawl")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds added to every replayed response")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra random latency, 0..jitter seconds")
+    parser.add_argument("--concurrency", type=int, default=async_crawler.DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=async_crawler.DEFAULT_RATE, help="async crawler requests/second per host")
+    parser.add_argument("--no-pacing", dest="pacing", action="store_false",
+                        help="drop crawler politeness delays and rate limits")
+    parser.add_argument("--verbose", action="store_true", help="show the crawlers' own output")
+    run(parser.parse_args())
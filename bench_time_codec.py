@@ -0,0 +1,56 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+import time_codec
+
+# Micro-benchmark: element-wise .apply() vs the vectorized time_codec helpers
+# on a synthetic column shaped like results.time (mostly M:SS.hh, some SS.hh,
+# Fechida commas, H:MM:SS and status codes). Also checks both paths agree.
+#
+#   python bench_time_codec.py [rows]   (default 1,000,000)
+
+def synthetic_times(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    secs = rng.uniform(22.0, 1300.0, rows).round(2)
+    text = pd.Series(time_codec.format_seconds_series(secs), dtype=object)
+    short = secs < 60
+    text[short] = pd.Series(secs[short]).map("{:.2f}".format).to_numpy()
+    kind = rng.random(rows)
+    commas = kind < 0.10
+    text[commas] = text[commas].str.replace(".", ",", regex=False)
+    hours = (kind >= 0.10) & (kind < 0.11)
+    text[hours] = "1:0" + text[hours]
+    codes = kind >= 0.97
+    text[codes] = rng.choice(sorted(time_codec.STATUS_CODES), codes.sum())
+    return text
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f}s")
+    return out, elapsed
+
+
+def run(rows=1_000_000):
+    times = synthetic_times(rows)
+    print(f"{rows:,} rows")
+
+    print("parse")
+    scalar, t_scalar = timed(".apply(parse_time)", lambda: times.apply(time_codec.parse_time).astype("float64"))
+    vector, t_vector = timed("parse_time_series", lambda: time_codec.parse_time_series(times))
+    assert np.allclose(scalar.to_numpy(), vector.to_numpy(), equal_nan=True), "parse mismatch"
+    print(f"  speedup x{t_scalar / t_vector:.1f}")
+
+    print("format")
+    valid = vector.dropna()
+    scalar, t_scalar = timed(".apply(format_seconds)", lambda: valid.apply(time_codec.format_seconds))
+    vector, t_vector = timed("format_seconds_series", lambda: time_codec.format_seconds_series(valid))
+    assert scalar.equals(vector), "format mismatch"
+    print(f"  speedup x{t_scalar / t_vector:.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,232 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import db_schema
+
+# Record/replay of the crawlers' HTTP traffic ("cassettes").
+#
+# Record: every response the crawlers receive (Swimcloud pages, Fechida pages
+# and PDFs) is stored by its original URL in a cassette file (SQLite, bodies
+# zlib-compressed). Replay: ReplayServer serves a cassette on localhost with a
+# configurable latency, and route() points the crawlers' HTTP calls at it. Only
+# the request URL is rewritten (BASE_URL and stored links keep the real hosts),
+# so a replayed sync writes exactly the rows the recorded one did.
+#
+# The mode is process-wide: use(), or the CRAWL_CASSETTE variable at import:
+#   CRAWL_CASSETTE=record:data/cassettes/sync.db python main.py
+#   CRAWL_CASSETTE=replay:http://127.0.0.1:8765 python async_crawler.py
+#   python cassettes.py serve data/cassettes/sync.db [--port 8765] [--latency 0.1] [--jitter 0.05]
+#   python cassettes.py stats data/cassettes/sync.db
+# bench_sync.py runs full syncs against a replayed cassette.
+
+CASSETTE_DIR = os.path.join(os.path.dirname(db_schema.DB_PATH), "cassettes")
+DEFAULT_CASSETTE = os.path.join(CASSETTE_DIR, "sync.db")
+# Response headers worth replaying (content type and cache validators)
+KEEP_HEADERS = ("content-type", "etag", "last-modified")
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS interactions (
+        url TEXT PRIMARY KEY,
+        status INTEGER NOT NULL,
+        headers TEXT,
+        body BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        recorded_at REAL NOT NULL
+    )
+'''
+
+
+class CassetteStore:
+    def __init__(self, path=DEFAULT_CASSETTE):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Written from the crawlers' event loop and worker threads, read by the server's threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(_SCHEMA)
+        self.lock = threading.Lock()
+
+    def put(self, url, status, headers, body):
+        keep = {k.lower(): v for k, v in (headers or {}).items() if k.lower() in KEEP_HEADERS}
+        with self.lock, self.conn:
+            # Never replace a good recording with an error from a later run
+            self.conn.execute('''
+                INSERT INTO interactions (url, status, headers, body, size, recorded_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET status = excluded.status, headers = excluded.headers,
+                    body = excluded.body, size = excluded.size, recorded_at = excluded.recorded_at
+                WHERE excluded.status < 300 OR interactions.status >= 300
+            ''', (url, status, json.dumps(keep), zlib.compress(body or b""), len(body or b""), time.time()))
+
+    def get(self, url):
+        """(status, headers, body) recorded for `url`, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT status, headers, body FROM interactions WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1] or "{}"), zlib.decompress(row[2])
+
+    def stats(self):
+        with self.lock:
+            count, raw, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(body)), 0) FROM interactions").fetchone()
+        return {"responses": count, "bytes": raw, "stored_bytes": stored}
+
+    def close(self):
+        self.conn.close()
+
+
+# --- transport hooks (called by every crawler HTTP path) ---
+
+_mode = None            # None (live), "record" or "replay"
+_store = None
+_replay_base = None
+
+
+def use(mode=None, target=None):
+    """Live (None), "record" into the cassette at `target`, or "replay" via the server URL `target`."""
+    global _mode, _store, _replay_base
+    if _store is not None:
+        _store.close()
+    _mode, _store, _replay_base = None, None, None
+    if mode == "record":
+        _store = CassetteStore(target or DEFAULT_CASSETTE)
+    elif mode == "replay":
+        _replay_base = target.rstrip("/")
+    elif mode is not None:
+        raise ValueError(f"Unknown cassette mode {mode!r}")
+    _mode = mode
+
+
+def replaying():
+    return _mode == "replay"
+
+
+def route(url):
+    """URL to actually request: the replay server's copy of `url` when replaying."""
+    if _mode != "replay":
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{_replay_base}/{parts.scheme}/{parts.netloc}{parts.path or '/'}{query}"
+
+
+def record(url, status, headers, body):
+    # 304s carry no body; record from a cold HTTP cache to capture every page
+    if _mode == "record" and status != 304:
+        _store.put(url, status, headers, body)
+
+
+def _original_url(path):
+    scheme, _, rest = path.lstrip("/").partition("/")
+    return f"{scheme}://{rest}"
+
+
+class ReplayServer:
+    """Serves a cassette on localhost: GET /<scheme>/<host>/<path> -> the recorded response."""
+
+    def __init__(self, cassette=DEFAULT_CASSETTE, host="127.0.0.1", port=0, latency=0.0, jitter=0.0):
+        self.store = CassetteStore(cassette)
+        self.latency = latency
+        self.jitter = jitter
+        self.stats = {"requests": 0, "misses": 0, "not_modified": 0, "bytes": 0}
+        self.stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, **deltas):
+        with self.stats_lock:
+            for key, n in deltas.items():
+                self.stats[key] += n
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # Simulated network round trip; handler threads overlap like real requests
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+                url = _original_url(self.path)
+                hit = server.store.get(url)
+                if hit is None:
+                    server._count(requests=1, misses=1)
+                    print(f"Cassette miss: {url}")
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status, headers, body = hit
+                etag = headers.get("etag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    server._count(requests=1, not_modified=1)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                server._count(requests=1, bytes=len(body))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.store.close()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+
+
+if os.environ.get("CRAWL_CASSETTE"):
+    _env_mode, _, _env_target = os.environ["CRAWL_CASSETTE"].partition(":")
+    use(_env_mode, _env_target or None)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    cmd = args[0] if args else "stats"
+    path = args[1] if len(args) > 1 and not args[1].startswith("--") else DEFAULT_CASSETTE
+
+    def option(name, default):
+        return type(default)(args[args.index(name) + 1]) if name in args else default
+
+    if cmd == "serve":
+        server = ReplayServer(path, port=option("--port", 8765), latency=option("--latency", 0.0),
+                              jitter=option("--jitter", 0.0))
+        print(f"Replaying {path} on {server.start()} (CRAWL_CASSETTE=replay:{server.url})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(f"\n{server.stats}")
+            server.stop()
+    else:
+        store = CassetteStore(path)
+        s = store.stats()
+        print(f"{path}: {s['responses']} responses, {s['bytes'] / 1e6:.1f} MB in {s['stored_bytes'] / 1e6:.1f} MB")
+        store.close()
@@ -0,0 +1,103 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Age / category engine shared by the app and the qualifier tooling.
+# Everything works on whole columns: pass a Series of birth dates plus a
+# reference (None = today, an int season year = age on Dec 31 of that year,
+# a single date, or a Series of competition dates aligned with the births).
+#
+# Fechida labels: "8 años" ... "14 años", then "15-17 años" and "18-99 años".
+# minimum_standards.category_code: "10-10" ... "14-14", "15-17", "18-99"
+# (no minimas below 10). Records also use "15-17 años" style codes.
+
+MISSING_LABEL = "Desconocida"
+# Ages with their own category (analysis selector); older swimmers are grouped.
+INDIVIDUAL_AGES = range(8, 15)
+GROUPS = [(15, 17), (18, 99)]
+MIN_MINIMA_AGE = 10
+# Open categories in records/minimas apply to every age.
+_OPEN_WORDS = ("open", "todo", "absoluto")
+
+
+def parse_birth_dates(values):
+    """Birth dates as datetime64: ISO first, then day-first ("05-12-2010", "05/12/2010")."""
+    values = pd.Series(values, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    text = values.astype("string").str.strip().str.split(" ").str[0].str.replace("/", "-", regex=False)
+    iso = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+    dmy = pd.to_datetime(text, dayfirst=True, format="mixed", errors="coerce")
+    return iso.fillna(dmy)
+
+
+def _reference_dates(ref, index):
+    if ref is None:
+        ref = datetime.now()
+    elif isinstance(ref, (int, np.integer)):
+        ref = datetime(int(ref), 12, 31)
+    if isinstance(ref, pd.Series):
+        return parse_birth_dates(ref).reindex(index)
+    return pd.Series(pd.Timestamp(ref), index=index)
+
+
+def age_at(birth_dates, ref=None):
+    """Completed years at `ref` -> Int64 Series (<NA> for missing/invalid dates)."""
+    births = parse_birth_dates(birth_dates)
+    refs = _reference_dates(ref, births.index)
+    age = refs.dt.year - births.dt.year
+    birthday_pending = (refs.dt.month * 100 + refs.dt.day) < (births.dt.month * 100 + births.dt.day)
+    return (age - birthday_pending.astype(int)).astype("Int64")
+
+
+def category_label(ages):
+    """Fechida category label per age: '12 años', '15-17 años', '18-99 años'."""
+    ages = pd.Series(ages, copy=False).astype("Float64")
+    labels = ages.astype("Int64").astype("string") + " años"
+    for low, high in GROUPS:
+        labels = labels.mask(((ages >= low) & (ages <= high)).fillna(False), f"{low}-{high} años")
+    labels = labels.mask((ages > GROUPS[-1][1]).fillna(False), f"{GROUPS[-1][0]}-{GROUPS[-1][1]} años")
+    return labels.fillna(MISSING_LABEL).astype(object)
+
+
+def minima_category_code(ages):
+    """minimum_standards.category_code per age ('11-11', '15-17', '18-99'); None below 10."""
+    ages = pd.Series(ages, copy=False).astype("Float64")
+    single = ages.astype("Int64").astype("string")
+    codes = single + "-" + single
+    for low, high in GROUPS:
+        codes = codes.mask(((ages >= low) & (ages <= high)).fillna(False), f"{low}-{high}")
+    codes = codes.mask((ages > GROUPS[-1][1]).fillna(False), f"{GROUPS[-1][0]}-{GROUPS[-1][1]}")
+    codes = codes.mask((ages < MIN_MINIMA_AGE).fillna(False))
+    return codes.astype(object).where(codes.notna(), None)
+
+
+def category_bounds(codes):
+    """Age range of each category code -> DataFrame(low, high).
+
+    Accepts '11-11', '15-17', '18-99', '15-17 años', '10' and open categories
+    ('Open', 'Todo Competidor', 'Absoluto', which cover every age).
+    """
+    text = pd.Series(codes, copy=False).astype("string").str.replace(" años", "", regex=False).str.replace(" ", "", regex=False)
+    parts = text.str.extract(r"^(\d+)(?:-(\d+))?$")
+    low = pd.to_numeric(parts[0], errors="coerce")
+    high = pd.to_numeric(parts[1], errors="coerce").fillna(low)
+    is_open = text.str.lower().str.contains("|".join(_OPEN_WORDS), regex=True).fillna(False).astype(bool)
+    low = low.mask(is_open, 0)
+    high = high.mask(is_open, 999)
+    return pd.DataFrame({"low": low.astype("Int64"), "high": high.astype("Int64")}, index=text.index)
+
+
+def categorize(birth_dates, ref=None):
+    """age, category (label) and category_code (minimas) columns for `birth_dates`."""
+    ages = age_at(birth_dates, ref)
+    return pd.DataFrame({
+        "age": ages,
+        "category": category_label(ages),
+        "category_code": minima_category_code(ages),
+    }, index=ages.index)
+
+
+def category_for(birth_date, ref=None):
+    """Scalar convenience wrapper: label for a single birth date."""
+    return category_label(age_at(pd.Series([birth_date]), ref)).iloc[0]
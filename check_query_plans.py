@@ -0,0 +1,159 @@
+import sqlite3
+import sys
+import db_schema
+
+# Runs EXPLAIN QUERY PLAN over the hot queries against an in-memory copy of the
+# DB (migrated to the latest schema) and fails if any of them falls back to a
+# full table scan of `results` or `splits`.
+#
+#   python check_query_plans.py [path/to/natacion.db]
+
+TEAM_ID = "10034725"
+
+# (label, sql, params, index (or tuple of acceptable indexes) the planner must pick)
+HOT_QUERIES = [
+    (
+        "app.load_results",
+        """
+        SELECT r.id, r.event_name, r.event_id, e.name_es as event_display, r.time, r.pool_size,
+               r.points, r.place, m.date, m.start_date, m.name as meet_name
+        FROM results r
+        JOIN meets m ON r.meet_id = m.id
+        LEFT JOIN events e ON r.event_id = e.id
+        WHERE r.swimmer_id = ?
+        ORDER BY m.start_date DESC
+        """,
+        ("3236804",),
+        ("idx_results_swimmer_meet_event", "idx_results_best"),
+    ),
+    (
+        "app.render_analysis_tab (times)",
+        """
+        SELECT r.swimmer_id, r.time, s.name, MIN(r.time_seconds) as seconds
+        FROM results r
+        JOIN swimmers s ON r.swimmer_id = s.id
+        WHERE r.swimmer_id IN (?, ?, ?)
+          AND r.event_id IN (?)
+          AND r.time_seconds IS NOT NULL
+        GROUP BY r.swimmer_id
+        ORDER BY seconds ASC
+        """,
+        ("3236804", "3380041", "3234852", 2),
+        "idx_results_best_event",
+    ),
+    (
+        "app.load_all_best_times",
+        """
+        SELECT s.id as swimmer_id, s.name, pb.event_id, e.code as event_name, r.time,
+               pb.pool_size, m.start_date as date, pb.time_seconds as seconds
+        FROM swimmers s
+        JOIN personal_bests pb ON pb.swimmer_id = s.id
+        JOIN results r ON pb.result_id = r.id
+        JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON pb.event_id = e.id
+        WHERE s.team_id = ?
+        """,
+        (TEAM_ID,),
+        "sqlite_autoindex_personal_bests_1",
+    ),
+    (
+        "app.load_personal_bests",
+        """
+        SELECT pb.event_id, e.code as event_name, r.time, pb.pool_size, m.start_date,
+               m.name as meet_name, pb.time_seconds as seconds
+        FROM personal_bests pb
+        JOIN results r ON pb.result_id = r.id
+        JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON pb.event_id = e.id
+        WHERE pb.swimmer_id = ?
+        ORDER BY e.code
+        """,
+        ("3236804",),
+        "sqlite_autoindex_personal_bests_1",
+    ),
+    (
+        "app.render_analysis_tab (events)",
+        "SELECT DISTINCT event_id FROM results WHERE swimmer_id IN (?, ?, ?)",
+        ("3236804", "3380041", "3234852"),
+        ("idx_results_swimmer_meet_event", "idx_results_best", "idx_results_best_event"),
+    ),
+    (
+        "main.crawl_swimmer_meets (skip check)",
+        "SELECT 1 FROM results WHERE meet_id = ? AND swimmer_id = ? LIMIT 1",
+        ("F_1775141160_958", "3236804"),
+        "idx_results_swimmer_meet_event",
+    ),
+    (
+        "main.process_meet_results (dup check)",
+        "SELECT id FROM results WHERE swimmer_id=? AND meet_id=? AND event_name=?",
+        ("3236804", "F_1775141160_958", "100 Breast"),
+        "idx_results_swimmer_meet_event",
+    ),
+    (
+        "sync_meet_mobile.sync_data (dup check)",
+        "SELECT id FROM results WHERE swimmer_id = ? AND meet_id = ? AND event_name = ? AND time = ?",
+        ("3236804", "MM_1", "100 Breast", "1:50.08"),
+        "idx_results_swimmer_meet_event",
+    ),
+    (
+        "sync_meet_mobile.sync_data (clear splits)",
+        "DELETE FROM splits WHERE result_id = ?",
+        (1,),
+        "idx_splits_result",
+    ),
+    (
+        "app.update_meet_pool_size",
+        "UPDATE results SET pool_size = ? WHERE meet_id = ?",
+        ("25m", "F_1775141160_958"),
+        "idx_results_meet",
+    ),
+    (
+        "app.load_meets",
+        "SELECT * FROM meets ORDER BY start_date DESC",
+        (),
+        "idx_meets_start_date",
+    ),
+    (
+        "app.load_swimmers",
+        "SELECT * FROM swimmers WHERE team_id = ? ORDER BY name",
+        (TEAM_ID,),
+        "idx_swimmers_team_name",
+    ),
+]
+
+
+def explain(conn, sql, params):
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check(db_path=db_schema.DB_PATH):
+    source = sqlite3.connect(db_path)
+    conn = sqlite3.connect(":memory:")
+    source.backup(conn)
+    source.close()
+    db_schema.migrate(conn)
+    conn.execute("ANALYZE")
+
+    failures = 0
+    for label, sql, params, expected in HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        if isinstance(expected, str):
+            expected = (expected,)
+        uses_index = any(index in step for step in plan for index in expected)
+        full_scan = any(step.split()[:2] in (["SCAN", "results"], ["SCAN", "splits"], ["SCAN", "r"])
+                        for step in plan)
+        ok = uses_index and not full_scan
+        failures += 0 if ok else 1
+        print(f"[{'OK' if ok else 'FAIL'}] {label}")
+        for step in plan:
+            print(f"       {step}")
+
+    conn.close()
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use their index.")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else db_schema.DB_PATH
+    sys.exit(0 if check(target) else 1)
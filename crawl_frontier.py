@@ -0,0 +1,205 @@
+import json
+import os
+import socket
+import sys
+import time
+import uuid
+from collections import namedtuple
+import db_schema
+
+# Persisted crawl frontier for the Swimcloud crawlers (main.py, async_crawler.py).
+#
+# Every page a crawl needs is a row in crawl_tasks; url is unique, so a page is
+# queued once however many swimmers lead to it. Crawlers *lease* tasks: the
+# lease marks a task as theirs until `lease_expires`, so several processes can
+# drain one frontier without fetching the same page, and the tasks of a crashed
+# process become available again when their lease runs out.
+#
+#   pending -> leased -> done
+#                     -> pending again after an exponential backoff (fail)
+#                     -> failed, once MAX_ATTEMPTS is reached
+#
+# An interrupted crawl therefore resumes from whatever is still pending. A
+# swimmer's meets list is re-queued once it is older than SWIMMER_MEETS_REVISIT
+# (unattended crawls; the interactive sync walks every swimmer). Meet results
+# and split pages are re-queued, whatever their task state, for as long as the
+# DB still lacks their data (main.plan_swimmer_meets / queue_missing_splits).
+#
+#   python crawl_frontier.py [stats|retry|clear] [--db data/natacion.db]
+
+SWIMMER_MEETS = "swimmer_meets"
+MEET_RESULTS = "meet_results"
+SPLITS = "splits"
+# Deeper pages first: a crawl finishes the swimmer it is on (like the original
+# recursive crawler) before opening the next one.
+PRIORITY = {SPLITS: 0, MEET_RESULTS: 1, SWIMMER_MEETS: 2}
+
+LEASE_SECONDS = 600
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 30           # seconds before the first retry; doubles per attempt
+BACKOFF_MAX = 6 * 3600
+# Crawlers wait for retries due within this many seconds before stopping
+MAX_RETRY_WAIT = 120
+SWIMMER_MEETS_REVISIT = 12 * 3600
+
+Task = namedtuple("Task", "id kind url payload attempts")
+
+
+class CrawlFrontier:
+    def __init__(self, conn, owner=None, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.conn = conn
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.stats = {"leased": 0, "done": 0, "retried": 0, "failed": 0}
+
+    def add_many(self, kind, items, revisit_after=None, revisit_states=("done", "failed")):
+        """Queues (url, payload) items of one kind; returns how many became pending.
+
+        Known URLs are left alone, except tasks in `revisit_states` last touched
+        more than `revisit_after` seconds ago (0: any), which are queued again.
+        """
+        now = time.time()
+        cutoff = now - revisit_after if revisit_after is not None else float("-inf")
+        ph = ",".join("?" * len(revisit_states))
+        rows = [(url, kind, json.dumps(payload) if payload is not None else None, PRIORITY.get(kind, 0), now,
+                 *revisit_states, cutoff)
+                for url, payload in items]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(f'''
+                INSERT INTO crawl_tasks (url, kind, payload, priority, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    state = 'pending', attempts = 0, last_error = NULL, next_attempt_at = 0,
+                    payload = excluded.payload, updated_at = excluded.updated_at
+                WHERE crawl_tasks.state IN ({ph}) AND crawl_tasks.updated_at < ?
+            ''', rows)
+            return self.conn.total_changes - before
+
+    def add(self, kind, url, payload=None, revisit_after=None):
+        return self.add_many(kind, [(url, payload)], revisit_after) > 0
+
+    def lease(self, kinds=None, limit=1):
+        """Claims up to `limit` ready tasks (None = all), highest priority first."""
+        kinds = list(kinds or PRIORITY)
+        now = time.time()
+        ph = ",".join("?" * len(kinds))
+        # BEGIN IMMEDIATE takes the write lock before reading, so two crawlers
+        # can never claim the same task.
+        self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(f'''
+                SELECT id, kind, url, payload, attempts + 1 FROM crawl_tasks
+                WHERE kind IN ({ph})
+                  AND ((state = 'pending' AND next_attempt_at <= ?) OR (state = 'leased' AND lease_expires < ?))
+                ORDER BY priority, id
+                LIMIT ?
+            ''', (*kinds, now, now, -1 if limit is None else limit)).fetchall()
+            self.conn.executemany('''
+                UPDATE crawl_tasks SET state = 'leased', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', [(self.owner, now + self.lease_seconds, now, row[0]) for row in rows])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.stats["leased"] += len(rows)
+        return [Task(id_, kind, url, json.loads(payload) if payload else {}, attempts)
+                for id_, kind, url, payload, attempts in rows]
+
+    def complete(self, tasks):
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE crawl_tasks SET state = 'done', last_error = NULL, lease_owner = NULL,
+                    lease_expires = NULL, updated_at = ?
+                WHERE id = ?
+            ''', [(time.time(), task.id) for task in tasks])
+        self.stats["done"] += len(tasks)
+
+    def fail(self, task, error):
+        """Schedules a retry with exponential backoff, or gives up after max_attempts."""
+        now = time.time()
+        if task.attempts >= self.max_attempts:
+            state, next_at = "failed", 0
+            self.stats["failed"] += 1
+        else:
+            state, next_at = "pending", now + min(BACKOFF_BASE * 2 ** (task.attempts - 1), BACKOFF_MAX)
+            self.stats["retried"] += 1
+        with self.conn:
+            self.conn.execute('''
+                UPDATE crawl_tasks SET state = ?, last_error = ?, next_attempt_at = ?,
+                    lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE id = ?
+            ''', (state, str(error)[:500], next_at, now, task.id))
+        return state
+
+    def release(self, tasks=None):
+        """Hands leased tasks (default: all of ours) back without counting an attempt."""
+        with self.conn:
+            if tasks is None:
+                where, params = "lease_owner = ? AND state = 'leased'", [(self.owner,)]
+            else:
+                where, params = "id = ? AND state = 'leased'", [(task.id,) for task in tasks]
+            self.conn.executemany(f'''
+                UPDATE crawl_tasks SET state = 'pending', attempts = MAX(attempts - 1, 0),
+                    lease_owner = NULL, lease_expires = NULL
+                WHERE {where}
+            ''', params)
+
+    def next_due(self, kinds=None):
+        """Seconds until the next pending retry of `kinds` is due (0 if one is ready), or None."""
+        kinds = list(kinds or PRIORITY)
+        ph = ",".join("?" * len(kinds))
+        row = self.conn.execute(f'''
+            SELECT MIN(next_attempt_at) FROM crawl_tasks WHERE state = 'pending' AND kind IN ({ph})
+        ''', kinds).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def counts(self):
+        """{kind: {state: n}} over the whole frontier."""
+        out = {}
+        for kind, state, n in self.conn.execute("SELECT kind, state, COUNT(*) FROM crawl_tasks GROUP BY kind, state"):
+            out.setdefault(kind, {})[state] = n
+        return out
+
+    def summary(self):
+        s = self.stats
+        left = sum(n for states in self.counts().values() for state, n in states.items() if state in ("pending", "leased"))
+        return (f"Frontier: {s['leased']} tasks leased, {s['done']} done, {s['retried']} to retry, "
+                f"{s['failed']} failed; {left} still queued")
+
+    def retry_failed(self):
+        with self.conn:
+            return self.conn.execute('''
+                UPDATE crawl_tasks SET state = 'pending', attempts = 0, next_attempt_at = 0
+                WHERE state = 'failed'
+            ''').rowcount
+
+    def clear_done(self):
+        with self.conn:
+            return self.conn.execute("DELETE FROM crawl_tasks WHERE state = 'done'").rowcount
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = db_schema.DB_PATH
+    if "--db" in args:
+        i = args.index("--db")
+        db_path = args[i + 1]
+        del args[i:i + 2]
+    frontier = CrawlFrontier(db_schema.connect(db_path))
+    cmd = args[0] if args else "stats"
+    if cmd == "retry":
+        print(f"Re-queued {frontier.retry_failed()} failed tasks.")
+    elif cmd == "clear":
+        print(f"Removed {frontier.clear_done()} done tasks.")
+    else:
+        for kind, states in sorted(frontier.counts().items()):
+            print(f"{kind:<14} " + ", ".join(f"{state} {n}" for state, n in sorted(states.items())))
+        for kind, url, attempts, error in frontier.conn.execute('''
+                SELECT kind, url, attempts, last_error FROM crawl_tasks
+                WHERE last_error IS NOT NULL ORDER BY updated_at DESC LIMIT 10'''):
+            print(f"  ! {kind} {url} (attempt {attempts}): {error}")
+    frontier.conn.close()
@@ -0,0 +1,648 @@
+import sqlite3
+import os
+import sys
+import time_codec
+import meet_dates
+import event_catalog
+
+# Single source of truth for the natacion.db schema.
+# Every writer (main.py, scrapers, the Streamlit app) calls migrate() right after
+# connecting; already-applied versions are recorded in `schema_version`, so after
+# the first run this is a single indexed lookup.
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "natacion.db")
+if os.path.exists("/app/data/natacion.db"):
+    DB_PATH = "/app/data/natacion.db"
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_column(conn, table, column, decl):
+    """ALTER TABLE ... ADD COLUMN, skipped if the column already exists."""
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _m001_baseline(conn):
+    # Tables as they were created ad-hoc by main.py, scraper_minimas_final.py,
+    # scraper_records.py, scraper_fechida_pdf.py and the app (access_logs).
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS swimmers (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            url TEXT,
+            team_id TEXT,
+            birth_date TEXT,
+            gender TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS meets (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            date TEXT,
+            location TEXT,
+            url TEXT,
+            pool_size TEXT DEFAULT '25m',
+            address TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            swimmer_id TEXT,
+            meet_id TEXT,
+            event_name TEXT,
+            time TEXT,
+            points TEXT,
+            pool_size TEXT,
+            time_url TEXT,
+            place TEXT,
+            FOREIGN KEY(swimmer_id) REFERENCES swimmers(id),
+            FOREIGN KEY(meet_id) REFERENCES meets(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS splits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER,
+            distance TEXT,
+            split_time TEXT,
+            cumulative_time TEXT,
+            FOREIGN KEY(result_id) REFERENCES results(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS minimum_standards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_name TEXT,
+            time_text TEXT,
+            time_seconds REAL,
+            category_code TEXT,
+            gender TEXT,
+            pool_size TEXT,
+            source_url TEXT,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(event_name, category_code, gender, pool_size)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS national_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_name TEXT,
+            pool_size TEXT,
+            gender TEXT,
+            category_code TEXT,
+            time TEXT,
+            swimmer_name TEXT,
+            date TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS access_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            username TEXT,
+            ip_address TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fechida_scrapes (
+            url_id TEXT PRIMARY KEY,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Columns that older databases got later through manual ALTERs
+    # (add_address_column.py, update_dobs.py, ...).
+    _add_column(conn, "swimmers", "birth_date", "TEXT")
+    _add_column(conn, "swimmers", "gender", "TEXT")
+    _add_column(conn, "meets", "pool_size", "TEXT DEFAULT '25m'")
+    _add_column(conn, "meets", "address", "TEXT")
+    _add_column(conn, "results", "pool_size", "TEXT")
+    _add_column(conn, "results", "time_url", "TEXT")
+    _add_column(conn, "results", "place", "TEXT")
+
+
+# Indexes for the hot paths. Column order follows the equality predicates of:
+#  - SwimcloudCrawler.crawl_swimmer_meets:  WHERE meet_id=? AND swimmer_id=?
+#  - SwimcloudCrawler.process_meet_results: WHERE swimmer_id=? AND meet_id=? AND event_name=?
+#  - sync_meet_mobile.sync_data:            ... AND event_name=? AND time=?
+#  - app.load_results:                      WHERE swimmer_id=?
+# `time` is included so the Meet Mobile duplicate check never touches the table.
+# The (event_name, swimmer_id, time) index covers render_analysis_tab, which
+# filters by one event and a list of swimmers.
+_M002_HOT_PATH_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_results_swimmer_meet_event
+        ON results(swimmer_id, meet_id, event_name, time);
+    CREATE INDEX IF NOT EXISTS idx_results_event_swimmer
+        ON results(event_name, swimmer_id, time);
+    CREATE INDEX IF NOT EXISTS idx_results_meet
+        ON results(meet_id);
+    CREATE INDEX IF NOT EXISTS idx_splits_result
+        ON splits(result_id);
+    CREATE INDEX IF NOT EXISTS idx_swimmers_team_name
+        ON swimmers(team_id, name);
+'''
+
+
+def backfill_time_seconds(conn, only_missing=False):
+    """Fills results.time_seconds/time_status from the text `time` column."""
+    where = " WHERE time_status IS NULL" if only_missing else ""
+    rows = conn.execute(f"SELECT id, time FROM results{where}").fetchall()
+    if not rows:
+        return 0
+    ids, times = zip(*rows)
+    seconds, status = time_codec.parse_result_time_series(list(times))
+    seconds = seconds.astype(object).where(seconds.notna(), None)
+    conn.executemany(
+        "UPDATE results SET time_seconds = ?, time_status = ? WHERE id = ?",
+        zip(seconds.tolist(), status.tolist(), ids)
+    )
+    return len(rows)
+
+
+def _m003_time_seconds(conn):
+    _add_column(conn, "results", "time_seconds", "REAL")
+    _add_column(conn, "results", "time_status", "TEXT")
+    backfill_time_seconds(conn)
+    # Best times become MIN(time_seconds) per (swimmer, event, pool) read
+    # straight off this index.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_results_best
+            ON results(swimmer_id, event_name, pool_size, time_seconds)
+    ''')
+
+
+def backfill_meet_dates(conn, only_missing=False):
+    """Fills meets.start_date/end_date from the raw `date` text."""
+    where = " WHERE start_date IS NULL" if only_missing else ""
+    rows = conn.execute(f"SELECT id, date FROM meets{where}").fetchall()
+    conn.executemany(
+        "UPDATE meets SET start_date = ?, end_date = ? WHERE id = ?",
+        [(*meet_dates.normalize_meet_date(d), mid) for mid, d in rows]
+    )
+    return len(rows)
+
+
+def _m004_meet_dates(conn):
+    _add_column(conn, "meets", "start_date", "TEXT")
+    _add_column(conn, "meets", "end_date", "TEXT")
+    backfill_meet_dates(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meets_start_date ON meets(start_date)")
+
+
+# Tables that carry an event: event_id is filled from event_aliases.
+EVENT_TABLES = ("results", "minimum_standards", "national_records")
+
+
+def _event_id_triggers(table):
+    # Safety net for writers that only set event_name (ad-hoc fix scripts,
+    # bulk inserts): look the raw name up in event_aliases, creating a
+    # non-standard event for names never seen before.
+    resolve = '''
+            INSERT OR IGNORE INTO events (code, name_es, name_en, stroke_es, is_relay, is_standard)
+                SELECT NEW.event_name, NEW.event_name, NEW.event_name, 'Otro', 0, 0
+                WHERE NOT EXISTS (SELECT 1 FROM event_aliases WHERE alias = NEW.event_name);
+            INSERT OR IGNORE INTO event_aliases (alias, event_id)
+                SELECT NEW.event_name, id FROM events WHERE code = NEW.event_name;
+            UPDATE {table} SET event_id =
+                (SELECT event_id FROM event_aliases WHERE alias = NEW.event_name)
+                WHERE id = NEW.id;
+    '''.format(table=table)
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_event_id_ins
+            AFTER INSERT ON {table}
+            WHEN NEW.event_id IS NULL AND NEW.event_name IS NOT NULL
+            BEGIN {resolve} END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_event_id_upd
+            AFTER UPDATE OF event_name ON {table}
+            WHEN NEW.event_name IS NOT NULL AND NEW.event_name IS NOT OLD.event_name
+            BEGIN {resolve} END''',
+    ]
+
+
+def backfill_event_ids(conn):
+    """Resolves every distinct event_name and sets event_id on the event tables."""
+    for table in EVENT_TABLES:
+        names = [r[0] for r in conn.execute(
+            f"SELECT DISTINCT event_name FROM {table} WHERE event_name IS NOT NULL")]
+        event_catalog.register_aliases(conn, names)
+        conn.execute(f'''
+            UPDATE {table} SET event_id =
+                (SELECT event_id FROM event_aliases WHERE alias = {table}.event_name)
+        ''')
+
+
+def _m005_events(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT UNIQUE NOT NULL,
+            distance INTEGER,
+            stroke TEXT,
+            stroke_es TEXT,
+            is_relay INTEGER DEFAULT 0,
+            name_es TEXT,
+            name_en TEXT,
+            is_standard INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS event_aliases (
+            alias TEXT PRIMARY KEY,
+            event_id INTEGER NOT NULL REFERENCES events(id)
+        )
+    ''')
+    event_catalog.seed_events(conn)
+    for table in EVENT_TABLES:
+        _add_column(conn, table, "event_id", "INTEGER REFERENCES events(id)")
+    backfill_event_ids(conn)
+    for table in EVENT_TABLES:
+        for trigger in _event_id_triggers(table):
+            conn.execute(trigger)
+    # Best-time and qualifier lookups by integer key
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_results_best_event
+            ON results(swimmer_id, event_id, pool_size, time_seconds)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_minimum_standards_event
+            ON minimum_standards(event_id, gender, category_code, pool_size)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_national_records_event
+            ON national_records(event_id, gender, category_code, pool_size)
+    ''')
+
+
+# personal_bests holds one row per (swimmer, event, pool): the fastest result.
+# It is kept current by the triggers below, so it stays right whatever writes
+# to `results` (crawlers, auto_deduplicate, merge scripts, the app).
+# Ties keep the earliest result id.
+_PB_KEY = "swimmer_id = {p}.swimmer_id AND event_id = {p}.event_id AND pool_size = {p}.pool_size"
+
+_PB_RECOMPUTE = '''
+            DELETE FROM personal_bests WHERE {key};
+            INSERT INTO personal_bests (swimmer_id, event_id, pool_size, result_id, time_seconds)
+                SELECT swimmer_id, event_id, pool_size, id, time_seconds FROM results
+                WHERE {key} AND time_seconds IS NOT NULL
+                ORDER BY time_seconds, id LIMIT 1;
+'''
+
+
+def _pb_recompute(p):
+    return _PB_RECOMPUTE.format(key=_PB_KEY.format(p=p))
+
+
+_PB_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS trg_results_pb_ins
+        AFTER INSERT ON results
+        WHEN NEW.time_seconds IS NOT NULL AND NEW.swimmer_id IS NOT NULL
+         AND NEW.event_id IS NOT NULL AND NEW.pool_size IS NOT NULL
+        BEGIN
+            INSERT INTO personal_bests (swimmer_id, event_id, pool_size, result_id, time_seconds)
+                VALUES (NEW.swimmer_id, NEW.event_id, NEW.pool_size, NEW.id, NEW.time_seconds)
+                ON CONFLICT (swimmer_id, event_id, pool_size) DO UPDATE SET
+                    result_id = excluded.result_id, time_seconds = excluded.time_seconds
+                WHERE excluded.time_seconds < personal_bests.time_seconds;
+        END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_results_pb_upd
+        AFTER UPDATE OF swimmer_id, event_id, pool_size, time_seconds ON results
+        BEGIN
+            {_pb_recompute("OLD")}
+            {_pb_recompute("NEW")}
+        END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_results_pb_del
+        AFTER DELETE ON results
+        WHEN EXISTS (SELECT 1 FROM personal_bests WHERE result_id = OLD.id)
+        BEGIN
+            {_pb_recompute("OLD")}
+        END''',
+]
+
+
+def rebuild_personal_bests(conn):
+    """Recomputes personal_bests from scratch. Returns the number of rows."""
+    conn.execute("DELETE FROM personal_bests")
+    conn.execute('''
+        INSERT INTO personal_bests (swimmer_id, event_id, pool_size, result_id, time_seconds)
+        SELECT swimmer_id, event_id, pool_size, id, time_seconds FROM (
+            SELECT swimmer_id, event_id, pool_size, id, time_seconds,
+                   ROW_NUMBER() OVER (PARTITION BY swimmer_id, event_id, pool_size
+                                      ORDER BY time_seconds, id) AS rn
+            FROM results
+            WHERE time_seconds IS NOT NULL AND event_id IS NOT NULL
+              AND pool_size IS NOT NULL AND swimmer_id IS NOT NULL
+        ) WHERE rn = 1
+    ''')
+    return conn.execute("SELECT COUNT(*) FROM personal_bests").fetchone()[0]
+
+
+def _m006_personal_bests(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS personal_bests (
+            swimmer_id TEXT NOT NULL,
+            event_id INTEGER NOT NULL,
+            pool_size TEXT NOT NULL,
+            result_id INTEGER NOT NULL,
+            time_seconds REAL NOT NULL,
+            PRIMARY KEY (swimmer_id, event_id, pool_size)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_personal_bests_event
+            ON personal_bests(event_id, pool_size, time_seconds)
+    ''')
+    # Looked up by the delete trigger
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_personal_bests_result ON personal_bests(result_id)")
+    for trigger in _PB_TRIGGERS:
+        conn.execute(trigger)
+    rebuild_personal_bests(conn)
+
+
+
+# data_version is a single counter bumped by a trigger on every write to the
+# tables the app reads. The app keys its cached loaders on it, so any writer
+# (crawlers, scrapers, admin edits, dedup scripts) invalidates them with no
+# extra code, and an unchanged DB keeps serving from cache.
+DATA_VERSION_TABLES = ("swimmers", "meets", "results", "minimum_standards", "national_records", "events")
+
+
+def _m007_data_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+    for table in DATA_VERSION_TABLES:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_data_version_{op.lower()}
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE data_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
+
+
+def data_version(conn):
+    """Current data version (0 on a DB that predates migration 007)."""
+    try:
+        row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+# Persisted crawl frontier (see crawl_frontier.py): one row per page to fetch.
+_M008_CRAWL_TASKS = '''
+    CREATE TABLE IF NOT EXISTS crawl_tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        payload TEXT,
+        priority INTEGER NOT NULL DEFAULT 0,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        lease_owner TEXT,
+        lease_expires REAL,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        updated_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_crawl_tasks_ready
+        ON crawl_tasks(state, priority, id);
+'''
+
+# One row per sync run (see sync_metrics.py); stages/rows_by_table are JSON.
+_M009_SYNC_RUNS = '''
+    CREATE TABLE IF NOT EXISTS sync_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        duration_s REAL,
+        status TEXT NOT NULL,
+        error TEXT,
+        requests INTEGER NOT NULL DEFAULT 0,
+        bytes INTEGER NOT NULL DEFAULT 0,
+        errors INTEGER NOT NULL DEFAULT 0,
+        rows_written INTEGER NOT NULL DEFAULT 0,
+        stages TEXT,
+        rows_by_table TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_sync_runs_started
+        ON sync_runs(started_at)
+'''
+
+# Parsed Fechida PDFs by content hash (see pdf_parse_cache.py); pages/records
+# are zlib-compressed JSON.
+_M010_PDF_PARSE_CACHE = '''
+    CREATE TABLE IF NOT EXISTS pdf_parse_cache (
+        sha256 TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        source_url TEXT,
+        size INTEGER NOT NULL,
+        page_count INTEGER NOT NULL,
+        parser_version INTEGER NOT NULL,
+        pages BLOB NOT NULL,
+        records BLOB NOT NULL,
+        parsed_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS fechida_pdf_versions (
+        c_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        applied_at REAL NOT NULL,
+        PRIMARY KEY (c_id, kind)
+    )
+'''
+
+
+def _m011_mm_heat_entry(conn):
+    # Meet Mobile HeatEntry a result came from: the set-based sync joins its
+    # splits through it and skips heat entries already imported
+    _add_column(conn, "results", "mm_heat_entry_id", "INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_results_mm_heat_entry ON results(mm_heat_entry_id)")
+
+
+_M012_MM_SYNC_STATE = '''
+    CREATE TABLE IF NOT EXISTS mm_sync_state (
+        mm_meet_id INTEGER PRIMARY KEY,
+        max_heat_entry_id INTEGER NOT NULL,
+        entry_count INTEGER NOT NULL,
+        checksum TEXT NOT NULL,
+        whitelist TEXT,
+        synced_at TEXT NOT NULL
+    )
+'''
+
+
+# Safety net for writers that only set `time` (ad-hoc scripts, bulk inserts),
+# like the event_id triggers: without it their rows keep time_seconds NULL and
+# drop out of the rankings and personal_bests. The SQL below is
+# time_codec.parse_result_time for the forms results hold ("32.09",
+# "1:16.29", "1:02:03.4", "2:00,46", status codes); exotic float syntax
+# ("1e2", "1_000") that Python would accept ends up INVALID. Writers that set
+# time_status themselves are left alone.
+_NUMBER_OK = "({x} <> '' AND {x} NOT GLOB '*[^0-9.]*' AND {x} GLOB '*[0-9]*' AND {x} NOT GLOB '*.*.*')"
+
+_TIME_STATUS_CASE = "CASE {} ELSE '{}' END".format(
+    " ".join(f"WHEN code GLOB '{c}' OR code GLOB '{c}[^A-Z0-9_]*' THEN '{c}'"
+             for c in sorted(time_codec.STATUS_CODES)),
+    time_codec.STATUS_INVALID)
+
+_TIME_SECONDS_UPDATE = '''
+            UPDATE results SET (time_seconds, time_status) = (
+                SELECT secs, CASE WHEN secs IS NOT NULL THEN '{ok}' ELSE {status} END
+                FROM (
+                    SELECT code, CASE WHEN t GLOB '[0-9]*' AND {s_ok} AND instr(s, ':') = 0
+                                       AND (p1 IS NULL OR {p1_ok}) AND (p2 IS NULL OR {p2_ok})
+                                      THEN CASE WHEN p2 IS NOT NULL THEN CAST(p1 AS REAL) * 3600 + CAST(p2 AS REAL) * 60
+                                                WHEN p1 IS NOT NULL THEN CAST(p1 AS REAL) * 60
+                                                ELSE 0 END + CAST(s AS REAL)
+                                 END AS secs
+                    FROM (
+                        SELECT t, code, p1,
+                               CASE WHEN instr(r1, ':') THEN substr(r1, 1, instr(r1, ':') - 1) END AS p2,
+                               CASE WHEN instr(r1, ':') THEN substr(r1, instr(r1, ':') + 1) ELSE r1 END AS s
+                        FROM (
+                            SELECT t, code,
+                                   CASE WHEN instr(t, ':') THEN substr(t, 1, instr(t, ':') - 1) END AS p1,
+                                   CASE WHEN instr(t, ':') THEN substr(t, instr(t, ':') + 1) ELSE t END AS r1
+                            FROM (
+                                SELECT trim(replace(CAST(NEW.time AS TEXT), ',', '.'), ' ' || char(9, 10, 13)) AS t,
+                                       upper(ltrim(CAST(NEW.time AS TEXT), ' ' || char(9, 10, 13))) AS code
+                            )
+                        )
+                    )
+                )
+            ) WHERE id = NEW.id;
+'''.format(ok=time_codec.STATUS_OK, status=_TIME_STATUS_CASE,
+           s_ok=_NUMBER_OK.format(x="s"), p1_ok=_NUMBER_OK.format(x="p1"), p2_ok=_NUMBER_OK.format(x="p2"))
+
+_TIME_SECONDS_TRIGGERS = [
+    f'''CREATE TRIGGER IF NOT EXISTS trg_results_time_seconds_ins
+        AFTER INSERT ON results
+        WHEN NEW.time_status IS NULL
+        BEGIN {_TIME_SECONDS_UPDATE} END''',
+    # Only when the writer changed `time` without recomputing the parsed columns
+    f'''CREATE TRIGGER IF NOT EXISTS trg_results_time_seconds_upd
+        AFTER UPDATE OF time ON results
+        WHEN NEW.time IS NOT OLD.time
+         AND NEW.time_seconds IS OLD.time_seconds AND NEW.time_status IS OLD.time_status
+        BEGIN {_TIME_SECONDS_UPDATE} END''',
+]
+
+
+def _m013_time_seconds_triggers(conn):
+    for trigger in _TIME_SECONDS_TRIGGERS:
+        conn.execute(trigger)
+    # Rows left NULL by such writers before the triggers existed
+    backfill_time_seconds(conn, only_missing=True)
+
+
+def enable_wal(conn):
+    """Switches the DB to write-ahead logging so readers (the dashboard) are not
+    blocked while a crawler writes. The mode is stored in the file, so this only
+    needs to run once per DB; it cannot run inside a transaction."""
+    conn.commit()
+    mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    # Safe with WAL: a crash can lose the last commits but never corrupts
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return mode
+
+# (version, description, step). Steps are either a SQL script or a callable
+# receiving the connection. Never edit an applied migration; append a new one.
+MIGRATIONS = [
+    (1, "baseline tables", _m001_baseline),
+    (2, "hot path indexes for results/splits/swimmers", _M002_HOT_PATH_INDEXES),
+    (3, "results.time_seconds/time_status + backfill", _m003_time_seconds),
+    (4, "meets.start_date/end_date (ISO) + backfill", _m004_meet_dates),
+    (5, "events dimension + event_id on results/minimum_standards/national_records", _m005_events),
+    (6, "personal_bests table maintained by triggers", _m006_personal_bests),
+    (7, "data_version counter bumped on every data write", _m007_data_version),
+    (8, "crawl_tasks frontier for resumable crawls", _M008_CRAWL_TASKS),
+    (9, "sync_runs instrumentation per sync run", _M009_SYNC_RUNS),
+    (10, "pdf_parse_cache of parsed Fechida PDFs by sha256, fechida_pdf_versions", _M010_PDF_PARSE_CACHE),
+    (11, "results.mm_heat_entry_id for the set-based Meet Mobile sync", _m011_mm_heat_entry),
+    (12, "mm_sync_state high-water marks for the incremental Meet Mobile sync", _M012_MM_SYNC_STATE),
+    (13, "triggers filling results.time_seconds/time_status for writers that only set time", _m013_time_seconds_triggers),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+
+def current_version(conn):
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def _run_step(conn, step):
+    if callable(step):
+        step(conn)
+    else:
+        for statement in step.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+
+
+def migrate(conn, verbose=False):
+    """Applies every pending migration in order. Returns the number applied."""
+    _ensure_version_table(conn)
+    if current_version(conn) >= LATEST_VERSION:
+        return 0
+
+    applied = 0
+    for version, description, step in MIGRATIONS:
+        # BEGIN IMMEDIATE takes the write lock up front so two processes
+        # (e.g. the app and a crawler) can't apply the same version twice.
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.commit()
+                continue
+            if verbose:
+                print(f"Applying migration {version:03d}: {description}")
+            _run_step(conn, step)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (version, description))
+            conn.commit()
+            applied += 1
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+def connect(db_path=DB_PATH):
+    """sqlite3.connect() + migrate(). Use this instead of bare connects for writers."""
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    return conn
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    conn = sqlite3.connect(target)
+    before = current_version(conn) if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'schema_version'").fetchone() else 0
+    count = migrate(conn, verbose=True)
+    print(f"{target}: schema v{before} -> v{current_version(conn)} ({count} migrations applied)")
+    conn.close()
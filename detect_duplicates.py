@@ -1,57 +1,18 @@
 
-import sqlite3
 import pandas as pd
 from fuzzywuzzy import fuzz
 from datetime import datetime, timedelta
+import db_schema
 
 DB_PATH = "data/natacion.db"
 
-def parse_date(date_str):
-    # Try different formats
-    # DB has: "Sep 8–11, 2022" (Swimcloud), "2025-12-05" (Meet Mobile)
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except:
-        pass
-        
-    return None
-
 def detect():
-    conn = sqlite3.connect(DB_PATH)
-    meets = pd.read_sql("SELECT id, name, date FROM meets", conn)
+    conn = db_schema.connect(DB_PATH)
+    meets = pd.read_sql("SELECT id, name, date, start_date FROM meets", conn)
     conn.close()
     
-    # Preprocess dates
-    # We add a 'parsed_date' column
-    # For Swimcloud "Dec 10–13, 2025", we just want "2025-12-10"
-    
-    parsed_dates = []
-    for d in meets['date']:
-        try:
-            # Try ISO first
-            dt = datetime.strptime(d, "%Y-%m-%d")
-            parsed_dates.append(dt)
-            continue
-        except:
-            pass
-            
-        try:
-            # Try "Dec 5–6, 2025" or "Dec 5, 2025"
-            # Split by comma
-            parts = d.split(',')
-            if len(parts) == 2:
-                year = int(parts[1].strip())
-                # "Dec 5–6" -> "Dec 5"
-                month_day = parts[0].split('–')[0].split('-')[0].strip() # Handle en-dash or hyphen
-                dt = datetime.strptime(f"{month_day} {year}", "%b %d %Y")
-                parsed_dates.append(dt)
-            else:
-                 parsed_dates.append(datetime(1900, 1, 1))
-        except Exception as e:
-            # print(f"Failed to parse: {d}")
-            parsed_dates.append(datetime(1900, 1, 1))
-            
-    meets['dt'] = parsed_dates
+    # start_date is ISO (see meet_dates.py); unknown dates sort first
+    meets['dt'] = pd.to_datetime(meets['start_date'], format='%Y-%m-%d', errors='coerce').fillna(datetime(1900, 1, 1))
     
     # Sort
     meets = meets.sort_values('dt')
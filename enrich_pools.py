@@ -6,7 +6,6 @@ import sys
 import os
 from bs4 import BeautifulSoup
 import re
-import time
 
 # Import crawler 
 from main import SwimcloudCrawler
@@ -14,8 +13,8 @@ from main import SwimcloudCrawler
 DB_PATH = 'data/natacion.db'
 BASE_URL = "https://www.swimcloud.com"
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+def get_connection(db_path=None):
+    return sqlite3.connect(db_path or DB_PATH)
 
 def parse_date(date_str):
     if not date_str or date_str == "Unknown": return None
@@ -61,9 +60,9 @@ def normalize_date_match(db_date, sc_date_text):
     if not d1 or not d2: return False
     return abs((d1 - d2).days) <= 1
 
-def enrich_pools():
-    crawler = SwimcloudCrawler()
-    conn = get_connection()
+def enrich_pools(db_path=None, cache=None):
+    crawler = SwimcloudCrawler(db_path or DB_PATH, cache=cache)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     # 1. Get MM Meets that need checking
@@ -72,6 +71,8 @@ def enrich_pools():
     
     if not mm_meets:
         print("No MM meets.")
+        conn.close()
+        crawler.close()
         return
 
     # 2. Get Proxy Swimmers (Active ones)
@@ -101,8 +102,7 @@ def enrich_pools():
         print(f"Scraping: {url}")
         
         crawler.get_page(url)
-        time.sleep(2) # Wait for load
-        soup = BeautifulSoup(crawler.driver.page_source, 'html.parser')
+        soup = BeautifulSoup(crawler.page_source, 'html.parser')
         
         headers = soup.select('h3.c-title')
         print(f"Found {len(headers)} meets (h3) on profile.")
@@ -184,7 +184,7 @@ def enrich_pools():
             # Visit Logic
             print(f"  -> Visiting Swimcloud: {match['url']}")
             crawler.get_page(match['url'])
-            msoup = BeautifulSoup(crawler.driver.page_source, 'html.parser')
+            msoup = BeautifulSoup(crawler.page_source, 'html.parser')
             
             pool_detected = None
             # Check Header
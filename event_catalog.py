@@ -0,0 +1,312 @@
+import re
+
+# Event dimension shared by the ingesters and the app.
+# `results`, `minimum_standards` and `national_records` reference `events.id`
+# through an integer `event_id`; the free-text event_name stays for display and
+# auditing only. Raw names are mapped once, at ingest, through `event_aliases`
+# (raw text -> event id), so readers join/filter with integer equality instead
+# of re-normalizing strings on every row.
+
+# Canonical events: (code, distance, stroke, is_relay). The code is the English
+# name used by Swimcloud/Meet Mobile and is what results.event_name usually holds.
+EVENTS = [
+    ("25 Free", 25, "Free", 0),
+    ("50 Free", 50, "Free", 0),
+    ("100 Free", 100, "Free", 0),
+    ("200 Free", 200, "Free", 0),
+    ("400 Free", 400, "Free", 0),
+    ("800 Free", 800, "Free", 0),
+    ("1500 Free", 1500, "Free", 0),
+    ("25 Back", 25, "Back", 0),
+    ("50 Back", 50, "Back", 0),
+    ("100 Back", 100, "Back", 0),
+    ("200 Back", 200, "Back", 0),
+    ("25 Breast", 25, "Breast", 0),
+    ("50 Breast", 50, "Breast", 0),
+    ("100 Breast", 100, "Breast", 0),
+    ("200 Breast", 200, "Breast", 0),
+    ("25 Fly", 25, "Fly", 0),
+    ("50 Fly", 50, "Fly", 0),
+    ("100 Fly", 100, "Fly", 0),
+    ("200 Fly", 200, "Fly", 0),
+    ("25 IM", 25, "IM", 0),
+    ("100 IM", 100, "IM", 0),
+    ("200 IM", 200, "IM", 0),
+    ("400 IM", 400, "IM", 0),
+    ("100 Free Relay", 100, "Free", 1),
+    ("200 Free Relay", 200, "Free", 1),
+    ("400 Free Relay", 400, "Free", 1),
+    ("800 Free Relay", 800, "Free", 1),
+    ("100 Medley Relay", 100, "Medley", 1),
+    ("200 Medley Relay", 200, "Medley", 1),
+    ("400 Medley Relay", 400, "Medley", 1),
+    ("400 Mixed Free Relay", 400, "Free", 1),
+    ("400 Mixed Medley Relay", 400, "Medley", 1),
+]
+
+STROKE_ES = {
+    "Free": "Libre",
+    "Back": "Espalda",
+    "Breast": "Pecho",
+    "Fly": "Mariposa",
+    "IM": "Combinado",
+    "Medley": "Combinado",
+}
+
+EVENT_DB_TO_ES = {
+    "50 Free": "50 metros Libre",
+    "100 Free": "100 metros Libre",
+    "200 Free": "200 metros Libre",
+    "400 Free": "400 metros Libre",
+    "800 Free": "800 metros Libre",
+    "1500 Free": "1500 metros Libre",
+    "50 Back": "50 metros Espalda",
+    "100 Back": "100 metros Espalda",
+    "200 Back": "200 metros Espalda",
+    "50 Breast": "50 metros Pecho",
+    "100 Breast": "100 metros Pecho",
+    "200 Breast": "200 metros Pecho",
+    "50 Fly": "50 metros Mariposa",
+    "100 Fly": "100 metros Mariposa",
+    "200 Fly": "200 metros Mariposa",
+    "100 IM": "100 metros Combinado (Solo en piscina corta 25m)",
+    "200 IM": "200 metros Combinado",
+    "400 IM": "400 metros Combinado",
+    "200 Free Relay": "4 x 50 metros Libre",
+    "400 Free Relay": "4 x 100 metros Libre",
+    "800 Free Relay": "4 x 200 metros Libre",
+    "200 Medley Relay": "4 x 50 metros Combinado",
+    "400 Medley Relay": "4 x 100 metros Combinado",
+    "400 Mixed Free Relay": "4 x 100 metros Mixto (Libre o Combinado)",
+    "400 Mixed Medley Relay": "4 x 100 metros Mixto (Libre o Combinado)",
+    "25 Free": "25 metros Libre",
+    "25 Back": "25 metros Espalda",
+    "25 Breast": "25 metros Pecho",
+    "25 Fly": "25 metros Mariposa",
+    "25 IM": "25 metros Combinado",
+    "100 Free Relay": "4 x 25 metros Libre",
+    "100 Medley Relay": "4 x 25 metros Combinado",
+    "4x50 Free Relay": "4 x 50 metros Libre",
+}
+
+EVENT_ES_TO_DB = {
+    "50 metros Libre": "50 Free",
+    "100 metros Libre": "100 Free",
+    "200 metros Libre": "200 Free",
+    "400 metros Libre": "400 Free",
+    "800 metros Libre": "800 Free",
+    "1500 metros Libre": "1500 Free",
+    "50 metros Espalda": "50 Back",
+    "100 metros Espalda": "100 Back",
+    "200 metros Espalda": "200 Back",
+    "50 metros Pecho": "50 Breast",
+    "100 metros Pecho": "100 Breast",
+    "200 metros Pecho": "200 Breast",
+    "50 metros Mariposa": "50 Fly",
+    "100 metros Mariposa": "100 Fly",
+    "200 metros Mariposa": "200 Fly",
+    "100 metros Combinado (Solo en piscina corta 25m)": "100 IM",
+    "200 metros Combinado": "200 IM",
+    "400 metros Combinado": "400 IM",
+    "4 x 50 metros Libre": "200 Free Relay",
+    "4 x 100 metros Libre": "400 Free Relay",
+    "4 x 200 metros Libre": "800 Free Relay",
+    "4 x 50 metros Combinado": "200 Medley Relay",
+    "4 x 100 metros Combinado": "400 Medley Relay",
+    "4 x 100 metros Mixto (Libre o Combinado)": "400 Mixed Free Relay",
+    "25 metros Libre": "25 Free",
+    "25 metros Espalda": "25 Back",
+    "25 metros Pecho": "25 Breast",
+    "25 metros Mariposa": "25 Fly",
+    "25 metros Combinado": "25 IM",
+    "4 x 25 metros Libre": "100 Free Relay",
+    "4 x 25 metros Combinado": "100 Medley Relay",
+}
+
+EVENT_ES_TO_DB_MULTI = {
+    "4 x 100 metros Mixto (Libre o Combinado)": ["400 Mixed Free Relay", "400 Mixed Medley Relay"],
+    "4 x 50 metros Libre": ["200 Free Relay", "4x50 Free Relay"],
+}
+
+_CODES = {code for code, _, _, _ in EVENTS}
+
+# Records/minimas spell relays as "4x100 Free" / "4x50 IM".
+_RELAY_NxD_RE = re.compile(r'^4\s*x\s*(\d+)\s*(?:m\s+)?(Free|IM|Medley)(?:\s+Relay)?$', re.IGNORECASE)
+# Meet Mobile relay legs ("400 FR-R (Split)", "400 MED-R (Breast)") carry a leg
+# time, not the relay time; they must not collapse into the relay event.
+_RELAY_LEG_RE = re.compile(r'\b(FR|MED)-R\b', re.IGNORECASE)
+
+
+def get_event_display_name(event_name):
+    if not isinstance(event_name, str):
+        return event_name
+    en = event_name.strip()
+    if en in EVENT_DB_TO_ES:
+        return EVENT_DB_TO_ES[en]
+
+    # If not exactly matching, try normalizing it first (e.g. "Mujeres 9-10 400 Metro Libre" -> "400 Free")
+    norm = normalize_scraped_event_name(en)
+    if norm in EVENT_DB_TO_ES:
+        return EVENT_DB_TO_ES[norm]
+
+    return norm
+
+
+def normalize_scraped_event_name(raw_name):
+    """
+    Normalizes 'Mujeres 9-10 400 Metro Libre' -> '400 Free'
+    Handles Relays to avoid false positives (e.g. '200 Relevo' != '200 Individual')
+    """
+    if not isinstance(raw_name, str):
+        return raw_name
+
+    name = raw_name.lower()
+
+    # Check for Relay
+    is_relay = "relevo" in name or "relay" in name
+
+    # 1. Extract Distance
+    dist_match = re.search(r'(\b|^)(25|50|100|200|400|800|1500)(\b|$)', name)
+    if not dist_match:
+        # Maybe it's "4 x 50"
+        if "4 x 50" in name or "4x50" in name: distance = "200"
+        elif "4 x 100" in name or "4x100" in name: distance = "400"
+        else: return raw_name
+    else:
+        distance = dist_match.group(2)
+
+    # 2. Extract Style
+    style = None
+    if "libre" in name or "free" in name:
+        style = "Free"
+    elif "espalda" in name or "back" in name:
+        style = "Back"
+    elif "pecho" in name or "breast" in name:
+        style = "Breast"
+    elif "mariposa" in name or "fly" in name:
+        style = "Fly"
+    elif "combinado" in name or "medley" in name or "ci" in name or "im" in name:
+        # "CI" = Combinado Individual usually, but sometimes used in Relays "Combinado Relevo"
+        style = "IM"
+        # If it's a relay, "IM Relay" is usually called "Medley Relay" in DB keys
+        if is_relay: style = "Medley"
+
+    if not style:
+        return raw_name
+
+    # 3. Construct DB Name
+    final_name = f"{distance} {style}"
+
+    if is_relay:
+        final_name += " Relay"
+
+    return final_name
+
+
+def resolve_db_event_names(display_name):
+    if not isinstance(display_name, str):
+        return [display_name]
+    if display_name in EVENT_ES_TO_DB_MULTI:
+        return EVENT_ES_TO_DB_MULTI[display_name]
+
+    # Try exact match first
+    mapped = EVENT_ES_TO_DB.get(display_name)
+    if mapped:
+        return [mapped]
+
+    # Try fallback normalization
+    normalized = normalize_scraped_event_name(display_name)
+    return [normalized]
+
+
+def extract_style(event_name):
+    name = event_name.lower()
+    if 'free' in name or 'libre' in name: return 'Libre'
+    if 'back' in name or 'espalda' in name: return 'Espalda'
+    if 'breast' in name or 'pecho' in name: return 'Pecho'
+    if 'fly' in name or 'mariposa' in name: return 'Mariposa'
+    if 'im' in name or 'medley' in name or 'combinado' in name: return 'Combinado'
+    return 'Otro'
+
+
+def canonical_event_code(raw_name):
+    """'Mujeres 400 Metro Libre' / '4x100 IM' / '50 metros Libre' -> canonical code, or None."""
+    if not isinstance(raw_name, str):
+        return None
+    name = " ".join(raw_name.split())
+    if not name:
+        return None
+    if name in _CODES:
+        return name
+    if name == "4x50 Free Relay":
+        return "200 Free Relay"
+    if name in EVENT_ES_TO_DB:
+        return EVENT_ES_TO_DB[name]
+    if _RELAY_LEG_RE.search(name):
+        return None
+
+    m = _RELAY_NxD_RE.match(name)
+    if m:
+        legs, stroke = m.groups()
+        stroke = "Free" if stroke.lower() == "free" else "Medley"
+        code = f"{int(legs) * 4} {stroke} Relay"
+        return code if code in _CODES else None
+
+    code = normalize_scraped_event_name(name)
+    return code if code in _CODES else None
+
+
+def _event_row(code, distance, stroke, is_relay):
+    name_es = EVENT_DB_TO_ES.get(code, code)
+    return (code, distance, stroke, STROKE_ES.get(stroke, "Otro"), is_relay, name_es, code, 1)
+
+
+def seed_events(conn):
+    """Inserts the canonical events and their code/Spanish-name aliases (idempotent)."""
+    conn.executemany('''
+        INSERT OR IGNORE INTO events
+            (code, distance, stroke, stroke_es, is_relay, name_es, name_en, is_standard)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [_event_row(*e) for e in EVENTS])
+    aliases = [(code, code) for code in _CODES]
+    aliases += [(es, code) for es, code in EVENT_ES_TO_DB.items()]
+    aliases.append(("4x50 Free Relay", "200 Free Relay"))
+    conn.executemany('''
+        INSERT OR IGNORE INTO event_aliases (alias, event_id)
+        SELECT ?, id FROM events WHERE code = ?
+    ''', aliases)
+
+
+def resolve_event_id(conn, raw_name):
+    """Returns events.id for a raw event name, registering the alias (and a
+    non-standard event when it doesn't map to a canonical one) on first sight."""
+    if raw_name is None:
+        return None
+    row = conn.execute("SELECT event_id FROM event_aliases WHERE alias = ?", (raw_name,)).fetchone()
+    if row:
+        return row[0]
+
+    code = canonical_event_code(raw_name)
+    if code is None:
+        # Unknown names keep their own event so event_id is never NULL
+        code = " ".join(str(raw_name).split()) or str(raw_name)
+        dist = re.match(r'^(\d+)\b', code)
+        is_relay = 1 if (_RELAY_LEG_RE.search(code) or "relay" in code.lower() or "relevo" in code.lower()) else 0
+        conn.execute('''
+            INSERT OR IGNORE INTO events
+                (code, distance, stroke, stroke_es, is_relay, name_es, name_en, is_standard)
+            VALUES (?, ?, NULL, ?, ?, ?, ?, 0)
+        ''', (code, int(dist.group(1)) if dist else None, extract_style(code), is_relay, code, code))
+
+    conn.execute('''
+        INSERT OR IGNORE INTO event_aliases (alias, event_id)
+        SELECT ?, id FROM events WHERE code = ?
+    ''', (raw_name, code))
+    return conn.execute("SELECT event_id FROM event_aliases WHERE alias = ?", (raw_name,)).fetchone()[0]
+
+
+def register_aliases(conn, raw_names):
+    """resolve_event_id() over a batch; used before bulk inserts that leave
+    event_id to the `trg_*_event_id` triggers."""
+    for name in set(raw_names):
+        resolve_event_id(conn, name)
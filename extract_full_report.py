@@ -1,27 +1,25 @@
-import sqlite3
 import pandas as pd
-import os
-import shutil
 import time
+import mm_snapshot
 
 # Constants
 LIVE_DB_PATH = '/Users/jrb/Library/Containers/7F2BC93B-8FAC-48B0-BF83-D128B1ADF11C/Data/Documents/MeetMobile.db'
 DB_PATH = 'meet_mobile_dump.db'
 JAN_1_2025_TIMESTAMP = 1735689600
 
+# Consistent snapshot of the app's DB, re-taken only when it changed (see mm_snapshot.py)
+snapshot = mm_snapshot.MeetMobileSnapshot(LIVE_DB_PATH, DB_PATH)
+
 def refresh_db():
     try:
-        if os.path.exists(LIVE_DB_PATH):
-            shutil.copy2(LIVE_DB_PATH, DB_PATH)
+        if snapshot.refresh():
             print("Synced with live Meet Mobile DB.")
-        else:
-            print("Live DB not found, using cached.")
     except Exception as e:
         print(f"Sync error: {e}")
 
 def get_connection():
     refresh_db()
-    return sqlite3.connect(DB_PATH)
+    return snapshot.connect()
 
 def extract_report():
     conn = get_connection()
@@ -94,7 +92,7 @@ def extract_report():
         print(f"Success! Exported {len(df)} rows to '{filename}'")
         print(df.head())
 
-    conn.close()
+    snapshot.close()
 
 if __name__ == "__main__":
     extract_report()
@@ -38,6 +38,18 @@ ROOT_DIR = os.path.dirname(BASE_DIR)
 DB_PATH = os.path.join(ROOT_DIR, "data", "natacion.db")
 TEAM_ID = "10034725" # Rama Peñalolén
 
+# Shared modules (db_schema, ...) live in the project root next to main.py.
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import db_schema
+import sync_metrics
+from time_codec import format_seconds, format_seconds_series
+from meet_dates import normalize_meet_date
+from event_catalog import extract_style
+from qualifiers import find_qualifiers, QUALIFIED, NEAR_MISS
+from standards import StandardsIndex
+from categories import categorize, category_for, category_bounds, parse_birth_dates, age_at, INDIVIDUAL_AGES, GROUPS
+
 st.set_page_config(page_title="RamaCloud", page_icon="🏊", layout="wide", initial_sidebar_state="collapsed")
 
 import base64
@@ -46,169 +58,6 @@ def html_block(s):
     # Strip all leading indentation to avoid Markdown code blocks.
     return "\n".join([line.lstrip() for line in textwrap.dedent(s).splitlines()])
 
-EVENT_DB_TO_ES = {
-    "50 Free": "50 metros Libre",
-    "100 Free": "100 metros Libre",
-    "200 Free": "200 metros Libre",
-    "400 Free": "400 metros Libre",
-    "800 Free": "800 metros Libre",
-    "1500 Free": "1500 metros Libre",
-    "50 Back": "50 metros Espalda",
-    "100 Back": "100 metros Espalda",
-    "200 Back": "200 metros Espalda",
-    "50 Breast": "50 metros Pecho",
-    "100 Breast": "100 metros Pecho",
-    "200 Breast": "200 metros Pecho",
-    "50 Fly": "50 metros Mariposa",
-    "100 Fly": "100 metros Mariposa",
-    "200 Fly": "200 metros Mariposa",
-    "100 IM": "100 metros Combinado (Solo en piscina corta 25m)",
-    "200 IM": "200 metros Combinado",
-    "400 IM": "400 metros Combinado",
-    "200 Free Relay": "4 x 50 metros Libre",
-    "400 Free Relay": "4 x 100 metros Libre",
-    "800 Free Relay": "4 x 200 metros Libre",
-    "200 Medley Relay": "4 x 50 metros Combinado",
-    "400 Medley Relay": "4 x 100 metros Combinado",
-    "400 Mixed Free Relay": "4 x 100 metros Mixto (Libre o Combinado)",
-    "400 Mixed Medley Relay": "4 x 100 metros Mixto (Libre o Combinado)",
-    "25 Free": "25 metros Libre",
-    "25 Back": "25 metros Espalda",
-    "25 Breast": "25 metros Pecho",
-    "25 Fly": "25 metros Mariposa",
-    "25 IM": "25 metros Combinado",
-    "100 Free Relay": "4 x 25 metros Libre",
-    "100 Medley Relay": "4 x 25 metros Combinado",
-    "4x50 Free Relay": "4 x 50 metros Libre",
-}
-
-EVENT_ES_TO_DB = {
-    "50 metros Libre": "50 Free",
-    "100 metros Libre": "100 Free",
-    "200 metros Libre": "200 Free",
-    "400 metros Libre": "400 Free",
-    "800 metros Libre": "800 Free",
-    "1500 metros Libre": "1500 Free",
-    "50 metros Espalda": "50 Back",
-    "100 metros Espalda": "100 Back",
-    "200 metros Espalda": "200 Back",
-    "50 metros Pecho": "50 Breast",
-    "100 metros Pecho": "100 Breast",
-    "200 metros Pecho": "200 Breast",
-    "50 metros Mariposa": "50 Fly",
-    "100 metros Mariposa": "100 Fly",
-    "200 metros Mariposa": "200 Fly",
-    "100 metros Combinado (Solo en piscina corta 25m)": "100 IM",
-    "200 metros Combinado": "200 IM",
-    "400 metros Combinado": "400 IM",
-    "4 x 50 metros Libre": "200 Free Relay",
-    "4 x 100 metros Libre": "400 Free Relay",
-    "4 x 200 metros Libre": "800 Free Relay",
-    "4 x 50 metros Combinado": "200 Medley Relay",
-    "4 x 100 metros Combinado": "400 Medley Relay",
-    "4 x 100 metros Mixto (Libre o Combinado)": "400 Mixed Free Relay",
-    "25 metros Libre": "25 Free",
-    "25 metros Espalda": "25 Back",
-    "25 metros Pecho": "25 Breast",
-    "25 metros Mariposa": "25 Fly",
-    "25 metros Combinado": "25 IM",
-    "4 x 25 metros Libre": "100 Free Relay",
-    "4 x 25 metros Combinado": "100 Medley Relay",
-}
-
-EVENT_ES_TO_DB_MULTI = {
-    "4 x 100 metros Mixto (Libre o Combinado)": ["400 Mixed Free Relay", "400 Mixed Medley Relay"],
-    "4 x 50 metros Libre": ["200 Free Relay", "4x50 Free Relay"],
-}
-
-def get_event_display_name(event_name):
-    if not isinstance(event_name, str):
-        return event_name
-    en = event_name.strip()
-    if en in EVENT_DB_TO_ES:
-        return EVENT_DB_TO_ES[en]
-        
-    # If not exactly matching, try normalizing it first (e.g. "Mujeres 9-10 400 Metro Libre" -> "400 Free")
-    norm = normalize_scraped_event_name(en)
-    if norm in EVENT_DB_TO_ES:
-        return EVENT_DB_TO_ES[norm]
-        
-    return norm
-
-def normalize_scraped_event_name(raw_name):
-    """
-    Normalizes 'Mujeres 9-10 400 Metro Libre' -> '400 Free'
-    Handles Relays to avoid false positives (e.g. '200 Relevo' != '200 Individual')
-    """
-    if not isinstance(raw_name, str):
-        return raw_name
-        
-    name = raw_name.lower()
-    
-    # Check for Relay
-    is_relay = "relevo" in name or "relay" in name
-    
-    # 1. Extract Distance
-    import re
-    # Match number at start of string or after space
-    # Look for 4x50, 4x100 patterns for Relays
-    if is_relay:
-        # Simple logic: if it's a relay, we append "Relay" to style
-        # But we must capture the distance logic if possible, or usually Relays are 200 (4x50) or 400 (4x100) or 800 (4x200)
-        # For qualification purpose, if we return "200 Free Relay", it won't match "200 Free" standard.
-        pass
-    
-    dist_match = re.search(r'(\b|^)(25|50|100|200|400|800|1500)(\b|$)', name)
-    if not dist_match:
-        # Maybe it's "4 x 50"
-        if "4 x 50" in name or "4x50" in name: distance = "200"
-        elif "4 x 100" in name or "4x100" in name: distance = "400"
-        else: return raw_name
-    else:
-        distance = dist_match.group(2)
-    
-    # 2. Extract Style
-    style = None
-    if "libre" in name or "free" in name:
-        style = "Free"
-    elif "espalda" in name or "back" in name:
-        style = "Back"
-    elif "pecho" in name or "breast" in name:
-        style = "Breast"
-    elif "mariposa" in name or "fly" in name:
-        style = "Fly"
-    elif "combinado" in name or "medley" in name or "ci" in name or "im" in name:
-        # "CI" = Combinado Individual usually, but sometimes used in Relays "Combinado Relevo"
-        style = "IM"
-        # If it's a relay, "IM Relay" is usually called "Medley Relay" in DB keys
-        if is_relay: style = "Medley"
-        
-    if not style:
-        return raw_name
-        
-    # 3. Construct DB Name
-    final_name = f"{distance} {style}"
-    
-    if is_relay:
-        final_name += " Relay"
-        
-    return final_name
-
-def resolve_db_event_names(display_name):
-    if not isinstance(display_name, str):
-        return [display_name]
-    if display_name in EVENT_ES_TO_DB_MULTI:
-        return EVENT_ES_TO_DB_MULTI[display_name]
-        
-    # Try exact match first
-    mapped = EVENT_ES_TO_DB.get(display_name)
-    if mapped:
-        return [mapped]
-        
-    # Try fallback normalization
-    normalized = normalize_scraped_event_name(display_name)
-    return [normalized]
-
 def get_img_as_base64(file):
     with open(file, "rb") as f:
         data = f.read()
@@ -742,83 +591,153 @@ def render_swimmer_card(row):
     </div>
     """), unsafe_allow_html=True)
 
+_schema_checked = False
+
 def get_connection():
+    global _schema_checked
     if not os.path.exists(DB_PATH):
         st.error(f"Database not found at {DB_PATH}. Please check volume mapping.")
         return None
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    if not _schema_checked:
+        # Apply pending migrations once per process (indexes, new columns).
+        db_schema.migrate(conn)
+        _schema_checked = True
+    return conn
+
+# --- DATA CACHE ---
+# Loaders are cached across sessions with st.cache_data, keyed on the DB's
+# data_version counter (bumped by triggers on every write, see db_schema
+# migration 007) instead of a TTL: reruns with an unchanged DB never touch
+# SQLite, and any write (admin edits, Sincronizar, crawlers) invalidates.
+
+def get_data_version():
+    conn = get_connection()
+    if not conn: return None
+    try:
+        return db_schema.data_version(conn)
+    finally:
+        conn.close()
 
-def load_national_records():
+@st.cache_resource
+def get_cache_stats():
+    # Shared by every session: loader name -> calls / misses / load seconds
+    return {}
+
+def cached_loader(max_entries=4, resource=False):
+    # resource=True shares one object across sessions (st.cache_resource)
+    # instead of handing each caller a copy; only for read-only results.
+    def decorate(func):
+        name = func.__name__
+
+        def load(version, *args):
+            start = time.perf_counter()
+            df = func(*args)
+            stats = get_cache_stats().setdefault(name, {"calls": 0, "misses": 0, "load_s": 0.0})
+            stats["misses"] += 1
+            stats["load_s"] += time.perf_counter() - start
+            return df
+
+        # st.cache_data keys its store on the function's qualified name
+        load.__qualname__ = f"cached_{name}"
+        cache = st.cache_resource if resource else st.cache_data
+        cached = cache(show_spinner=False, max_entries=max_entries)(load)
+
+        def wrapper(*args):
+            stats = get_cache_stats().setdefault(name, {"calls": 0, "misses": 0, "load_s": 0.0})
+            stats["calls"] += 1
+            return cached(get_data_version(), *args)
+
+        wrapper.__name__ = name
+        wrapper.uncached = func
+        return wrapper
+    return decorate
+
+def cache_stats_df():
+    rows = []
+    for name, s in sorted(get_cache_stats().items()):
+        hits = s["calls"] - s["misses"]
+        rows.append({
+            "Loader": name,
+            "Llamadas": s["calls"],
+            "Aciertos": hits,
+            "Fallos": s["misses"],
+            "Tasa de acierto": f"{(hits / s['calls'] * 100):.0f}%" if s["calls"] else "—",
+            "Carga media (ms)": round(s["load_s"] / s["misses"] * 1000, 1) if s["misses"] else None,
+        })
+    return pd.DataFrame(rows)
+
+def load_sync_runs(limit=20):
+    # Not cached: sync_runs inserts don't bump data_version (see sync_metrics.py)
     conn = get_connection()
-    if not conn: return pd.DataFrame()
-    df = pd.read_sql("SELECT * FROM national_records", conn)
-    conn.close()
-    return df
+    if not conn: return []
+    try:
+        return sync_metrics.recent_runs(conn, limit)
+    finally:
+        conn.close()
 
-    return df
+def sync_runs_df(runs):
+    return pd.DataFrame([{
+        "Ejecución": run["id"],
+        "Inicio": run["started_at"],
+        "Fuente": run["source"],
+        "Estado": run["status"],
+        "Duración (s)": round(run["duration_s"] or 0, 1),
+        "Peticiones": run["requests"],
+        "MB": round(run["bytes"] / 1e6, 2),
+        "Filas": run["rows_written"],
+        "Errores": run["errors"],
+    } for run in runs])
+
+def render_sync_run_report(run):
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Duración", f"{run['duration_s'] or 0:.1f} s")
+    c2.metric("Peticiones", run["requests"])
+    c3.metric("Descargado", f"{run['bytes'] / 1e6:.1f} MB")
+    c4.metric("Filas escritas", run["rows_written"])
+    if run["error"]:
+        st.error(run["error"])
+
+    breakdown = sync_metrics.stage_breakdown(run)
+    if not breakdown:
+        st.info("Esta ejecución no registró etapas.")
+        return
+    st.dataframe(pd.DataFrame([{
+        "Etapa": name,
+        "Operaciones": n,
+        "Tiempo total (s)": round(total, 2),
+        "% de la ejecución": f"{share:.0%}",
+        "Media (ms)": round(mean, 1),
+        "p50 (ms)": p50,
+        "p95 (ms)": p95,
+        "Máx (ms)": round(mx),
+        "MB": round(nbytes / 1e6, 2),
+        "Errores": errors,
+    } for name, n, total, share, mean, p50, p95, mx, nbytes, errors in breakdown]),
+        use_container_width=True, hide_index=True)
+    st.caption("p50/p95 son el límite superior del tramo del histograma. En el crawler concurrente las etapas se solapan, "
+               "por lo que los porcentajes pueden sumar más de 100%.")
+
+    labels = sync_metrics.bucket_labels()
+    hist = pd.DataFrame([{"Tramo": label, "Etapa": name, "Operaciones": count}
+                         for name, stage in run["stages"].items()
+                         for label, count in zip(labels, stage["buckets"])])
+    fig = px.bar(hist, x="Tramo", y="Operaciones", color="Etapa", barmode="group",
+                 category_orders={"Tramo": labels}, title="Distribución de latencias por etapa")
+    st.plotly_chart(fig, use_container_width=True)
 
-def load_minimas():
+    if run["rows_by_table"]:
+        st.write("Filas por tabla: " + ", ".join(f"**{t}** {n}" for t, n in sorted(run["rows_by_table"].items())))
+
+@cached_loader(resource=True)
+def load_standards_index():
+    # Minimas + national records with category ranges and record times parsed
+    # once; (event_id, pool, gender, age) lookups are dict hits. See standards.py
     conn = get_connection()
-    if not conn: return pd.DataFrame()
-    df = pd.read_sql("SELECT * FROM minimum_standards", conn)
+    if not conn: return StandardsIndex(pd.DataFrame(), pd.DataFrame())
+    index = StandardsIndex.load(conn)
     conn.close()
-    return df
-
-def calculate_category(dob):
-    if pd.isnull(dob): return "Desconocida"
-    try:
-        today = datetime.now()
-        # Biological Age: Age on Dec 31st of current year
-        age = today.year - dob.year
-        
-        if age <= 10: return "Infantil A (y menor)"
-        if age == 11 or age == 12: return "Infantil B"
-        if age == 13 or age == 14: return "Juvenil A"
-        if age >= 15 and age <= 17: return "Juvenil B"
-        if age >= 18: return "Todo Competidor"
-        return "Desconocida"
-    except: return "Desconocida"
-
-def get_record_generic(df, event_name, pool_size, gender, category_code):
-    mapping = {
-        "Free": "Libre",
-        "Back": "Espalda",
-        "Breast": "Pecho",
-        "Fly": "Mariposa",
-        "IM": "Combinado",
-        "Medley": "Combinado"
-    }
-    
-    # 1. Translate to Spanish Keywords
-    trans_event = event_name
-    for k, v in mapping.items():
-        if k.lower() in trans_event.lower():
-            trans_event = trans_event.lower().replace(k.lower(), v).title()
-            
-    # 2. Normalize Function (Remove 'm', extra spaces, lower)
-    def normalize(s):
-        return s.lower().replace('m ', ' ').replace('m', '').replace('  ', ' ').strip()
-        
-    norm_target = normalize(trans_event)
-             
-    # Filter DF first by metadata
-    subset = df[
-        (df['pool_size'] == pool_size) & 
-        (df['gender'] == gender) &
-        (df['category_code'] == category_code)
-    ]
-    
-    # Fuzzy Match
-    for _, row in subset.iterrows():
-        db_evt = normalize(row['event_name'])
-        # Check if "100 espalda" is in "100 espalda"
-        if db_evt == norm_target:
-             return row
-        # Fallback: "100 libre" in "100m libre"
-        if db_evt in norm_target or norm_target in db_evt:
-             return row
-            
-    return None
+    return index
 
 def update_swimmer_info(updates_dob, updates_gender):
     conn = get_connection()
@@ -848,6 +767,7 @@ def update_swimmer_info(updates_dob, updates_gender):
         conn.close()
     return count
 
+@cached_loader()
 def load_swimmers():
     # DEBUG
     print(f"DEBUG: Connecting to {DB_PATH}")
@@ -867,46 +787,68 @@ def load_swimmers():
         df = pd.read_sql("SELECT id, name, url, team_id, NULL as birth_date, NULL as gender FROM swimmers WHERE team_id = ? ORDER BY name", conn, params=(TEAM_ID,))
     conn.close()
     
-    # robust_date_parsing: Waterfall strategy
-    # 1. Try ISO (YYYY-MM-DD) - Standard DB format
-    d_iso = pd.to_datetime(df['birth_date'], format='%Y-%m-%d', errors='coerce')
-    
-    # 2. Try Day-First (DD-MM-YYYY) - User input or scraped format
-    d_dmy = pd.to_datetime(df['birth_date'], dayfirst=True, errors='coerce')
-    
-    # 3. Combine: Prioritize ISO, fallback to DMY
-    df['birth_date'] = d_iso.fillna(d_dmy)
+    # ISO (YYYY-MM-DD) first, day-first fallback for user input/scraped dates
+    df['birth_date'] = parse_birth_dates(df['birth_date'])
     
     return df
 
 # --- CONSTANTS ---
 # TEAM_ID moved to top of file
 
+@cached_loader(max_entries=32)
 def load_results(swimmer_id):
     conn = get_connection()
     if not conn: return pd.DataFrame()
     query = """
-        SELECT r.id, r.event_name, r.time, r.pool_size, r.points, r.place, m.date, m.name as meet_name
+        SELECT r.id, r.event_name, r.event_id, e.name_es as event_display, e.stroke_es as style,
+               r.time, r.time_seconds as seconds, r.time_status,
+               r.pool_size, r.points, r.place, m.date, m.start_date, m.name as meet_name
         FROM results r
         JOIN meets m ON r.meet_id = m.id
+        LEFT JOIN events e ON r.event_id = e.id
         WHERE r.swimmer_id = ?
-        ORDER BY m.date DESC
+        ORDER BY m.start_date DESC
+    """
+    df = pd.read_sql(query, conn, params=(swimmer_id,))
+    conn.close()
+    return df
+
+@cached_loader(max_entries=32)
+def load_personal_bests(swimmer_id):
+    conn = get_connection()
+    if not conn: return pd.DataFrame()
+    query = """
+        SELECT pb.event_id, e.code as event_name, e.name_es as event_display,
+               r.time, pb.pool_size, m.date, m.start_date, m.name as meet_name,
+               pb.time_seconds as seconds
+        FROM personal_bests pb
+        JOIN results r ON pb.result_id = r.id
+        JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON pb.event_id = e.id
+        WHERE pb.swimmer_id = ?
+        ORDER BY e.code
     """
     df = pd.read_sql(query, conn, params=(swimmer_id,))
     conn.close()
     return df
 
+@cached_loader()
 def load_all_best_times():
     conn = get_connection()
     if not conn: return pd.DataFrame()
+    # Best Time Per Swimmer per Event per Pool, read from personal_bests
+    # (kept current by triggers on `results`, see db_schema migration 006).
     query = """
         SELECT 
             s.id as swimmer_id, s.name, s.birth_date, s.gender,
-            r.event_name, r.time, r.pool_size, r.points,
-            m.date
-        FROM results r
-        JOIN swimmers s ON r.swimmer_id = s.id
+            pb.event_id, e.code as event_name, e.name_es as event_display,
+            r.time, pb.pool_size, r.points,
+            m.start_date as date, pb.time_seconds as seconds
+        FROM swimmers s
+        JOIN personal_bests pb ON pb.swimmer_id = s.id
+        JOIN results r ON pb.result_id = r.id
         JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON pb.event_id = e.id
         WHERE s.team_id = ?
     """
     df = pd.read_sql(query, conn, params=(TEAM_ID,))
@@ -915,57 +857,36 @@ def load_all_best_times():
     if df.empty: return df
 
     # Parse dates and categs
-    df['birth_date'] = pd.to_datetime(df['birth_date'], errors='coerce')
-    current_year = datetime.now().year
-    
-    # Parse dates
-    df['birth_date'] = pd.to_datetime(df['birth_date'], errors='coerce')
+    df['birth_date'] = parse_birth_dates(df['birth_date'])
     df['date'] = pd.to_datetime(df['date'], errors='coerce')
     
-    df['category'] = df['birth_date'].apply(calculate_category)
-    df['seconds'] = df['time'].apply(parse_time)
-    df = df.dropna(subset=['seconds'])
-    
-    # Best Time Per Swimmer per Event per Pool
-    best_times = df.loc[df.groupby(['name', 'event_name', 'pool_size'])['seconds'].idxmin()]
+    df[['age', 'category', 'category_code']] = categorize(df['birth_date'])
     
-    return best_times
+    return df
 
+@cached_loader()
 def load_all_results():
     conn = get_connection()
     if not conn: return pd.DataFrame()
     query = """
         SELECT 
             s.id as swimmer_id, s.name, s.birth_date, s.gender,
-            r.event_name, r.time, r.pool_size, r.points, r.place,
-            m.date, m.name as meet_name
+            r.event_id, e.code as event_name, e.name_es as event_display,
+            r.time, r.time_seconds as seconds, r.pool_size, r.points, r.place,
+            m.date, m.start_date, m.name as meet_name
         FROM results r
         JOIN swimmers s ON r.swimmer_id = s.id
         JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON r.event_id = e.id
+        WHERE r.time_seconds IS NOT NULL
     """
     df = pd.read_sql(query, conn)
     conn.close()
     if df.empty: return df
-    df['seconds'] = df['time'].apply(parse_time)
-    df = df.dropna(subset=['seconds'])
-    df['event_display'] = df['event_name'].apply(get_event_display_name)
-    df['date_clean'] = df['date'].apply(clean_date_str)
-    df['date_obj'] = pd.to_datetime(df['date_clean'], errors='coerce')
+    df['date_obj'] = pd.to_datetime(df['start_date'], format='%Y-%m-%d', errors='coerce')
     df['year'] = df['date_obj'].dt.year
     return df
 
-def clean_date_str(d):
-    if not isinstance(d, str): return d
-    try:
-        if ',' in d:
-            parts = d.split(',')
-            year = parts[-1].strip()
-            date_part = parts[0]
-            return f"{date_part}, {year}"
-        return d
-    except:
-        return d
-
 def compute_cagr_improvement(yearly_best):
     if yearly_best is None or len(yearly_best) < 2:
         return None
@@ -1000,75 +921,6 @@ def best_time(df):
         return None
     return df['seconds'].min()
 
-def parse_time(time_str):
-    try:
-        if not time_str or not time_str[0].isdigit():
-            return None
-        if ':' in time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                return float(parts[0]) * 60 + float(parts[1])
-            elif len(parts) == 3:
-                return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
-        return float(time_str)
-    except:
-        return None
-
-def extract_style(event_name):
-    name = event_name.lower()
-    if 'free' in name or 'libre' in name: return 'Libre'
-    if 'back' in name or 'espalda' in name: return 'Espalda'
-    if 'breast' in name or 'pecho' in name: return 'Pecho'
-    if 'fly' in name or 'mariposa' in name: return 'Mariposa'
-    if 'im' in name or 'medley' in name or 'combinado' in name: return 'Combinado'
-    return 'Otro'
-
-def format_seconds(total_seconds):
-    try:
-        minutes = int(total_seconds // 60)
-        seconds = total_seconds % 60
-        return f"{minutes}:{seconds:05.2f}"
-    except:
-        return f"{total_seconds:.2f}"
-
-def calculate_category(dob_str):
-    if dob_str is None or pd.isna(dob_str): return "Desconocida"
-    
-    current_date = datetime.now()
-    birth_date = None
-
-    try:
-        # 1. If it's already a datetime/Timestamp
-        if isinstance(dob_str, (datetime, pd.Timestamp)):
-            birth_date = dob_str
-        # 2. If it's a string, try parsing
-        elif isinstance(dob_str, str):
-            # Normalize
-            s = dob_str.replace('/', '-')
-            if ' ' in s: s = s.split()[0] # Remove time part if present
-            
-            try:
-                birth_date = datetime.strptime(s, "%Y-%m-%d")
-            except:
-                # Fallback or try other formats?
-                pass
-        
-        if not birth_date:
-             return "Formato Inválido"
-
-        # BIOLOGICAL AGE CALCULATION
-        # Ensure birth_date is datetime-like for comparison
-        age = current_date.year - birth_date.year - ((current_date.month, current_date.day) < (birth_date.month, birth_date.day))
-        
-        if age <= 10: return f"{age} años"
-        if 11 <= age <= 12: return f"{age} años" 
-        if age <= 14: return f"{age} años"
-        if age <= 17: return "15-17 años"
-        return "18-99 años"
-    except Exception as e:
-        # print(f"Error calculating age for {dob_str}: {e}")
-        return "Fecha Inválida"
-
 def update_swimmer_dob(updates):
     # Backward compatibility wrapper if needed, but update_swimmer_info is primary
     return update_swimmer_info(updates, {})
@@ -1108,7 +960,9 @@ def update_meet_info(meet_id, new_name, new_date):
     conn = get_connection()
     try:
         cursor = conn.cursor()
-        cursor.execute("UPDATE meets SET name = ?, date = ? WHERE id = ?", (new_name, new_date, meet_id))
+        start_date, end_date = normalize_meet_date(new_date)
+        cursor.execute("UPDATE meets SET name = ?, date = ?, start_date = ?, end_date = ? WHERE id = ?",
+                       (new_name, new_date, start_date, end_date, meet_id))
         conn.commit()
     except Exception as e:
         st.error(f"Error updating meet info: {e}")
@@ -1228,37 +1082,16 @@ def go_to_home():
 
 # --- VIEWS ---
 
+@cached_loader()
 def load_meets():
     conn = get_connection()
     if not conn: return pd.DataFrame()
-    df = pd.read_sql("SELECT * FROM meets", conn)
+    df = pd.read_sql("SELECT * FROM meets ORDER BY start_date DESC", conn)
     conn.close()
-    
-    # Robust Date Parsing
-    def parse_smart_date(d_str):
-        if not isinstance(d_str, str): return pd.NaT
-        try:
-            # Clean up ranges: "Dec 5–6, 2025" -> "Dec 5, 2025"
-            # Remove en-dash, em-dash, hyphen range
-            clean = d_str
-            for sep in ['–', '—', '-']:
-                if sep in clean and ',' in clean:
-                    # heuristic: split by sep, take first part, append year if year is at end
-                    parts = clean.split(',')
-                    year = parts[-1]
-                    range_part = parts[0]
-                    if sep in range_part:
-                        start_day = range_part.split(sep)[0]
-                        clean = f"{start_day}, {year}"
-            
-            return pd.to_datetime(clean, errors='coerce')
-        except:
-            return pd.NaT
 
-    df['date_obj'] = df['date'].apply(parse_smart_date)
-    # Sort by date_obj descending (Newest first)
-    df = df.sort_values(by='date_obj', ascending=False)
-    
+    # start_date is normalized to ISO at ingest (meet_dates.normalize_meet_date)
+    df['date_obj'] = pd.to_datetime(df['start_date'], format='%Y-%m-%d', errors='coerce')
+
     return df
 
 def render_analysis_tab(swimmers_df):
@@ -1275,54 +1108,26 @@ def render_analysis_tab(swimmers_df):
     
     # 3. Category
     # Map friendly names to min-max ages
-    # Map friendly names to min-max ages
     cat_map = {}
-    # Individual ages 8 to 14
-    for age_n in range(8, 15):
-        # DB uses "11-11" for individual ages
+    # Individual ages 8 to 14; DB uses "11-11" for individual ages
+    for age_n in INDIVIDUAL_AGES:
         cat_map[f"{age_n} años"] = (age_n, age_n, f"{age_n}-{age_n}")
     
     # Groups
-    cat_map["15-17 años"] = (15, 17, "15-17")
-    cat_map["18-99 años"] = (18, 99, "18-99")
+    for low, high in GROUPS:
+        cat_map[f"{low}-{high} años"] = (low, high, f"{low}-{high}")
     
     cat_label = c3.selectbox("Categoría", list(cat_map.keys()), index=2) # Default Juvenil A
     cat_min, cat_max, cat_code = cat_map[cat_label]
     
     # --- Filter Swimmers ---
-    # Calculate Age
-    current_year = datetime.now().year
-    
-    def get_age(dob):
-        if not dob: return 0
-        try:
-            today = datetime.now()
-            return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-        except: return 0
-        
-    # Apply Filters
-    target_swimmers = []
-    
-    # We need to filter the dataframe
-    # Normalize gender input
-    g_target = gender # 'M' or 'F'
-    
-    for _, s in swimmers_df.iterrows():
-        # Check Gender
-        s_gen = str(s.get('gender', '')).upper().strip()
-        # Normalize s_gen
-        if s_gen in ['MALE', 'HOMBRE', 'MASCULINO']: s_gen = 'M'
-        if s_gen in ['FEMALE', 'MUJER', 'FEMENINO']: s_gen = 'F'
-        if s_gen.startswith('M'): s_gen = 'M'
-        if s_gen.startswith('F'): s_gen = 'F'
-        
-        if s_gen != g_target: continue
-        
-        # Check Age
-        age = get_age(s.get('birth_date'))
-        if not (cat_min <= age <= cat_max): continue
-        
-        target_swimmers.append(s['id'])
+    # Normalize gender ('MALE', 'Hombre', 'F', ...) to its first letter:
+    # every spelling in the DB starts with M or F except HOMBRE/MUJER.
+    g_norm = swimmers_df['gender'].fillna('').astype(str).str.upper().str.strip()
+    g_norm = g_norm.replace({'HOMBRE': 'M', 'MUJER': 'F'}).str[:1]
+    ages = age_at(swimmers_df['birth_date'])
+    in_cat = ((ages >= cat_min) & (ages <= cat_max)).fillna(False)
+    target_swimmers = swimmers_df.loc[(g_norm == gender) & in_cat, 'id'].tolist()
         
     if not target_swimmers:
         st.warning(f"No hay nadadores en la categoría {cat_label} ({gender}).")
@@ -1337,10 +1142,9 @@ def render_analysis_tab(swimmers_df):
     
     # Get distinct events (Ignoring Pool Size)
     q_events = f"""
-        SELECT DISTINCT event_name 
+        SELECT DISTINCT event_id 
         FROM results 
         WHERE swimmer_id IN ({ph})
-        ORDER BY event_name ASC
     """
     params = target_swimmers
     events_df = pd.read_sql(q_events, conn, params=params)
@@ -1387,74 +1191,36 @@ def render_analysis_tab(swimmers_df):
     
     selected_event_display = c4.selectbox("Prueba", display_list)
     
-    # Get DB Name
-    selected_event_db = EVENT_ES_TO_DB.get(selected_event_display, selected_event_display)
+    # Event ids for the selected display name (the mixed relay maps to two events)
+    selected_event_ids = [row[0] for row in conn.execute(
+        "SELECT id FROM events WHERE name_es = ? AND is_standard = 1", (selected_event_display,))]
+    eph = ",".join(["?"] * len(selected_event_ids)) or "NULL"
 
     # --- Get Times ---
+    # Best time per swimmer (MIN over the indexed time_seconds column)
     q_times = f"""
-        SELECT r.swimmer_id, r.time, s.name
+        SELECT r.swimmer_id, r.time, s.name, MIN(r.time_seconds) as seconds
         FROM results r
         JOIN swimmers s ON r.swimmer_id = s.id
         WHERE r.swimmer_id IN ({ph}) 
-          AND r.event_name = ?
+          AND r.event_id IN ({eph})
+          AND r.time_seconds IS NOT NULL
+        GROUP BY r.swimmer_id
+        ORDER BY seconds ASC
     """
-    params_t = target_swimmers + [selected_event_db]
+    params_t = target_swimmers + selected_event_ids
     times_df = pd.read_sql(q_times, conn, params=params_t)
     conn.close()
     
     if times_df.empty:
         st.warning("No hay tiempos.")
         return
-
-    # Convert Time to Seconds
-    times_df['seconds'] = times_df['time'].apply(parse_time)
-    # Remove rows where seconds is None
-    times_df = times_df.dropna(subset=['seconds'])
-    
-    # Keep only best time per swimmer
-    times_df = times_df.sort_values('seconds').drop_duplicates('swimmer_id')
     
     # --- Get Reference Values (Minima/Record) ---
-    minimas_df = load_minimas()
-    records_df = load_national_records()
-    
-    val_minima = None
-    minima_text = ""
-    if not minimas_df.empty:
-        # Filter (Try to find ANY matching minima, prefer 50m if usually standard, or lowest)
-        m_row = minimas_df[
-            (minimas_df['event_name'] == selected_event_db) &
-            (minimas_df['gender'] == gender) &
-            (minimas_df['category_code'] == cat_code)
-        ]
-        if not m_row.empty:
-             val_minima = m_row['time_seconds'].min()
-             # Get text for this minimum
-             minima_text = m_row.loc[m_row['time_seconds'].idxmin()]['time_text']
-
-    val_record = None
-    record_text = ""
-    if not records_df.empty:
-         r_row = records_df[
-            (records_df['event_name'] == selected_event_db) &
-            (records_df['gender'] == gender) &
-            (records_df['category_code'] == cat_code) 
-         ]
-         if r_row.empty:
-             # Try fuzzy match
-             potentials = records_df[
-                (records_df['event_name'] == selected_event_db) &
-                (records_df['gender'] == gender)
-             ]
-             for _, r in potentials.iterrows():
-                 c_clean = r['category_code'].replace(' años', '').replace(' ', '')
-                 if c_clean == cat_code:
-                     r_row = pd.DataFrame([r])
-                     break
-                     
-         if not r_row.empty:
-             record_text = r_row.iloc[0]['time']
-             val_record = parse_time(record_text)
+    # Fastest standard across pools for the youngest age in the category
+    standards = load_standards_index()
+    val_minima, minima_text = standards.best_minima(selected_event_ids, gender, cat_min) or (None, "")
+    val_record, record_text = standards.best_record(selected_event_ids, gender, cat_min) or (None, "")
              
     # --- Plot ---
     # Bar Chart
@@ -1499,7 +1265,7 @@ def render_analysis_tab(swimmers_df):
                 tick_vals.append(curr)
             curr += step
             
-        tick_text = [format_seconds(t) for t in tick_vals]
+        tick_text = format_seconds_series(tick_vals).tolist()
     else:
         tick_vals = []
         tick_text = []
@@ -1526,13 +1292,6 @@ def render_analysis_tab(swimmers_df):
     st.plotly_chart(fig, use_container_width=True)
     
 
-def get_category_code_for_minima(age):
-    if age < 10: return None
-    if age <= 14: return f"{age}-{age}"
-    if 15 <= age <= 17: return "15-17"
-    if age >= 18: return "18-99"
-    return None
-
 def render_qualifiers_tab(swimmers_df):
     st.subheader("🏅 Clasificados al Nacional")
     st.markdown("Lista de nadadores que han logrado marcas mínimas oficiales.")
@@ -1540,101 +1299,52 @@ def render_qualifiers_tab(swimmers_df):
     # 1. Load All Data
     with st.spinner("Analizando tiempos..."):
         all_results = load_all_best_times()
-        minimas_df = load_minimas()
+        minimas_df = load_standards_index().minimas
         
     if all_results.empty or minimas_df.empty:
         st.warning("No hay suficientes datos para calcular clasificados.")
         return
 
-    # 2. Process Qualifiers
-    qualifiers = []
-    
-    # Pre-process minimas for fast lookup: (event_name, gender, category_code, pool_size) -> seconds
-    # Note: We should normalize event names. For now rely on consistent DB names (e.g. "50 Free", "100 Back")
-    # But `all_results` has `event_name` from `results` table (Usually Spanish "50 metros Libre" etc or English?)
-    # CHECK: `load_all_best_times` joins `results` table. `results.event_name` is typically what was scraped/imported.
-    # Earlier we saw "400 metros Libre" in basic display, but "400 Free" in minima DB.
-    # We must MAP result event names to minima event names.
-    
-    # Create lookup dict for minimas
-    # Key: (event_db_name, gender, category_code, pool_size) -> time_seconds
-    minima_lookup = {}
-    for _, row in minimas_df.iterrows():
-        k = (row['event_name'], row['gender'], row['category_code'], row['pool_size'])
-        minima_lookup[k] = row['time_seconds']
-        
-    # Helper to calculate age
-    current_year = datetime.now().year
-    
-    # Group results by swimmer to avoid re-calcing age too much
-    # But we need to iterate every result? No, best time per event per swimmer.
-    
-    # Filter best times per swimmer/event/pool
-    # Sort by time asc, drop duplicates
-    best_times = all_results.sort_values('seconds').drop_duplicates(subset=['swimmer_id', 'event_name', 'pool_size'])
-    
-    total_checks = 0
-    
-    for _, row in best_times.iterrows():
-        # Get Swimmer Info
-        s_name = row['name']
-        dob = row['birth_date']
-        gender = row['gender']
-        if not dob or not gender: continue
-        
-        
-        # Calculate Age
-        try:
-            today = datetime.now()
-            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-        except: continue
-        
-        cat_code = get_category_code_for_minima(age)
-        if not cat_code: continue
-        
-        # Get Event DB Name
-        # `row['event_name']` is likely "50 metros Libre". Map to "50 Free".
-        evt_display = row['event_name']
-        evt_db_list = resolve_db_event_names(evt_display) # Returns list, usually 1
-        
-        pool_size = row['pool_size'] # "25m" or "50m"
-        
-        my_time = row['seconds']
-        
-        for evt_db in evt_db_list:
-            # Check Minima
-            # Key: (event_db, gender, cat_code, pool_size)
-            # Try exact pool size match first
-            limit = minima_lookup.get((evt_db, gender, cat_code, pool_size))
-            
-            # If valid limit and my_time <= limit
-            if limit and my_time <= limit:
-                # QUALIFIED!
-                # Calculate % improvement or diff?
-                diff = limit - my_time
-                
-                qualifiers.append({
-                    "Nadador": s_name,
-                    "Edad": age,
-                    "Género": gender,
-                    "Prueba": evt_display,
-                    "Piscina": pool_size,
-                    "Tiempo": row['time'], # Original string
-                    "Mínima": format_seconds(limit),
-                    "Diff": f"-{diff:.2f}s",
-                    "Fecha": row['date'],
-                    "Torneo": row.get('meet_name', '') # strictly load_all_best_times might not have meet_name but query above didn't select it? 
-                    # Checking `load_all_best_times` query: it selects `m.date`, does it select `m.name`? 
-                    # It selects `s.id... r.event_name... m.date`. NO m.name. 
-                    # We can leave Torneo empty or add it to query. Let's leave empty for now to avoid breaking schema.
-                })
-                
-    if not qualifiers:
-        st.info(f"No se han encontrado marcas mínimas (Revisados {len(best_times)} tiempos).")
-        return
-        
-    q_df = pd.DataFrame(qualifiers)
-    
+    near_pct = st.slider("Mostrar también a quienes están a menos de (%) de la mínima",
+                         0.0, 10.0, 2.0, 0.5, key="qualifiers_near_pct")
+
+    # 2. Process Qualifiers: one merge of personal bests against the minimas on
+    # (event_id, gender, category_code, pool_size), see qualifiers.py
+    hits = find_qualifiers(all_results, minimas_df, near_miss_pct=near_pct)
+    hits_df = pd.DataFrame({
+        "Nadador": hits['name'],
+        "Edad": hits['age'],
+        "Género": hits['gender'],
+        "Prueba": hits['event_name'],
+        "Piscina": hits['pool_size'],
+        "Tiempo": hits['time'], # Original string
+        "Mínima": format_seconds_series(hits['limit_seconds']),
+        "Diff": (-hits['margin']).map("{:+.2f}s".format),
+        "Fecha": hits['date'],
+        "Estado": hits['status'],
+    })
+    q_df = hits_df[hits_df['Estado'] == QUALIFIED]
+    near_df = hits_df[hits_df['Estado'] == NEAR_MISS]
+
+    if q_df.empty:
+        st.info(f"No se han encontrado marcas mínimas (Revisados {len(all_results)} tiempos).")
+    else:
+        render_qualifier_groups(q_df)
+
+    if near_pct and not near_df.empty:
+        st.markdown("---")
+        st.markdown(f"#### 🎯 Cerca de la mínima (≤ {near_pct:g}%)")
+        st.dataframe(
+            near_df[['Nadador', 'Edad', 'Prueba', 'Piscina', 'Tiempo', 'Mínima', 'Diff']]
+            .sort_values(['Nadador', 'Piscina', 'Prueba']),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Diff": st.column_config.TextColumn("Falta", help="Tiempo por sobre la mínima"),
+            }
+        )
+
+def render_qualifier_groups(q_df):
     # UI Stats
     c1, c2, c3 = st.columns(3)
     c1.metric("Nadadores Clasificados", q_df['Nadador'].nunique())
@@ -1690,12 +1400,7 @@ def render_qualifiers_tab(swimmers_df):
             )
 
 def render_team_view(swimmers_df):
-    def get_display_data(row):
-        dob = row.get('birth_date')
-        if not dob: return "Desconocido"
-        return calculate_category(dob)
-    
-    swimmers_df['Categoría'] = swimmers_df.apply(get_display_data, axis=1)
+    swimmers_df['Categoría'] = categorize(swimmers_df['birth_date'])['category']
 
     # --- TEAM HEADER ---
     # --- TEAM HEADER (HERO STYLE) ---
@@ -1852,9 +1557,6 @@ def render_team_view(swimmers_df):
         st.markdown('<div style="height:1.25rem;"></div>', unsafe_allow_html=True)
 
         meets_df = load_meets()
-        if not meets_df.empty:
-            meets_df['_sort_date'] = pd.to_datetime(meets_df['date'], errors='coerce')
-            meets_df = meets_df.sort_values(by='_sort_date', ascending=False)
 
         all_results = load_all_results()
         total_results = len(all_results) if not all_results.empty else 0
@@ -1990,7 +1692,8 @@ def render_team_view(swimmers_df):
             "id": None, 
             "url": None,
             "date_obj": None,
-            "_sort_date": None,
+            "start_date": None,
+            "end_date": None,
             "name": "Nombre",
             "date": "Fecha",
             "location": "Ciudad",
@@ -2201,7 +1904,7 @@ def render_team_view(swimmers_df):
         with st.container():
             st.subheader("📝 Ingreso y Actualización de Datos")
             
-            t_dob, t_fechida, t_logs, t_other = st.tabs(["Actualizar Cumpleaños (Masivo)", "Sincronizar Global", "Registros de Acceso", "Otros"])
+            t_dob, t_fechida, t_runs, t_logs, t_other = st.tabs(["Actualizar Cumpleaños (Masivo)", "Sincronizar Global", "Reporte de Sincronización", "Registros de Acceso", "Otros"])
             
             with t_fechida:
                 st.markdown("### Sincronización Automática Global")
@@ -2265,6 +1968,10 @@ def render_team_view(swimmers_df):
                             
                             with st.expander("Ver bitácora de sincronización global"):
                                 st.text('\\n'.join(logger.logs))
+                            fechida_run = next((r for r in load_sync_runs() if r["id"] == resultado_f.get("run_id")), None)
+                            if fechida_run:
+                                with st.expander("Ver reporte de tiempos (Fechida)"):
+                                    render_sync_run_report(fechida_run)
                         except Exception as e:
                             import traceback
                             st.error("Error crítico detallado:")
@@ -2301,6 +2008,19 @@ def render_team_view(swimmers_df):
                             time.sleep(2)
                             st.rerun()
 
+            with t_runs:
+                st.markdown("### Ejecuciones de Sincronización")
+                st.caption("Cada sincronización (Swimcloud, Fechida, Meet Mobile) registra el tiempo de descarga, procesamiento y escritura en la base.")
+                runs = load_sync_runs()
+                if not runs:
+                    st.info("Aún no hay ejecuciones registradas.")
+                else:
+                    st.dataframe(sync_runs_df(runs), use_container_width=True, hide_index=True)
+                    selected_run = st.selectbox(
+                        "Ver detalle de la ejecución", runs,
+                        format_func=lambda r: f"#{r['id']} · {r['started_at']} · {r['source']} · {r['status']}")
+                    render_sync_run_report(selected_run)
+
             with t_logs:
                 st.subheader("🕵️ Registros de Acceso")
                 if st.button("Actualizar Logs"):
@@ -2341,6 +2061,14 @@ def render_team_view(swimmers_df):
                         except Exception as e:
                             st.error(f"Error durante la limpieza: {e}")
 
+                st.markdown("### Caché de Datos")
+                st.caption(f"Versión de datos actual: {get_data_version()}. Cada escritura en la base incrementa la versión e invalida la caché.")
+                stats_df = cache_stats_df()
+                if stats_df.empty:
+                    st.info("Sin estadísticas de caché todavía.")
+                else:
+                    st.dataframe(stats_df, use_container_width=True, hide_index=True)
+
 def render_profile_view(swimmer_id, swimmers_df):
     # Get Swimmer Data
     swimmer = swimmers_df[swimmers_df['id'] == swimmer_id].iloc[0]
@@ -2368,7 +2096,7 @@ def render_profile_view(swimmer_id, swimmers_df):
             <div class="swimmer-profile-stats">
                 <div class="swimmer-profile-stat">
                     <small>Categoría</small>
-                    <strong>{esc(calculate_category(swimmer.get('birth_date')))}</strong>
+                    <strong>{esc(category_for(swimmer.get('birth_date')))}</strong>
                 </div>
                 <div class="swimmer-profile-stat">
                     <small>Género</small>
@@ -2391,27 +2119,10 @@ def render_profile_view(swimmer_id, swimmers_df):
         return
 
     # Process Data
-    def clean_date(d):
-        if not isinstance(d, str): return d
-        try:
-            if ',' in d:
-                parts = d.split(',')
-                year = parts[-1].strip()
-                date_part = parts[0]
-                return f"{date_part}, {year}"
-            return d
-        except: return d
-
-    results_df['date_clean'] = results_df['date'].apply(clean_date)
-    results_df['date_obj'] = pd.to_datetime(results_df['date_clean'], errors='coerce')
+    results_df['date_obj'] = pd.to_datetime(results_df['start_date'], format='%Y-%m-%d', errors='coerce')
     results_df['date_str'] = results_df['date_obj'].dt.date 
     
     graph_df = results_df.dropna(subset=['date_obj']).copy()
-    graph_df['seconds'] = graph_df['time'].apply(parse_time)
-    results_df['seconds'] = results_df['time'].apply(parse_time)
-    results_df['style'] = results_df['event_name'].apply(extract_style)
-    results_df['event_display'] = results_df['event_name'].apply(get_event_display_name)
-    graph_df['event_display'] = graph_df['event_name'].apply(get_event_display_name)
     
     # --- TABS ---
     t_times, t_progression, t_stats = st.tabs(["⏱️ Tiempos", "📈 Progresión", "📊 Estadísticas"])
@@ -2454,15 +2165,15 @@ def render_profile_view(swimmer_id, swimmers_df):
              unique_events = sorted(graph_data['event_display'].unique())
              evt_display = st.selectbox("Seleccionar Prueba", unique_events)
          
-             db_event_names = resolve_db_event_names(evt_display)
-             subset = graph_df[graph_df['event_name'].isin(db_event_names)].sort_values('date_obj')
+             subset = graph_df[graph_df['event_display'] == evt_display].sort_values('date_obj')
+             event_ids = subset['event_id'].unique()
              
              # CRITICAL FIX: Remove rows with no time to ensure unconnected lines don't appear mid-chart
              subset = subset.dropna(subset=['seconds'])
              
              if not subset.empty:
                  # Create formatted time for tooltip
-                 subset['time_str'] = subset['seconds'].apply(format_seconds)
+                 subset['time_str'] = format_seconds_series(subset['seconds'])
                  
                  fig = px.line(
                      subset, 
@@ -2493,7 +2204,7 @@ def render_profile_view(swimmer_id, swimmers_df):
                  else: step = 10
                  
                  tick_vals = np.arange(int(min_y), int(max_y)+1, step)
-                 tick_text = [format_seconds(v) for v in tick_vals]
+                 tick_text = format_seconds_series(tick_vals).tolist()
                  
                  fig.update_layout(
                      yaxis=dict(
@@ -2507,8 +2218,7 @@ def render_profile_view(swimmer_id, swimmers_df):
                  )
                  
                 # Add Minimas and Records
-                 minimas_df = load_minimas()
-                 records_df = load_national_records()
+                 standards = load_standards_index()
                  
                  # Robust Gender Normalization
                  raw_gen = swimmer.get('gender')
@@ -2529,71 +2239,22 @@ def render_profile_view(swimmer_id, swimmers_df):
                  swimmer_dob = swimmer.get('birth_date')
                  
                  # Calculate Age for Lookup
-                 current_age = 0
-                 if swimmer_dob:
-                     try:
-                         # Ensure DOB is datetime
-                         if isinstance(swimmer_dob, str):
-                            bd = pd.to_datetime(swimmer_dob)
-                         else: bd = swimmer_dob
-                         today = datetime.now()
-                         # Proper age calculation: subtract 1 if birthday hasn't occurred yet this year
-                         current_age = today.year - bd.year - ((today.month, today.day) < (bd.month, bd.day))
-                     except: pass
+                 current_age = age_at(pd.Series([swimmer_dob])).fillna(0).iloc[0]
                  
-                 # Helper to find closest category match
-                 def find_match_val(df_source, p_size, s_gen, s_age, val_col):
-                     if df_source.empty: return None
-                     # Filter by Event, Pool, Gender
-                     # Normalized event names should match now
-                     f = df_source[
-                         (df_source['event_name'].isin(db_event_names)) & 
-                         (df_source['pool_size'] == p_size) & 
-                         (df_source['gender'] == s_gen)
-                     ]
-                     if f.empty: return None
-                     
-                     # Match Category Code
-                     # Simple heuristics for now as codes vary (11-12, 10-10, 11-12 años)
-                     # Strategy: Look for explicitly matching age range
-                     for _, r in f.iterrows():
-                         code = r['category_code'].replace(' años', '').replace(' ', '')
-                         # Handle "11-12"
-                         if '-' in code:
-                             try:
-                                 low, high = map(int, code.split('-'))
-                                 if low <= s_age <= high: return r[val_col]
-                             except: pass
-                         # Handle single digit "10" (often stored as 10-10)
-                         elif code.isdigit():
-                             if int(code) == s_age: return r[val_col]
-                         # Handle "Open"
-                         # Handle "Open"
-                         elif 'open' in code.lower() or 'todo' in code.lower() or 'absoluto' in code.lower():
-                             # Return the value for Open/Absoluto
-                             return r[val_col]
-                     return None
-
                  # Iterate over pools present in graph
                  pools = subset['pool_size'].unique()
                  for p in pools:
                      # Minima
-                     # Column name for time in seconds? 
-                     # minimum_standards: time_seconds
-                     val_min = find_match_val(minimas_df, p, swimmer_gen, current_age, 'time_seconds')
+                     val_min = standards.best_minima(event_ids, swimmer_gen, current_age, pools=[p])
                      if val_min:
+                         val_min = val_min[0]
                          fig.add_hline(y=val_min, line_dash="dash", line_color="red" if p=='50m' else "orange", 
                                        annotation_text=f"Minima {p} ({format_seconds(val_min)})", annotation_position="bottom right")
 
-                     # Record
-                     # national_records: time text. Need to parse? 
-                     # It doesn't have seconds column. Need helper.
-                     # Or assuming I adding check? The table schema didn't show seconds.
-                     # load_national_records just reads *.
-                     # Let's parse on fly.
-                     rec_row_time = find_match_val(records_df, p, swimmer_gen, current_age, 'time')
-                     if rec_row_time:
-                         rec_sec = parse_time(rec_row_time)
+                     # Record (time parsed once when the index is built)
+                     rec = standards.best_record(event_ids, swimmer_gen, current_age, pools=[p])
+                     if rec:
+                         rec_sec = rec[0]
                          if rec_sec:
                              fig.add_hline(y=rec_sec, line_dash="dot", line_color="gold",
                                            annotation_text=f"Record {p} ({format_seconds(rec_sec)})", annotation_position="top right")
@@ -2617,12 +2278,10 @@ def render_profile_view(swimmer_id, swimmers_df):
         # PBs Table
         st.subheader("Mejores Marcas Personales (PB)")
         
-        # Filter for valid times only
-        valid_times = results_df.dropna(subset=['seconds'])
+        best_df = load_personal_bests(swimmer_id)
         
-        if not valid_times.empty:
-            best_df = valid_times.loc[valid_times.groupby(['event_name', 'pool_size'])['seconds'].idxmin()].sort_values('event_name')
-            best_df['event_display'] = best_df['event_name'].apply(get_event_display_name)
+        if not best_df.empty:
+            best_df['date_str'] = pd.to_datetime(best_df['start_date'], format='%Y-%m-%d', errors='coerce').dt.date
             st.dataframe(
             best_df[['event_display', 'time', 'pool_size', 'date_str', 'meet_name']]
             .rename(columns={'event_display':'Prueba', 'time':'Mejor Tiempo', 'pool_size':'Piscina', 'date_str':'Fecha', 'meet_name':'Torneo'}),
@@ -2757,13 +2416,10 @@ def render_relay_builder():
     # --- FILTERS ---
     c1, c2 = st.columns([2, 1])
     
-    # Category Sort Order
-    cat_order = ["Infantil A (y menor)", "Infantil B", "Juvenil A", "Juvenil B", "Todo Competidor"]
-    categories = df['category'].unique()
-    avail_cats = [c for c in cat_order if c in categories]
-    # Add any others not in list
-    others = [c for c in categories if c not in cat_order]
-    avail_cats.extend(others)
+    # Category Sort Order: by age ("9 años" < "10 años" < "15-17 años"), unknown last
+    categories = pd.Series(df['category'].unique())
+    cat_low = category_bounds(categories)['low'].fillna(1000)
+    avail_cats = categories.iloc[cat_low.argsort(kind='stable')].tolist()
     
     selected_cat = c1.selectbox("Categoría", avail_cats, key="relay_cat")
     selected_pool = c2.radio("Piscina", ["50m", "25m"], index=0, horizontal=True, key="relay_pool")
@@ -0,0 +1,218 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from email.utils import formatdate
+import db_schema
+import cassettes
+
+# Persistent HTTP response cache for the crawlers (Swimcloud, Fechida).
+#
+# Responses live in their own SQLite file next to the main DB. Bodies are
+# content-addressed (sha256, zlib-compressed), so identical pages are stored once.
+# Per URL we keep the ETag / Last-Modified validators and when the body was
+# last confirmed current:
+#   - younger than `max_age` seconds -> served from disk, no request at all;
+#   - older -> conditional GET (If-None-Match / If-Modified-Since); a 304
+#     refreshes the timestamp and serves the stored body;
+#   - otherwise the new 200 body replaces the entry.
+# Any other status (429, 503, 404, ...) raises HttpStatusError: error pages are
+# never cached nor handed to a parser, so the crawl task fails and is retried.
+#
+# Callers pass a `fetch(url, headers) -> (status, headers, body_bytes)` (or an
+# async one to aget), so the cache works with curl_cffi and urllib alike.
+#
+#   python http_cache.py [stats|clear|prune DAYS]
+
+CACHE_PATH = os.path.join(os.path.dirname(db_schema.DB_PATH), "http_cache.db")
+DEFAULT_MAX_AGE = 3600
+
+class HttpStatusError(Exception):
+    def __init__(self, url, status):
+        super().__init__(f"HTTP {status} for {url}")
+        self.url = url
+        self.status = status
+
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS http_bodies (
+        sha256 TEXT PRIMARY KEY,
+        body BLOB NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS http_responses (
+        url TEXT PRIMARY KEY,
+        sha256 TEXT NOT NULL REFERENCES http_bodies(sha256),
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        validated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_http_responses_sha256 ON http_responses(sha256);
+'''
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+class HttpCache:
+    def __init__(self, path=CACHE_PATH, max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        # Used from the async crawler's event loop and its worker threads
+        self.lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "downloaded": 0, "uncached": 0, "bytes_saved": 0, "bytes_downloaded": 0}
+
+    # --- storage ---
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT b.body, r.etag, r.last_modified, r.fetched_at, r.validated_at, b.size
+                FROM http_responses r JOIN http_bodies b ON b.sha256 = r.sha256
+                WHERE r.url = ?
+            ''', (url,)).fetchone()
+        if not row:
+            return None
+        body, etag, last_modified, fetched_at, validated_at, size = row
+        return {"body": zlib.decompress(body), "etag": etag, "last_modified": last_modified,
+                "fetched_at": fetched_at, "validated_at": validated_at, "size": size}
+
+    def store(self, url, headers, body):
+        digest = hashlib.sha256(body).hexdigest()
+        etag = _header(headers, "ETag")
+        # Without validators, fall back to our own fetch time for If-Modified-Since
+        last_modified = _header(headers, "Last-Modified") or (None if etag else formatdate(usegmt=True))
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO http_bodies (sha256, body, size) VALUES (?, ?, ?)",
+                              (digest, zlib.compress(body), len(body)))
+            self.conn.execute('''
+                INSERT OR REPLACE INTO http_responses (url, sha256, etag, last_modified, fetched_at, validated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, digest, etag, last_modified, now, now))
+            self.conn.commit()
+
+    def touch(self, url):
+        with self.lock:
+            self.conn.execute("UPDATE http_responses SET validated_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    # --- request flow ---
+
+    def _plan(self, url, max_age):
+        """(cached entry or None, body to serve without a request or None, request headers)."""
+        entry = self.lookup(url)
+        if entry is None:
+            return None, None, {}
+        age = time.time() - entry["validated_at"]
+        if age < (self.max_age if max_age is None else max_age):
+            self.stats["fresh"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            return entry, entry["body"], {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return entry, None, headers
+
+    def _settle(self, url, entry, status, headers, body):
+        if status == 304 and entry is not None:
+            self.touch(url)
+            self.stats["revalidated"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            return entry["body"]
+        self.stats["bytes_downloaded"] += len(body or b"")
+        if status != 200:
+            self.stats["uncached"] += 1
+            raise HttpStatusError(url, status)
+        self.store(url, headers, body)
+        self.stats["downloaded"] += 1
+        return body
+
+    def get(self, url, fetch, max_age=None):
+        """Body bytes for `url`, going to the network only when needed."""
+        entry, body, headers = self._plan(url, max_age)
+        if body is not None:
+            return body
+        status, resp_headers, resp_body = fetch(url, headers)
+        return self._settle(url, entry, status, resp_headers, resp_body)
+
+    async def aget(self, url, afetch, max_age=None):
+        entry, body, headers = self._plan(url, max_age)
+        if body is not None:
+            return body
+        status, resp_headers, resp_body = await afetch(url, headers)
+        return self._settle(url, entry, status, resp_headers, resp_body)
+
+    # --- reporting / maintenance ---
+
+    def hit_ratio(self):
+        s = self.stats
+        total = s["fresh"] + s["revalidated"] + s["downloaded"] + s["uncached"]
+        return (s["fresh"] + s["revalidated"]) / total if total else 0.0
+
+    def summary(self):
+        s = self.stats
+        return (f"HTTP cache: {s['fresh']} fresh, {s['revalidated']} revalidated (304), "
+                f"{s['downloaded']} downloaded, hit ratio {self.hit_ratio():.0%}, "
+                f"{s['bytes_saved'] / 1e6:.1f} MB saved, {s['bytes_downloaded'] / 1e6:.1f} MB downloaded")
+
+    def prune(self, older_than_days):
+        cutoff = time.time() - older_than_days * 86400
+        with self.lock:
+            n = self.conn.execute("DELETE FROM http_responses WHERE validated_at < ?", (cutoff,)).rowcount
+            self.conn.execute("DELETE FROM http_bodies WHERE sha256 NOT IN (SELECT sha256 FROM http_responses)")
+            self.conn.commit()
+        return n
+
+    def close(self):
+        self.conn.close()
+
+
+def urllib_fetch(**urlopen_kwargs):
+    """fetch() for HttpCache.get over urllib (a 304 arrives as HTTPError)."""
+    def fetch(url, headers):
+        req = urllib.request.Request(cassettes.route(url), headers={'User-Agent': 'Mozilla/5.0', **headers})
+        try:
+            with urllib.request.urlopen(req, **urlopen_kwargs) as resp:
+                status, resp_headers, body = resp.status, dict(resp.headers), resp.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, dict(e.headers), b""
+            cassettes.record(url, e.code, dict(e.headers), e.read())
+            raise
+        cassettes.record(url, status, resp_headers, body)
+        return status, resp_headers, body
+    return fetch
+
+
+if __name__ == "__main__":
+    cache = HttpCache()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "clear":
+        print(f"Removed {cache.prune(-1)} cached responses.")
+    elif cmd == "prune":
+        print(f"Removed {cache.prune(float(sys.argv[2]))} cached responses.")
+    else:
+        urls, stored, raw = cache.conn.execute('''
+            SELECT (SELECT COUNT(*) FROM http_responses),
+                   (SELECT COALESCE(SUM(LENGTH(body)), 0) FROM http_bodies),
+                   (SELECT COALESCE(SUM(size), 0) FROM http_bodies)
+        ''').fetchone()
+        print(f"{cache.path}: {urls} URLs, {raw / 1e6:.1f} MB of bodies stored in {stored / 1e6:.1f} MB")
+    cache.close()
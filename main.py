@@ -2,10 +2,17 @@ import sqlite3
 import time
 import random
 import sys
-import re
 import os
 from curl_cffi import requests
-from bs4 import BeautifulSoup
+import db_schema
+import time_codec
+import meet_dates
+import event_catalog
+import http_cache
+import html_backends
+import crawl_frontier
+import cassettes
+import sync_metrics
 
 # Configuration
 DB_NAME = "natacion.db"
@@ -22,111 +29,504 @@ if os.path.exists("/app/data/natacion.db"):
 TEAM_ID = "10034725"
 BASE_URL = "https://www.swimcloud.com"
 TEAM_ROSTER_URL = f"{BASE_URL}/team/{TEAM_ID}/roster/"
+# A meet's results for the whole team (one page instead of one per swimmer).
+# Built from the site's URL scheme and checked against a hand-built fixture
+# only, so the meet-centric crawl using it (--by-meet) stays opt-in
+TEAM_MEET_RESULTS_URL = "{base}/results/{meet_id}/team/{team_id}/"
 EXTRA_SWIMMERS = [
     {"id": "3235418", "name": "Vicente Reyes", "url": "https://www.swimcloud.com/swimmer/3235418/"},
     {"id": "2739286", "name": "Amaro Gonzalez", "url": "https://www.swimcloud.com/swimmer/2739286/"}
 ]
 
+# --- Page parsers ---
+# Pure functions (html text in, plain data out) shared by the sequential
+# SwimcloudCrawler below and the asyncio engine in async_crawler.py.
+# `backend` picks the HTML parser (see html_backends.py; default: bs4).
+
+def parse_roster(html, backend=None):
+    """Roster page -> {swimmer_id: {'id', 'name', 'url'}}."""
+    swimmers = {}
+    soup = html_backends.parse(html, backend)
+    for link in soup.select('a[href^="/swimmer/"]'):
+        href = link.attr('href')
+        name = link.text()
+        swimmer_id = href.strip('/').split('/')[-1]
+        if swimmer_id.isdigit():
+            swimmers[swimmer_id] = {
+                'name': name.title(),
+                'url': f"{BASE_URL}{href}",
+                'id': swimmer_id
+            }
+    return swimmers
+
+
+def parse_swimmer_meets(html, backend=None):
+    """A swimmer's /meets/ page -> list of meet dicts in page order.
+
+    Keys: id, name, date, start_date, end_date, location, url. Meets whose
+    results link could not be found have id/url None.
+    """
+    soup = html_backends.parse(html, backend)
+    meets = []
+    for h3 in soup.select('h3.c-title'):
+        meet_name = h3.text()
+        if not meet_name:
+            continue
+
+        # Metadata in next sibling UL
+        ul = h3.next_sibling('ul', 'o-list-bare')
+        date_text = "Unknown"
+        start_date, end_date = None, None
+        location_text = "Unknown"
+
+        if ul:
+            # Recursive li text, e.g. ["Completed", "Dec 5-6", "SANTIAGO"]
+            text_parts = [li.text() for li in ul.select('li')]
+            clean_parts = [t for t in text_parts if "Completed" not in t and "Detailed" not in t]
+
+            # Heuristic: Last is location, Second to last is date (if present).
+            if len(clean_parts) >= 1:
+                location_text = clean_parts[-1]
+            if len(clean_parts) >= 2:
+                date_text = clean_parts[-2]
+                # Swimcloud range "Dec 5-6, 2025" -> start/end ISO; `date` keeps the start
+                start_date, end_date = meet_dates.normalize_meet_date(date_text)
+                if start_date:
+                    date_text = start_date
+
+        # Result link: traverse up to 3 levels to find a container with a link
+        # (meet names are not unique across years, so context matters).
+        meet_link = None
+        current_container = h3.parent
+        for _ in range(3):
+            if not current_container: break
+
+            # Check if container IS the link
+            if current_container.tag == 'a' and '/results/' in (current_container.attr('href') or ''):
+                meet_link = current_container
+                break
+
+            # Check for link inside container
+            found = current_container.find_link(r'/results/')
+            if found:
+                meet_link = found
+                break
+
+            current_container = current_container.parent
+
+        meet_id, meet_url = None, None
+        if meet_link:
+            meet_url_suffix = meet_link.attr('href')
+            parts = meet_url_suffix.strip('/').split('/')
+            meet_id = "unknown"
+            if 'results' in parts:
+                idx = parts.index('results')
+                if len(parts) > idx + 1:
+                    meet_id = parts[idx + 1]
+            meet_url = f"{BASE_URL}{meet_url_suffix}"
+
+        meets.append({
+            'id': meet_id, 'name': meet_name, 'date': date_text,
+            'start_date': start_date, 'end_date': end_date,
+            'location': location_text, 'url': meet_url,
+        })
+    return meets
+
+
+def _header_pool_size(soup):
+    header_ul = soup.select_one('ul.o-list-inline')
+    if header_ul:
+        header_text = header_ul.text(strip=False)
+        if " SC" in header_text or "Short Course" in header_text:
+            return "25m"
+        elif " LC" in header_text or "Long Course" in header_text:
+            return "50m"
+        elif "SCM" in header_text:
+            return "25m"
+        elif "LCM" in header_text:
+            return "50m"
+    return "Unknown"
+
+
+def _parse_result_row(cols, event_name, soup, header_pool):
+    """One results-table row -> result dict, or None when it has no /times/ link."""
+    # Clean up: remove "Timed Finals" suffix if stuck
+    event_name = event_name.replace("Timed Finals", "").strip()
+
+    final_time = "Unknown"
+    time_url = ""
+
+    # Find time link
+    for c in cols:
+        a_tag = c.find_link(r'/times/')
+        if a_tag:
+            final_time = a_tag.text()
+            time_url = f"{BASE_URL}{a_tag.attr('href')}"
+            break
+
+    if not time_url:
+        return None
+
+    # Pool size: event name first ("50 S Free", "100 L Free"), then the page header
+    pool_size = "Unknown"
+    if ' S ' in event_name or event_name.endswith(' S'):
+        pool_size = "25m"
+    elif ' L ' in event_name or event_name.endswith(' L'):
+        pool_size = "50m"
+    elif ' Y ' in event_name or event_name.endswith(' Y'):
+        pool_size = "25y"
+
+    if pool_size == "Unknown":
+        if header_pool[0] is None:
+            header_pool[0] = _header_pool_size(soup)
+        pool_size = header_pool[0]
+
+    # Place (Lugar): last TD when the row has 5+ columns
+    place = "—"
+    if len(cols) >= 5:
+        last_col_text = cols[-1].text()
+        if last_col_text:
+            place = last_col_text
+
+    return {
+        'event_name': event_name, 'time': final_time, 'time_url': time_url,
+        'points': "0", 'pool_size': pool_size, 'place': place,
+    }
+
+
+def _cell_event_name(cell):
+    # Extract Event Name cleaner (exclude span)
+    event_link = cell.select_one('a')
+    if event_link:
+        return event_link.text()
+    return cell.text()
+
+
+def parse_meet_results(html, backend=None):
+    """A swimmer's meet results page -> list of result dicts.
+
+    Keys: event_name, time, time_url, points, pool_size, place. Rows without a
+    /times/ link are skipped.
+    """
+    soup = html_backends.parse(html, backend)
+    results = []
+    header_pool = [None]
+
+    for row in soup.select('table.c-table-clean tbody tr'):
+        cols = row.select('td')
+        if not cols:
+            continue
+        result = _parse_result_row(cols, _cell_event_name(cols[0]), soup, header_pool)
+        if result:
+            results.append(result)
+    return results
+
+
+def parse_team_meet_results(html, backend=None):
+    """A meet's team results page -> result dicts with an extra 'swimmer_id'.
+
+    Rows are attributed through their /swimmer/<id>/ link. The event comes from
+    the first cell when it is not the swimmer cell (same layout as the swimmer
+    page), otherwise from the nearest heading above the table.
+    """
+    soup = html_backends.parse(html, backend)
+    results = []
+    header_pool = [None]
+
+    for row in soup.select('table tbody tr'):
+        cols = row.select('td')
+        swimmer_link = row.find_link(r'^/swimmer/\d+')
+        if not cols or not swimmer_link:
+            continue
+        swimmer_id = swimmer_link.attr('href').strip('/').split('/')[1]
+
+        if cols[0].find_link(r'^/swimmer/'):
+            heading = row.find_parent('table').find_previous(['h2', 'h3', 'h4', 'caption'])
+            event_name = heading.text() if heading else ""
+        else:
+            event_name = _cell_event_name(cols[0])
+
+        result = _parse_result_row(cols, event_name, soup, header_pool)
+        if result:
+            result['swimmer_id'] = swimmer_id
+            results.append(result)
+    return results
+
+
+def parse_splits(html, backend=None):
+    """/times/ page -> [(distance, split_time)] from the first table with split rows."""
+    soup = html_backends.parse(html, backend)
+    for table in soup.select('table'):
+        valid_splits = []
+        for row in table.select('tr'):
+            cols = row.select('td')
+            # Needs at least distance and time; distance starts with a digit
+            if len(cols) >= 2:
+                dist = cols[0].text()
+                split_val = cols[1].text()
+                if dist and dist[0].isdigit():
+                    valid_splits.append((dist, split_val))
+        if valid_splits:
+            return valid_splits
+    return []
+
+
+# --- DB writers ---
+# Shared by both crawlers so the sequential and async paths write the same rows.
+
+def meet_done_for_swimmer(conn, meet_id, swimmer_id):
+    return conn.execute('SELECT 1 FROM results WHERE meet_id = ? AND swimmer_id = ? LIMIT 1',
+                        (meet_id, swimmer_id)).fetchone() is not None
+
+
+def results_missing_splits(conn, meet_id, swimmer_ids):
+    """(result_id, time_url) for the swimmers' results in a meet that have no splits yet."""
+    ph = ",".join("?" * len(swimmer_ids))
+    return conn.execute(f'''
+        SELECT r.id, r.time_url FROM results r
+        WHERE r.meet_id = ? AND r.swimmer_id IN ({ph})
+          AND r.time_url LIKE 'http%'
+          AND NOT EXISTS (SELECT 1 FROM splits s WHERE s.result_id = r.id)
+        ORDER BY r.id
+    ''', (meet_id, *swimmer_ids)).fetchall()
+
+
+def result_has_splits(conn, result_id):
+    return conn.execute('SELECT 1 FROM splits WHERE result_id = ? LIMIT 1', (result_id,)).fetchone() is not None
+
+
+def plan_swimmer_meets(conn, writer, frontier, swimmer_id, meets):
+    """Saves a swimmer's new meets and queues their result pages; returns how many."""
+    processed_meets = set()
+    jobs = []
+    retry_splits = []
+    for meet in meets:
+        meet_id = meet['id']
+        if not meet_id:
+            print(f"    Warning: No link found for meet '{meet['name']}' (Checked 3 levels up)")
+            continue
+        if meet_id in processed_meets:
+            continue
+        processed_meets.add(meet_id)
+
+        # Skip if already processed for this swimmer
+        if meet_done_for_swimmer(conn, meet_id, swimmer_id):
+            print(f"    Skipping meet {meet_id} (Already exists for swimmer)")
+            retry_splits += results_missing_splits(conn, meet_id, [swimmer_id])
+            continue
+
+        writer.add_meet(meet)
+        jobs.append((meet['url'], {'meet_id': meet_id, 'swimmer_id': swimmer_id}))
+    # Meets are stored before their tasks are queued, so a resumed crawl finds them
+    writer.flush()
+    # The swimmer still has no results here: queue the page again even if an
+    # earlier task for it is done or gave up
+    frontier.add_many(crawl_frontier.MEET_RESULTS, jobs, revisit_after=0)
+    # Split pages that gave up (429s, timeouts) get another go on every visit;
+    # a done one was a real page without splits (50m events)
+    frontier.add_many(crawl_frontier.SPLITS, [(url, {'result_id': result_id}) for result_id, url in retry_splits],
+                      revisit_after=0, revisit_states=("failed",))
+    return len(jobs)
+
+
+def queue_missing_splits(conn, frontier, meet_id, swimmer_ids):
+    """Queues the /times/ pages of the swimmers' results in a meet that still lack splits."""
+    missing = results_missing_splits(conn, meet_id, swimmer_ids)
+    frontier.add_many(crawl_frontier.SPLITS, [(url, {'result_id': result_id}) for result_id, url in missing],
+                      revisit_after=0)
+    return len(missing)
+
+
+class BatchWriter:
+    """Buffers crawled rows and writes them with executemany, one transaction per flush.
+
+    Crawlers flush once per page (meet results, splits); the buffer also
+    flushes itself every `max_rows` pending rows. Opening a writer switches
+    the DB to WAL so the dashboard keeps reading during a crawl.
+    """
+
+    def __init__(self, conn, team_id=TEAM_ID, max_rows=500, metrics=None):
+        self.conn = conn
+        self.team_id = team_id
+        self.max_rows = max_rows
+        # Optional sync_metrics.SyncRun: one "db_write" observation per flush
+        self.metrics = metrics
+        db_schema.enable_wal(conn)
+        self.swimmers = []
+        self.meets = []
+        self.meet_pools = {}
+        self.results = []
+        self.splits = []
+        # (swimmer_id, meet_id, event_name) of buffered results, for the duplicate check
+        self.pending_keys = set()
+        self.counts = {"swimmers": 0, "meets": 0, "results": 0, "splits": 0}
+        self.transactions = 0
+        self.write_time = 0.0
+        self.started = time.perf_counter()
+
+    def pending(self):
+        return len(self.swimmers) + len(self.meets) + len(self.results) + len(self.splits)
+
+    def _maybe_flush(self):
+        if self.pending() >= self.max_rows:
+            self.flush()
+
+    def add_swimmer(self, swimmer):
+        self.swimmers.append((swimmer['id'], swimmer['name'], swimmer['url'], self.team_id))
+        self._maybe_flush()
+
+    def add_meet(self, meet):
+        self.meets.append((meet['id'], meet['name'], meet['date'], meet['start_date'],
+                           meet['end_date'], meet['location'], meet['url']))
+        self._maybe_flush()
+
+    def add_result(self, meet_id, swimmer_id, result):
+        """Queues one parsed result row; False if it already exists (stored or queued)."""
+        # Update Meet Pool Size if valid (the last valid pool seen wins)
+        if result['pool_size'] in ["25m", "50m"]:
+            self.meet_pools[meet_id] = result['pool_size']
+
+        # Check for duplicates
+        key = (swimmer_id, meet_id, result['event_name'])
+        if key in self.pending_keys or self.conn.execute(
+                "SELECT id FROM results WHERE swimmer_id=? AND meet_id=? AND event_name=?", key).fetchone():
+            return False
+
+        self.pending_keys.add(key)
+        self.results.append((swimmer_id, meet_id, result))
+        self._maybe_flush()
+        return True
+
+    def add_splits(self, result_id, splits):
+        """Queues the [(distance, split_time)] of a stored result; returns how many."""
+        self.splits += [(result_id, dist, val) for dist, val in splits]
+        self._maybe_flush()
+        return len(splits)
+
+    def flush(self):
+        if not self.pending() and not self.meet_pools:
+            return
+        before = dict(self.counts)
+        start = time.perf_counter()
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO swimmers (id, name, url, team_id) VALUES (?, ?, ?, ?)',
+                                  self.swimmers)
+            self.conn.executemany('INSERT OR IGNORE INTO meets (id, name, date, start_date, end_date, location, url) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                  self.meets)
+            self.conn.executemany("UPDATE meets SET pool_size = ? WHERE id = ?",
+                                  [(pool, meet_id) for meet_id, pool in self.meet_pools.items()])
+            self._write_results()
+            self.conn.executemany('INSERT INTO splits (result_id, distance, split_time) VALUES (?, ?, ?)', self.splits)
+        elapsed = time.perf_counter() - start
+        self.write_time += elapsed
+        self.transactions += 1
+        self.counts["swimmers"] += len(self.swimmers)
+        self.counts["meets"] += len(self.meets)
+        self.counts["splits"] += len(self.splits)
+        self.swimmers, self.meets, self.meet_pools, self.splits = [], [], {}, []
+        if self.metrics is not None:
+            self.metrics.observe("db_write", elapsed)
+            for table, n in self.counts.items():
+                self.metrics.add_rows(table, n - before[table])
+
+    def _write_results(self):
+        if not self.results:
+            return
+        event_ids = {name: event_catalog.resolve_event_id(self.conn, name)
+                     for name in dict.fromkeys(r['event_name'] for _, _, r in self.results)}
+        rows = []
+        for swimmer_id, meet_id, r in self.results:
+            time_seconds, time_status = time_codec.parse_result_time(r['time'])
+            rows.append((swimmer_id, meet_id, r['event_name'], event_ids[r['event_name']], r['time'], r['points'],
+                         r['pool_size'], r['time_url'], r['place'], time_seconds, time_status))
+        self.conn.executemany('''
+            INSERT INTO results (swimmer_id, meet_id, event_name, event_id, time, points, pool_size, time_url, place, time_seconds, time_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self.counts["results"] += len(rows)
+        self.results, self.pending_keys = [], set()
+
+    def summary(self):
+        rows = sum(self.counts.values())
+        elapsed = time.perf_counter() - self.started
+        c = self.counts
+        return (f"DB writer: {rows} rows ({c['swimmers']} swimmers, {c['meets']} meets, {c['results']} results, "
+                f"{c['splits']} splits) in {self.transactions} transactions, {self.write_time:.2f}s writing, "
+                f"{rows / elapsed if elapsed else 0:.0f} rows/s overall, "
+                f"{rows / self.write_time if self.write_time else 0:.0f} rows/s in transactions")
+
+
 class SwimcloudCrawler:
-    def __init__(self, db_path=DB_PATH):
+    def __init__(self, db_path=DB_PATH, cache=None):
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
         self.setup_db()
+        # Fetch/parse/write timings of this run, stored in sync_runs on close()
+        self.metrics = sync_metrics.SyncRun("swimcloud")
+        self.writer = BatchWriter(self.conn, metrics=self.metrics)
+        # Pages to visit live in crawl_tasks, so an interrupted crawl resumes
+        # where it stopped (see crawl_frontier.py)
+        self.frontier = crawl_frontier.CrawlFrontier(self.conn)
         self.session = requests.Session(impersonate="chrome120")
+        # Pages seen within the freshness window are served from disk; older
+        # ones are revalidated with a conditional GET (see http_cache.py)
+        self.cache = cache if cache is not None else http_cache.HttpCache()
+        # Politeness delay (seconds, min/max) after each request; None disables it
+        self.pace = (0.5, 1.0)
         self.page_source = ""
 
     def setup_db(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS swimmers (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                url TEXT,
-                team_id TEXT,
-                birth_date TEXT,
-                gender TEXT
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS meets (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                date TEXT,
-                location TEXT,
-                url TEXT,
-                pool_size TEXT
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                swimmer_id TEXT,
-                meet_id TEXT,
-                event_name TEXT,
-                time TEXT,
-                points TEXT,
-                pool_size TEXT,
-                time_url TEXT,
-                place TEXT,
-                FOREIGN KEY(swimmer_id) REFERENCES swimmers(id),
-                FOREIGN KEY(meet_id) REFERENCES meets(id)
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS splits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                result_id INTEGER,
-                distance TEXT,
-                split_time TEXT,
-                cumulative_time TEXT,
-                FOREIGN KEY(result_id) REFERENCES results(id)
-            )
-        ''')
-        self.conn.commit()
+        db_schema.migrate(self.conn)
+
+    def _fetch(self, url, headers):
+        with self.metrics.stage("fetch") as obs:
+            response = self.session.get(cassettes.route(url), timeout=15, headers=headers)
+            obs["bytes"] = len(response.content)
+        cassettes.record(url, response.status_code, response.headers, response.content)
+        # Only pace requests that actually reached Swimcloud
+        if self.pace:
+            time.sleep(random.uniform(*self.pace))
+        return response.status_code, response.headers, response.content
 
     def get_page(self, url):
         print(f"Navigating to {url}...")
         try:
-            response = self.session.get(url, timeout=15)
-            self.page_source = response.text
-            time.sleep(random.uniform(0.5, 1.0))
+            self.page_source = self.cache.get(url, self._fetch).decode('utf-8', errors='replace')
             return True
         except Exception as e:
             print(f"Error loading {url}: {e}")
             return False
 
+    def _require_page(self, url):
+        # Frontier tasks fail (and are retried later) instead of parsing a stale
+        # page or an error page (429/503/404 raise in the cache, see http_cache.py)
+        if not self.get_page(url):
+            raise RuntimeError(f"could not load {url}")
+
+    def _parse(self, parser):
+        return self.metrics.timed("parse", parser, self.page_source)
+
     def scroll_to_bottom(self):
         """No longer needed since curl_cffi loads the page fully via html."""
         pass
 
 
-    def crawl_roster(self, limit=None):
+    def crawl_roster(self, limit=None, revisit_after=0, by_meet=False):
+        # Sincronizar runs this crawler: every swimmer's meets list is walked so
+        # new meets show up. Unattended runs pass SWIMMER_MEETS_REVISIT (--revisit)
+        # by_meet (--by-meet): see run_tasks()
         unique_swimmers = {}
 
-        def parse_links(soup_obj):
-             links = soup_obj.select('a[href^="/swimmer/"]')
-             for link in links:
-                href = link.get('href')
-                name = link.get_text(strip=True)
-                swimmer_id = href.strip('/').split('/')[-1]
-                if swimmer_id.isdigit():
-                    unique_swimmers[swimmer_id] = {
-                        'name': name.title(),
-                        'url': f"{BASE_URL}{href}",
-                        'id': swimmer_id
-                    }
-
         # 1. Scrape Men
         print("  > Scraping Men's Roster...")
         if self.get_page(TEAM_ROSTER_URL + "?gender=M"):
-            soup = BeautifulSoup(self.page_source, 'html.parser')
-            parse_links(soup)
+            unique_swimmers.update(self._parse(parse_roster))
             print(f"  > Found {len(unique_swimmers)} so far.")
 
         # 2. Scrape Women
         print("  > Scraping Women's Roster...")
         if self.get_page(TEAM_ROSTER_URL + "?gender=F"):
-            soup_women = BeautifulSoup(self.page_source, 'html.parser')
-            parse_links(soup_women)
+            unique_swimmers.update(self._parse(parse_roster))
 
         print(f"Found {len(unique_swimmers)} unique swimmers in TOTAL roster.")
 
@@ -136,277 +536,147 @@ class SwimcloudCrawler:
                  unique_swimmers[extra['id']] = extra
                  print(f"Added extra swimmer: {extra['name']}")
         
-        count = 0
-        for s_id, data in unique_swimmers.items():
-            if limit and count >= limit:
-                print(f"Limit of {limit} reached.")
-                break
-            
-            print(f"\n[{count+1}/{len(unique_swimmers)}] Processing Swimmer: {data['name']}")
-            
-            self.cursor.execute('INSERT OR IGNORE INTO swimmers (id, name, url, team_id) VALUES (?, ?, ?, ?)',
-                                (s_id, data['name'], data['url'], TEAM_ID))
-            self.conn.commit()
-            
-            self.crawl_swimmer_meets(s_id)
-            count += 1
-
-    def crawl_swimmer_meets(self, swimmer_id):
-        url = f"{BASE_URL}/swimmer/{swimmer_id}/meets/"
-        if not self.get_page(url):
-            return
+        selected = list(unique_swimmers.values())
+        if limit and len(selected) > limit:
+            print(f"Limit of {limit} reached.")
+            selected = selected[:limit]
 
-        soup = BeautifulSoup(self.page_source, 'html.parser')
-        
-        # Debug
-        meet_headers = soup.select('h3.c-title')
-        print(f"  - Found {len(meet_headers)} meet headers.")
-        
-        processed_meets = set()
+        for data in selected:
+            self.writer.add_swimmer(data)
+        self.writer.flush()
+        self.queue_swimmers(selected, revisit_after)
+        self.run_tasks(by_meet)
 
-        for h3 in meet_headers:
-            meet_name = h3.get_text(strip=True)
-            if not meet_name: 
-                continue
+    def queue_swimmers(self, swimmers, revisit_after):
+        queued = self.frontier.add_many(crawl_frontier.SWIMMER_MEETS, [
+            (f"{BASE_URL}/swimmer/{s['id']}/meets/", {'swimmer_id': s['id'], 'name': s.get('name')}) for s in swimmers
+        ], revisit_after)
+        print(f"Queued {queued} of {len(swimmers)} swimmers (the rest were crawled recently).")
 
-            # Metadata in next sibling UL
-            ul = h3.find_next_sibling('ul', class_='o-list-bare')
-            date_text = "Unknown"
-            location_text = "Unknown"
-            
-            if ul:
-                # Extract date and location
-                text_parts = [li.get_text(strip=True) for li in ul.find_all('li')]
-                # Prune 'Completed'
-                clean_parts = [t for t in text_parts if "Completed" not in t and "Detailed" not in t]
-                
-                # Heuristic: Last is location, Second to last is date (if present).
-                # The subagent showed:
-                # LIST ITEM 1: UL (Completed, Date)
-                # LIST ITEM 2: Location
-                
-                # text_parts from find_all('li') is recursive? Yes.
-                # So we might get ["Completed", "Dec 5-6", "SANTIAGO"]
-                if len(clean_parts) >= 1:
-                    location_text = clean_parts[-1]
-                if len(clean_parts) >= 2:
-                    date_text = clean_parts[-2] # Assuming second to last is date
-                    # Clean Swimcloud range "Dec 5-6, 2025" -> "2025-12-05"
-                    match = re.search(r"([A-Za-z]+)\s+(\d+).*?,\s+(\d{4})", date_text)
-                    if match:
-                        month_str, day_str, year_str = match.groups()
-                        try:
-                            from datetime import datetime
-                            dt = datetime.strptime(f"{month_str} {day_str} {year_str}", "%b %d %Y")
-                            date_text = dt.strftime("%Y-%m-%d")
-                        except:
-                            pass
-            # Result Link
-            # It should be close by.
-            # Look for links containing /results/ inside the same container?
-            # Or just search ALL result links and match?
-            # "VIII COPA ALEMANIA" might not be unique (e.g. 2024 vs 2025), so context matters.
-            
-            # The structure is loose. Let's try to find the link in the siblings following the H3.
-            # We iterate siblings until the next H3.
-            
-            # Strategy: The link is likely in a wrapper or sibling of the parent.
-            # Traverse up to 3 levels to find a container with a link.
-            meet_link = None
-            current_container = h3.parent
-            for _ in range(3):
-                if not current_container: break
-                
-                # Check if container IS the link
-                if current_container.name == 'a' and '/results/' in (current_container.get('href') or ''):
-                    meet_link = current_container
-                    break
-                
-                # Check for link inside container
-                found = current_container.find('a', href=re.compile(r'/results/'))
-                if found:
-                    meet_link = found
+    def crawl_swimmer_meets(self, swimmer_id, by_meet=False):
+        self.queue_swimmers([{'id': swimmer_id}], revisit_after=0)
+        self.run_tasks(by_meet)
+
+    def run_tasks(self, by_meet=False):
+        """Leases and processes frontier tasks until none is ready.
+
+        by_meet=True walks every meets list first, then fetches each distinct
+        meet the swimmers still miss once from the team results page (see
+        process_team_meets); swimmers that page misses fall back to their own page.
+        """
+        if by_meet:
+            self._drain([crawl_frontier.SWIMMER_MEETS])
+            self.process_team_meets()
+        self._drain()
+
+    def _drain(self, kinds=None):
+        handlers = {
+            crawl_frontier.SWIMMER_MEETS: lambda t: self.process_swimmer_meets(t.payload['swimmer_id'], t.url, t.payload.get('name')),
+            crawl_frontier.MEET_RESULTS: lambda t: self.process_meet_results(t.payload['meet_id'], t.payload['swimmer_id'], t.url),
+            crawl_frontier.SPLITS: lambda t: self.get_splits(t.url, t.payload['result_id']),
+        }
+        while True:
+            tasks = self.frontier.lease(kinds)
+            if not tasks:
+                wait = self.frontier.next_due(kinds)
+                if wait is None or wait > crawl_frontier.MAX_RETRY_WAIT:
                     break
-                    
-                current_container = current_container.parent
-            
-            if meet_link:
-                meet_url_suffix = meet_link['href']
-                
-                # Extract Meet ID
-                parts = meet_url_suffix.strip('/').split('/')
-                meet_id = "unknown"
-                if 'results' in parts:
-                    idx = parts.index('results')
-                    if len(parts) > idx + 1:
-                        meet_id = parts[idx + 1]
-
-            # Skip if already processed for this swimmer
-            # Check if we have results for this meet and swimmer
-            # Efficient check: SELECT 1 FROM results WHERE meet_id = ? AND swimmer_id = ? LIMIT 1
-            self.cursor.execute('SELECT 1 FROM results WHERE meet_id = ? AND swimmer_id = ? LIMIT 1', (meet_id, swimmer_id))
-            if self.cursor.fetchone():
-                print(f"    Skipping meet {meet_id} (Already exists for swimmer)")
-                processed_meets.add(meet_id)
+                time.sleep(wait)
                 continue
-
-            if meet_id not in processed_meets:
-                full_meet_url = f"{BASE_URL}{meet_url_suffix}"
-            
-                self.cursor.execute('INSERT OR IGNORE INTO meets (id, name, date, location, url) VALUES (?, ?, ?, ?, ?)',
-                                    (meet_id, meet_name, date_text, location_text, full_meet_url))
-                self.conn.commit()
-                
-                self.process_meet_results(meet_id, swimmer_id, full_meet_url)
-                processed_meets.add(meet_id)
+            task = tasks[0]
+            try:
+                handlers[task.kind](task)
+            except Exception as e:
+                state = self.frontier.fail(task, e)
+                print(f"  ! {task.kind} {task.url}: {e} ({'will retry' if state == 'pending' else 'giving up'})")
             else:
-                 print(f"    Warning: No link found for meet '{meet_name}' (Checked 3 levels up)")
+                self.frontier.complete([task])
 
+    def process_team_meets(self):
+        tasks = self.frontier.lease([crawl_frontier.MEET_RESULTS], None)
+        by_meet_tasks = {}
+        for task in tasks:
+            by_meet_tasks.setdefault(task.payload['meet_id'], []).append(task)
+        print(f"  > {len(by_meet_tasks)} distinct meets to fetch for {len(tasks)} (meet, swimmer) pairs.")
+        try:
+            for meet_id, meet_tasks in by_meet_tasks.items():
+                try:
+                    self.process_team_meet(meet_id, meet_tasks)
+                except Exception as e:
+                    print(f"Error processing meet {meet_id}: {e}")
+        finally:
+            # Whatever the team pages did not cover goes back for the per-swimmer pass
+            self.frontier.release()
 
-    def process_meet_results(self, meet_id, swimmer_id, url):
-        self.get_page(url)
-        soup = BeautifulSoup(self.page_source, 'html.parser')
-        
-        rows = soup.select('table.c-table-clean tbody tr')
-        print(f"  > Processing Meet {meet_id}: {len(rows)} events found.")
-        
+    def process_team_meet(self, meet_id, tasks):
+        """One team results page for `meet_id`, fanned out to its swimmers' meet_results tasks.
+
+        Completes the tasks of the swimmers the page lists; the others stay
+        leased for process_team_meets to release to the per-swimmer pass.
+        """
+        url = TEAM_MEET_RESULTS_URL.format(base=BASE_URL, meet_id=meet_id, team_id=TEAM_ID)
+        rows = self._parse(parse_team_meet_results) if self.get_page(url) else []
+
+        wanted = [task.payload['swimmer_id'] for task in tasks]
+        by_swimmer = {}
         for row in rows:
-            cols = row.find_all('td')
-            if not cols: 
-                continue
-            
-            # Extract basic data
-            # Extract Event Name cleaner (exclude span)
-            event_link = cols[0].find('a')
-            if event_link:
-                event_name = event_link.get_text(strip=True)
-            else:
-                event_name = cols[0].get_text(strip=True)
-            
-            # Clean up: remove "Timed Finals" suffix if stuck
-            event_name = event_name.replace("Timed Finals", "").strip()
-            
-            final_time = "Unknown"
-            time_url = ""
-            points = "0"
-            
-            # Find time link
-            for c in cols:
-                a_tag = c.find('a', href=re.compile(r'/times/'))
-                if a_tag:
-                    final_time = a_tag.get_text(strip=True)
-                    time_url = f"{BASE_URL}{a_tag['href']}"
-                    break
-            
-            if not time_url:
-                # Try finding time without link
-                # (Maybe looking for points column)
-                continue
-            
-            # Determine Pool Size
-            # Priority 1: Event Name (e.g. "50 S Free", "100 L Free")
-            # Priority 2: Location String
-            
-            pool_size = "Unknown"
-            
-            # Check Event Name
-            if ' S ' in event_name or event_name.endswith(' S'):
-                pool_size = "25m"
-            elif ' L ' in event_name or event_name.endswith(' L'):
-                pool_size = "50m"
-            elif ' Y ' in event_name or event_name.endswith(' Y'):
-                pool_size = "25y"
-            
-            if pool_size == "Unknown":
-                # Retrieve header info from current page
-                header_ul = soup.select_one('ul.o-list-inline')
-                if header_ul:
-                    header_text = header_ul.get_text()
-                    if " SC" in header_text or "Short Course" in header_text:
-                         pool_size = "25m"
-                    elif " LC" in header_text or "Long Course" in header_text:
-                         pool_size = "50m"
-                    elif "SCM" in header_text:
-                         pool_size = "25m"
-                    elif "LCM" in header_text:
-                         pool_size = "50m"
-            
-            # Update Meet Pool Size if valid
-            if pool_size in ["25m", "50m"]:
-                self.cursor.execute("UPDATE meets SET pool_size = ? WHERE id = ?", (pool_size, meet_id))
-                self.conn.commit()
-
-            # Extract Place (Lugar)
-            # Based on DOM inspection: Last TD or Index 4.
-            place = "—"
-            if len(cols) >= 5:
-                # Check last column
-                last_col_text = cols[-1].get_text(strip=True)
-                if last_col_text:
-                    place = last_col_text
-
-            # Check for duplicates
-            self.cursor.execute("SELECT id FROM results WHERE swimmer_id=? AND meet_id=? AND event_name=?", (swimmer_id, meet_id, event_name))
-            if self.cursor.fetchone():
-                # print(f"    Skipping existing: {event_name}")
-                continue
+            if row['swimmer_id'] in wanted:
+                by_swimmer.setdefault(row['swimmer_id'], []).append(row)
+        print(f"  > Meet {meet_id}: {sum(map(len, by_swimmer.values()))} results for "
+              f"{len(by_swimmer)}/{len(wanted)} swimmers from the team page.")
+        if not by_swimmer:
+            return
 
-            # Save Result
-            self.cursor.execute('''
-                INSERT INTO results (swimmer_id, meet_id, event_name, time, points, pool_size, time_url, place)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (swimmer_id, meet_id, event_name, final_time, points, pool_size, time_url, place))
-            result_id = self.cursor.lastrowid
-            self.conn.commit()
-            
-            # Get Splits
-            self.get_splits(result_id, time_url)
-
-
-    def get_splits(self, result_id, url):
-        # Optimistic check: Assume splits page loads fast
-        self.get_page(url)
-        soup = BeautifulSoup(self.page_source, 'html.parser')
-        
-        # Look for the splits table
-        # There might be multiple tables. Look for one with numeric distance headers (50, 100)
-        # or just "Split" text.
-        
-        # Strategy: Iterate tables
-        tables = soup.select('table')
-        splits_found = 0
+        # Same write order as the per-swimmer path: swimmer by swimmer, page order
+        for swimmer_id in wanted:
+            for row in by_swimmer.get(swimmer_id, []):
+                self.writer.add_result(meet_id, swimmer_id, row)
+        self.writer.flush()
+        queue_missing_splits(self.conn, self.frontier, meet_id, list(by_swimmer))
+        self.frontier.complete([t for t in tasks if t.payload['swimmer_id'] in by_swimmer])
+
+    def process_swimmer_meets(self, swimmer_id, url, name=None):
+        if name:
+            print(f"\nProcessing Swimmer: {name}")
+        self._require_page(url)
+        meets = self._parse(parse_swimmer_meets)
+        print(f"  - Found {len(meets)} meet headers.")
+        plan_swimmer_meets(self.conn, self.writer, self.frontier, swimmer_id, meets)
+
+
+    def process_meet_results(self, meet_id, swimmer_id, url):
+        self._require_page(url)
+        results = self._parse(parse_meet_results)
+        print(f"  > Processing Meet {meet_id}: {len(results)} events found.")
         
-        for table in tables:
-            rows = table.find_all('tr')
-            valid_splits = []
-            
-            # Must have rows
-            if not rows: continue
-            
-            for row in rows:
-                cols = row.find_all('td')
-                # Needs at least distance and time
-                if len(cols) >= 2:
-                    dist = cols[0].get_text(strip=True)
-                    split_val = cols[1].get_text(strip=True)
-                    
-                    # Validation: Dist starts with digit
-                    if dist and (dist[0].isdigit()):
-                         valid_splits.append((dist, split_val))
-            
-            if len(valid_splits) > 0:
-                # Looks like a split table
-                for dist, val in valid_splits:
-                    self.cursor.execute('INSERT INTO splits (result_id, distance, split_time) VALUES (?, ?, ?)',
-                                        (result_id, dist, val))
-                splits_found = len(valid_splits)
-                self.conn.commit()
-                break # Stop after finding one valid table
+        for result in results:
+            self.writer.add_result(meet_id, swimmer_id, result)
+
+        # One transaction per meet, then its /times/ pages go to the frontier
+        self.writer.flush()
+        queue_missing_splits(self.conn, self.frontier, meet_id, [swimmer_id])
 
+
+    def get_splits(self, url, result_id):
+        # A retried task may find its splits already stored
+        if result_has_splits(self.conn, result_id):
+            return
+        self._require_page(url)
+        splits_found = self.writer.add_splits(result_id, self._parse(parse_splits))
+        self.writer.flush()
         if splits_found:
             print(f"    + Saved {splits_found} splits.")
 
-    def close(self):
+    def close(self, status="ok", error=None):
+        self.writer.flush()
+        # Unfinished leases go straight back to the queue for the next run
+        self.frontier.release()
+        self.metrics.finish(self.conn, status, error)
+        print(self.writer.summary())
+        print(self.frontier.summary())
+        print(self.metrics.summary())
+        print(self.cache.summary())
+        self.cache.close()
         self.session.close()
         self.conn.close()
 
@@ -418,10 +688,20 @@ if __name__ == "__main__":
         except:
             pass
 
+    # --revisit: unattended runs skip swimmers whose meets list was walked recently
+    revisit_after = crawl_frontier.SWIMMER_MEETS_REVISIT if "--revisit" in sys.argv else 0
+    # --by-meet: one team results page per meet instead of one page per swimmer and meet
+    by_meet = "--by-meet" in sys.argv
+
     crawler = SwimcloudCrawler()
+    status, error = "ok", None
     try:
-        crawler.crawl_roster(limit=limit)
+        crawler.crawl_roster(limit=limit, revisit_after=revisit_after, by_meet=by_meet)
     except KeyboardInterrupt:
         print("\nStopping crawler...")
+        status = "interrupted"
+    except Exception as e:
+        status, error = "error", e
+        raise
     finally:
-        crawler.close()
+        crawler.close(status, error)
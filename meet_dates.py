@@ -0,0 +1,80 @@
+import re
+from datetime import datetime, timezone
+
+# Ingest-time normalizer for meets.date.
+# The raw column mixes Swimcloud ranges ("Dec 5–6, 2025", "Nov 28 – Dec 1, 2025"),
+# ISO dates from Fechida/Meet Mobile ("2025-12-05"), Fechida's "05/12/2025" and
+# Meet Mobile epoch timestamps. Writers store the parsed range in
+# meets.start_date / meets.end_date (ISO, YYYY-MM-DD) so readers never re-parse.
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+    # Spanish abbreviations (ene, abr, ago, dic) used in manual edits
+    "ene": 1, "abr": 4, "ago": 8, "dic": 12,
+}
+
+_ISO_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})')
+_DMY_RE = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+# "Dec 5, 2025" / "Dec 5–6, 2025" / "Nov 28 – Dec 1, 2025"
+_RANGE_RE = re.compile(
+    r'^([A-Za-z]{3})[a-z]*\.?\s+(\d{1,2})'
+    r'(?:\s*[–—-]\s*(?:([A-Za-z]{3})[a-z]*\.?\s+)?(\d{1,2}))?'
+    r',\s*(\d{4})$'
+)
+
+
+def _iso(year, month, day):
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_meet_date(raw):
+    """Returns (start_date, end_date) as ISO strings, or (None, None)."""
+    if raw is None:
+        return None, None
+
+    # Meet Mobile startDateUtc (seconds since epoch)
+    if isinstance(raw, (int, float)):
+        try:
+            d = datetime.fromtimestamp(raw, tz=timezone.utc).strftime("%Y-%m-%d")
+        except (OverflowError, OSError, ValueError):
+            return None, None
+        return d, d
+
+    text = str(raw).strip()
+    if not text or text == "Unknown":
+        return None, None
+
+    m = _ISO_RE.match(text)
+    if m:
+        d = _iso(*m.groups())
+        return d, d
+
+    m = _DMY_RE.match(text)
+    if m:
+        day, month, year = m.groups()
+        d = _iso(year, month, day)
+        return d, d
+
+    m = _RANGE_RE.match(text)
+    if m:
+        month1, day1, month2, day2, year = m.groups()
+        month1 = _MONTHS.get(month1.lower())
+        if not month1:
+            return None, None
+        start = _iso(year, month1, day1)
+        if not day2:
+            return start, start
+        month2 = _MONTHS.get(month2.lower()) if month2 else month1
+        if not month2:
+            return start, start
+        # "Dec 30 – Jan 2, 2026": the year printed belongs to the end date
+        start_year = int(year) - 1 if month2 < month1 else int(year)
+        start = _iso(start_year, month1, day1)
+        end = _iso(year, month2, day2)
+        return start, end or start
+
+    return None, None
@@ -1,32 +1,22 @@
-import sqlite3
 import pandas as pd
 import argparse
 import sys
-import os
-
-import shutil
+import mm_snapshot
 
 # Path to the live iOS App Container (varies by system, but this is the one we found)
 LIVE_DB_PATH = '/Users/jrb/Library/Containers/7F2BC93B-8FAC-48B0-BF83-D128B1ADF11C/Data/Documents/MeetMobile.db'
 DB_PATH = 'meet_mobile_dump.db'
 
+# Consistent snapshot of the app's DB, re-taken only when it changed (see mm_snapshot.py)
+snapshot = mm_snapshot.MeetMobileSnapshot(LIVE_DB_PATH, DB_PATH)
+
 def refresh_db():
-    """Copies the latest DB from the app container to our working directory."""
-    try:
-        if os.path.exists(LIVE_DB_PATH):
-            shutil.copy2(LIVE_DB_PATH, DB_PATH)
-            # print("Synced with latest Meet Mobile data.")
-        else:
-            print(f"Warning: Live DB not found at {LIVE_DB_PATH}. Using cached copy.")
-    except Exception as e:
-        print(f"Warning: Could not sync live DB ({e}). Using cached copy.")
+    """Snapshots the latest DB from the app container into our working directory, if it changed."""
+    return snapshot.refresh()
 
 def get_connection():
-    refresh_db() # Sync before connecting
-    if not os.path.exists(DB_PATH):
-        print(f"Error: {DB_PATH} not found.")
-        return None
-    return sqlite3.connect(DB_PATH)
+    # Shared read-only connection: don't close it, every query reuses it
+    return snapshot.connect()
 
 def search_swimmer(name_part):
     conn = get_connection()
@@ -40,7 +30,6 @@ def search_swimmer(name_part):
     
     term = f"%{name_part}%"
     df = pd.read_sql(query, conn, params=(term, term))
-    conn.close()
     
     if df.empty:
         print("No swimmers found.")
@@ -57,7 +46,6 @@ def get_swimmer_details(swimmer_id):
     
     if swimmer.empty:
         print(f"No swimmer found with ID {swimmer_id}")
-        conn.close()
         return
 
     print("\n=== Swimmer Profile ===")
@@ -81,7 +69,6 @@ def get_swimmer_details(swimmer_id):
     """
     
     results = pd.read_sql(r_query, conn, params=(swimmer_id,))
-    conn.close()
     
     print("\n=== Results ===")
     if results.empty:
@@ -89,17 +76,17 @@ def get_swimmer_details(swimmer_id):
     else:
         print(results.to_string(index=False))
 
+COMMANDS = {"search": search_swimmer, "get": get_swimmer_details}
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
+    args = sys.argv[1:]
+    if len(args) < 2 or len(args) % 2 or any(cmd not in COMMANDS for cmd in args[::2]):
         print("Usage:")
         print("  Search name: python3 meet_mobile_query.py search <name>")
         print("  Get ID info: python3 meet_mobile_query.py get <id>")
+        print("  Several:     python3 meet_mobile_query.py search <name> get <id> ...  (one snapshot for all)")
         sys.exit(1)
-        
-    cmd = sys.argv[1]
-    arg = sys.argv[2]
     
-    if cmd == "search":
-        search_swimmer(arg)
-    elif cmd == "get":
-        get_swimmer_details(arg)
+    for cmd, arg in zip(args[::2], args[1::2]):
+        COMMANDS[cmd](arg)
+    snapshot.close()
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Local snapshot of the live Meet Mobile database (the app's MeetMobile.db).
+#
+# Copying the file with shutil.copy2 while the app is writing can produce a
+# torn copy, and misses whatever is still in its -wal. refresh() uses the
+# SQLite online backup API instead: pages are copied in steps, and if the app
+# commits mid-copy SQLite restarts the backup, so the snapshot is always one
+# consistent state. The backup is written next to the snapshot and renamed
+# over it.
+#
+# A new snapshot is only taken when the source changed: its mtime (db or -wal)
+# differs from the snapshot's (set to the source's after each backup, so this
+# works across runs), or, within a process, its PRAGMA data_version moved.
+# connect() returns one cached read-only connection to the current snapshot.
+#
+#   python mm_snapshot.py [--force]
+
+LIVE_DB_PATH = '/Users/jrb/Library/Containers/7F2BC93B-8FAC-48B0-BF83-D128B1ADF11C/Data/Documents/MeetMobile.db'
+SNAPSHOT_PATH = 'meet_mobile_dump.db'
+# Pages copied per backup step (4 MB with 4 KB pages)
+PAGES_PER_STEP = 1024
+
+
+def _read_only_uri(path):
+    return f"{Path(path).absolute().as_uri()}?mode=ro"
+
+
+class MeetMobileSnapshot:
+    def __init__(self, live_path=LIVE_DB_PATH, snapshot_path=SNAPSHOT_PATH, pages_per_step=PAGES_PER_STEP):
+        self.live_path = live_path
+        self.snapshot_path = snapshot_path
+        self.pages_per_step = pages_per_step
+        self.source = None
+        self.source_version = None
+        self.conn = None
+        self.stats = {"checks": 0, "backups": 0, "pages": 0, "seconds": 0.0}
+
+    def source_mtime(self):
+        """Latest mtime of the live DB and its -wal; None if the DB is missing."""
+        if not os.path.exists(self.live_path):
+            return None
+        wal = self.live_path + "-wal"
+        return max(os.path.getmtime(p) for p in (self.live_path, wal) if os.path.exists(p))
+
+    def _source_version(self):
+        # data_version only moves for commits by other connections, so the
+        # source connection stays open across checks
+        if self.source is None:
+            self.source = sqlite3.connect(_read_only_uri(self.live_path), uri=True)
+        return self.source.execute("PRAGMA data_version").fetchone()[0]
+
+    def stale(self):
+        """True if the live DB changed since the snapshot was taken."""
+        self.stats["checks"] += 1
+        mtime = self.source_mtime()
+        if mtime is None:
+            return False
+        if not os.path.exists(self.snapshot_path) or os.path.getmtime(self.snapshot_path) != mtime:
+            return True
+        version = self._source_version()
+        if self.source_version is None:
+            # Snapshot from an earlier run with the same mtime: start tracking from here
+            self.source_version = version
+            return False
+        return version != self.source_version
+
+    def refresh(self, force=False):
+        """Backs the live DB up into the snapshot if it changed. Returns True if a new snapshot was taken."""
+        if self.source_mtime() is None:
+            print(f"Warning: Live DB not found at {self.live_path}. Using cached copy.")
+            return False
+        if not force and not self.stale():
+            return False
+
+        # Read before copying: a commit during the backup makes the next check refresh again
+        mtime = self.source_mtime()
+        version = self._source_version()
+        start = time.perf_counter()
+        pages = []
+        tmp_path = self.snapshot_path + ".tmp"
+        dest = sqlite3.connect(tmp_path)
+        try:
+            self.source.backup(dest, pages=self.pages_per_step,
+                               progress=lambda status, remaining, total: pages.append(total))
+        finally:
+            dest.close()
+        self.close_snapshot()
+        os.replace(tmp_path, self.snapshot_path)
+        os.utime(self.snapshot_path, (mtime, mtime))
+        self.source_version = version
+        self.stats["backups"] += 1
+        self.stats["pages"] += pages[-1] if pages else 0
+        self.stats["seconds"] += time.perf_counter() - start
+        return True
+
+    def connect(self):
+        """Cached read-only connection to an up-to-date snapshot; None if there is none."""
+        try:
+            refreshed = self.refresh()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not snapshot live DB ({e}). Using cached copy.")
+            refreshed = False
+        if refreshed or self.conn is None:
+            self.close_snapshot()
+            if not os.path.exists(self.snapshot_path):
+                print(f"Error: {self.snapshot_path} not found.")
+                return None
+            self.conn = sqlite3.connect(_read_only_uri(self.snapshot_path), uri=True)
+        return self.conn
+
+    def close_snapshot(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        self.close_snapshot()
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+
+if __name__ == "__main__":
+    snap = MeetMobileSnapshot()
+    if snap.refresh(force="--force" in sys.argv):
+        s = snap.stats
+        print(f"Snapshot {snap.snapshot_path} updated: {s['pages']} pages in {s['seconds']:.2f}s.")
+    elif os.path.exists(snap.snapshot_path):
+        print(f"Snapshot {snap.snapshot_path} is up to date.")
+    snap.close()
@@ -0,0 +1,208 @@
+import re
+import unicodedata
+from datetime import datetime
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+
+# Swimmer name matching for the result imports (scraper_fechida_pdf,
+# sync_meet_mobile).
+#
+# Scoring every incoming name against the whole roster is O(results x roster).
+# NameMatcher normalizes the roster once (accents, "Surname, Name" order,
+# tokens) and builds a blocking index: every name is filed under each of its
+# tokens and their phonetic keys. A query is only scored against the swimmers
+# sharing a key with two of its tokens (one for names of one or two tokens, or
+# swimmers whose name has a single token), and when an age is given only against
+# swimmers whose birth year is plausible (birth-year side index). The scorer
+# and the tie-breaking (first swimmer in roster order wins) are the ones the
+# importers used, so a name in the block gets the same decision as before.
+#
+# With the SequenceMatcher scorer and a min_score, the block is completed with
+# every swimmer whose character-count bound (difflib's quick_ratio, computed
+# for the whole roster at once with numpy) reaches the best score so far, so
+# the decision is exactly the full scan's even for names sharing few tokens.
+# Other scorers (token_set_ratio) have no such bound: when the block's best
+# does not clear min_score, the rest of the roster is scored, so a name whose
+# tokens were merged or split ("ana maria" / "anamaria") is still accepted or
+# rejected exactly as by the full scan.
+#
+# bench_name_matcher.py checks the decisions against the full scan.
+
+# Tokens shorter than this are not blocked on (initials, "de", "y")
+MIN_TOKEN = 3
+# Query tokens a candidate must share, for queries of at least this many tokens
+MIN_SHARED = 2
+SHARED_FROM = 3
+
+
+def normalize_name(name):
+    """'Pérez Soto, Juan' -> 'juan perez soto': no accents, lowercase, given names first."""
+    if not isinstance(name, str):
+        return ""
+    if "," in name:
+        surname, _, given = name.partition(",")
+        name = f"{given} {surname}"
+    name = unicodedata.normalize("NFKD", name).encode("ASCII", "ignore").decode("ascii").lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+_PHONETIC_RULES = (
+    (r"ll", "y"), (r"qu", "k"), (r"c([ei])", r"s\1"), (r"g([ei])", r"j\1"), (r"ch", "x"), (r"c", "k"),
+    (r"z", "s"), (r"v", "b"), (r"w", "u"), (r"h", ""), (r"y$", "i"), (r"(.)\1+", r"\1"),
+)
+
+
+def phonetic_key(token):
+    """Spanish-ish sound key: 'gonzalez' and 'gonsales', 'valentina' and 'balentina' share one."""
+    for pattern, repl in _PHONETIC_RULES:
+        token = re.sub(pattern, repl, token)
+    # Vowels after the first letter carry most typos and accent slips
+    return token[:1] + re.sub(r"[aeiou]", "", token[1:])
+
+
+def token_keys(name):
+    """Blocking keys of each distinct token: the token itself and its sound."""
+    return [{token, "~" + phonetic_key(token)}
+            for token in dict.fromkeys(normalize_name(name).split()) if len(token) >= MIN_TOKEN]
+
+
+def birth_year(birth_date):
+    """Year of a swimmers.birth_date value, None when missing or unparseable."""
+    if not birth_date:
+        return None
+    try:
+        year = pd.to_datetime(birth_date).year
+    except Exception:
+        return None
+    return None if pd.isna(year) else int(year)
+
+
+def sequence_ratio(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+class NameMatcher:
+    """Best-scoring roster swimmer for incoming result names.
+
+    `swimmers` is (id, name, birth_date) rows; `scorer(query, name)` returns a
+    similarity. Results are memoized until the roster changes or clear_memo()
+    (the importers call it per meet).
+    """
+
+    def __init__(self, swimmers=(), scorer=sequence_ratio, min_score=None, max_age_gap=3):
+        self.scorer = scorer
+        # The caller's threshold: decisions around it must match the full scan
+        self.min_score = min_score
+        self.max_age_gap = max_age_gap
+        self.current_year = datetime.now().year
+        self.ids = []
+        self.names = []
+        self.blocks = {}
+        self.token_counts = []
+        self.by_year = {}
+        self.unknown_year = set()
+        self.memo = {}
+        self.chars = None
+        self.stats = {"queries": 0, "memo_hits": 0, "scored": 0}
+        for sid, name, birth_date in swimmers:
+            self.add(sid, name, birth_date)
+
+    def add(self, sid, name, birth_date=None):
+        i = len(self.ids)
+        self.ids.append(sid)
+        self.names.append(name)
+        keys = token_keys(name)
+        self.token_counts.append(len(keys))
+        for key in set().union(*keys):
+            self.blocks.setdefault(key, set()).add(i)
+        year = birth_year(birth_date)
+        if year is None:
+            self.unknown_year.add(i)
+        else:
+            self.by_year.setdefault(year, set()).add(i)
+        self.memo.clear()
+        self.chars = None
+
+    def clear_memo(self):
+        self.memo.clear()
+
+    def candidates(self, query, age=None):
+        """Roster positions worth scoring for `query`, in roster order."""
+        shared = {}
+        keys = token_keys(query)
+        for token in keys:
+            hits = set()
+            for key in token:
+                hits |= self.blocks.get(key, set())
+            for i in hits:
+                shared[i] = shared.get(i, 0) + 1
+        need = MIN_SHARED if len(keys) >= SHARED_FROM else 1
+        block = {i for i, n in shared.items() if n >= min(need, self.token_counts[i])}
+        plausible = self.plausible(age)
+        if plausible is not None:
+            block &= plausible
+        return sorted(block)
+
+    def plausible(self, age):
+        """Roster positions whose birth year fits a reported age (None: no age check)."""
+        if age is None or self.max_age_gap is None:
+            return None
+        # Same rule as before: reject when |current age - reported age| > gap
+        born = self.current_year - age
+        plausible = set(self.unknown_year)
+        for year in range(born - self.max_age_gap, born + self.max_age_gap + 1):
+            plausible |= self.by_year.get(year, set())
+        return plausible
+
+    def _char_counts(self):
+        if self.chars is None:
+            alphabet = {ch: j for j, ch in enumerate(sorted(set("".join(self.names))))}
+            counts = np.zeros((len(self.names), len(alphabet)), dtype=np.int32)
+            for i, name in enumerate(self.names):
+                for ch in name:
+                    counts[i, alphabet[ch]] += 1
+            self.chars = (alphabet, counts, counts.sum(axis=1))
+        return self.chars
+
+    def near_misses(self, query, floor, age=None):
+        """Roster positions whose quick_ratio bound reaches `floor` (SequenceMatcher scorer only)."""
+        if not self.names:
+            return []
+        alphabet, counts, lengths = self._char_counts()
+        q = np.zeros(counts.shape[1], dtype=np.int32)
+        for ch in query:
+            if ch in alphabet:
+                q[alphabet[ch]] += 1
+        bound = 2.0 * np.minimum(counts, q).sum(axis=1) / np.maximum(lengths + len(query), 1)
+        found = np.nonzero(bound >= floor - 1e-9)[0].tolist()
+        plausible = self.plausible(age)
+        return found if plausible is None else [i for i in found if i in plausible]
+
+    def match(self, query, age=None):
+        """(swimmer id, score) of the best candidate, or (None, 0); the caller applies its threshold."""
+        self.stats["queries"] += 1
+        memo_key = (query, age)
+        if memo_key in self.memo:
+            self.stats["memo_hits"] += 1
+            return self.memo[memo_key]
+        scores = {}
+        for i in self.candidates(query, age):
+            scores[i] = self.scorer(query, self.names[i])
+        if self.scorer is sequence_ratio and self.min_score is not None:
+            floor = max([self.min_score, *scores.values()])
+            for i in self.near_misses(query, floor, age):
+                if i not in scores:
+                    scores[i] = self.scorer(query, self.names[i])
+        elif self.min_score is not None and max(scores.values(), default=0) <= self.min_score:
+            plausible = self.plausible(age)
+            for i in range(len(self.names)):
+                if i not in scores and (plausible is None or i in plausible):
+                    scores[i] = self.scorer(query, self.names[i])
+        self.stats["scored"] += len(scores)
+        best_id, best_score = None, 0
+        for i in sorted(scores):
+            if scores[i] > best_score:
+                best_id, best_score = self.ids[i], scores[i]
+        self.memo[memo_key] = (best_id, best_score)
+        return best_id, best_score
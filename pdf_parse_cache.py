@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sys
+import time
+import zlib
+import db_schema
+
+# Parsed Fechida PDFs keyed by the SHA-256 of the file (pdf_parse_cache table,
+# migration 10), used by scraper_fechida_pdf.
+#
+# Each entry keeps the extracted page text and the parsed records, both as
+# zlib-compressed JSON. A PDF seen before is never opened with pdfplumber
+# again. If PARSER_VERSION has changed since the entry was stored, the records
+# are rebuilt from the stored page text.
+#
+# fechida_pdf_versions records which PDF version was last written to the DB for
+# each championship (c_id) and kind. When a championship publishes a different
+# PDF, the scraper diffs the new records against that version and writes only
+# the added/changed results (see diff_results).
+#
+#   python pdf_parse_cache.py [stats|clear] [--db data/natacion.db]
+
+RESULTADOS = "resultados"
+PUNTAJES = "puntajes"
+# Bump when parse_result_lines / find_club_place change what they extract
+PARSER_VERSION = 1
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class PdfParseCache:
+    def __init__(self, conn):
+        self.conn = conn
+        self.stats = {"hits": 0, "reparsed": 0, "misses": 0}
+
+    def lookup(self, sha256):
+        """{"kind", "pages", "records", "parser_version"} or None."""
+        row = self.conn.execute(
+            "SELECT kind, pages, records, parser_version FROM pdf_parse_cache WHERE sha256 = ?", (sha256,)).fetchone()
+        if not row:
+            return None
+        kind, pages, records, version = row
+        return {"kind": kind, "pages": _unpack(pages), "records": _unpack(records), "parser_version": version}
+
+    def store(self, sha256, kind, source_url, size, pages, records):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO pdf_parse_cache (sha256, kind, source_url, size, page_count, parser_version,
+                                             pages, records, parsed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET
+                    parser_version = excluded.parser_version, pages = excluded.pages,
+                    records = excluded.records, parsed_at = excluded.parsed_at
+            ''', (sha256, kind, source_url, size, len(pages), PARSER_VERSION, _pack(pages), _pack(records),
+                  time.time()))
+
+    def last_applied(self, c_id, kind):
+        """(sha256, records) of the version last written to the DB for a championship, or None."""
+        row = self.conn.execute('''
+            SELECT v.sha256, p.records FROM fechida_pdf_versions v JOIN pdf_parse_cache p ON p.sha256 = v.sha256
+            WHERE v.c_id = ? AND v.kind = ?
+        ''', (c_id, kind)).fetchone()
+        return (row[0], _unpack(row[1])) if row else None
+
+    def mark_applied(self, c_id, kind, sha256):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO fechida_pdf_versions (c_id, kind, sha256, applied_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(c_id, kind) DO UPDATE SET sha256 = excluded.sha256, applied_at = excluded.applied_at
+            ''', (c_id, kind, sha256, time.time()))
+
+    def summary(self):
+        s = self.stats
+        return f"PDF parse cache: {s['hits']} hits, {s['reparsed']} re-parsed from stored text, {s['misses']} parsed"
+
+
+def _result_key(record):
+    return (record["raw_name"], record["raw_event"])
+
+
+def diff_results(old, new):
+    """(added, changed, removed) between two parse_result_lines outputs.
+
+    Results are matched on (raw_name, raw_event); a later line for the same key
+    wins, as in sync_results_to_db.
+    """
+    old_by_key = {_result_key(r): r for r in old}
+    new_by_key = {_result_key(r): r for r in new}
+    added = [r for k, r in new_by_key.items() if k not in old_by_key]
+    changed = [r for k, r in new_by_key.items() if k in old_by_key and r != old_by_key[k]]
+    removed = [r for k, r in old_by_key.items() if k not in new_by_key]
+    return added, changed, removed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = db_schema.DB_PATH
+    if "--db" in args:
+        i = args.index("--db")
+        db_path = args[i + 1]
+        del args[i:i + 2]
+    conn = db_schema.connect(db_path)
+    cmd = args[0] if args else "stats"
+    if cmd == "clear":
+        with conn:
+            conn.execute("DELETE FROM fechida_pdf_versions")
+            print(f"Removed {conn.execute('DELETE FROM pdf_parse_cache').rowcount} cached PDFs.")
+    else:
+        for kind, n, size, stored, pages in conn.execute('''
+                SELECT kind, COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(pages) + LENGTH(records)), 0),
+                       COALESCE(SUM(page_count), 0)
+                FROM pdf_parse_cache GROUP BY kind'''):
+            print(f"{kind:<11} {n} PDFs, {pages} pages, {size / 1e6:.1f} MB of PDF stored as {stored / 1e6:.2f} MB")
+    conn.close()
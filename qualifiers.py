@@ -0,0 +1,98 @@
+import argparse
+import pandas as pd
+import db_schema
+import categories
+
+# National-qualifier engine shared by the app (Clasificados tab) and the CLI.
+# Best times (personal_bests, one row per swimmer/event/pool) are joined to
+# minimum_standards on (event_id, gender, category_code, pool_size) in one
+# merge; swimmers at or under the minima qualify, and those within
+# `near_miss_pct` percent over it are reported as near misses.
+#
+#   python qualifiers.py [--db data/natacion.db] [--team 10034725] [--near 3]
+
+TEAM_ID = "10034725"
+
+QUALIFIED = "clasificado"
+NEAR_MISS = "cerca"
+
+JOIN_KEYS = ["event_id", "gender", "category_code", "pool_size"]
+
+
+def load_best_times(conn, team_id=TEAM_ID, ref=None):
+    """personal_bests for a team with age/category_code computed at `ref` (default today)."""
+    df = pd.read_sql("""
+        SELECT
+            s.id as swimmer_id, s.name, s.birth_date, s.gender,
+            pb.event_id, e.code as event_name, e.name_es as event_display,
+            r.time, pb.pool_size, m.start_date as date, m.name as meet_name,
+            pb.time_seconds as seconds
+        FROM swimmers s
+        JOIN personal_bests pb ON pb.swimmer_id = s.id
+        JOIN results r ON pb.result_id = r.id
+        JOIN meets m ON r.meet_id = m.id
+        JOIN events e ON pb.event_id = e.id
+        WHERE s.team_id = ?
+    """, conn, params=(team_id,))
+    df['birth_date'] = categories.parse_birth_dates(df['birth_date'])
+    df[['age', 'category', 'category_code']] = categories.categorize(df['birth_date'], ref)
+    return df
+
+
+def load_minimas(conn):
+    return pd.read_sql("SELECT event_id, gender, category_code, pool_size, time_seconds FROM minimum_standards", conn)
+
+
+def find_qualifiers(best_times, minimas, near_miss_pct=0.0):
+    """Best times that meet (or nearly meet) the minima for their category.
+
+    `best_times` needs JOIN_KEYS plus `seconds`; `minimas` needs JOIN_KEYS plus
+    `time_seconds`. Returns the matching best-time rows with `limit_seconds`,
+    `margin` (limit - time, seconds; negative for near misses), `margin_pct`
+    and `status` (QUALIFIED or NEAR_MISS), fastest margin first.
+    """
+    cols = list(best_times.columns) + ['limit_seconds', 'margin', 'margin_pct', 'status']
+    if best_times.empty or minimas.empty:
+        return pd.DataFrame(columns=cols)
+
+    limits = (minimas.dropna(subset=['time_seconds'])
+              .drop_duplicates(subset=JOIN_KEYS, keep='last')
+              [JOIN_KEYS + ['time_seconds']]
+              .rename(columns={'time_seconds': 'limit_seconds'}))
+    candidates = best_times.dropna(subset=['seconds', 'category_code', 'gender'])
+    df = candidates.merge(limits, on=JOIN_KEYS, how='inner')
+
+    df['margin'] = df['limit_seconds'] - df['seconds']
+    df['margin_pct'] = df['margin'] / df['limit_seconds'] * 100
+    df['status'] = None
+    df.loc[df['margin'] >= 0, 'status'] = QUALIFIED
+    df.loc[(df['margin'] < 0) & (-df['margin_pct'] <= near_miss_pct), 'status'] = NEAR_MISS
+    df = df[df['status'].notna()]
+    return df.sort_values(['status', 'margin_pct'], ascending=[True, False]).reset_index(drop=True)
+
+
+def run(db_path=db_schema.DB_PATH, team_id=TEAM_ID, near_miss_pct=0.0):
+    conn = db_schema.connect(db_path)
+    best = load_best_times(conn, team_id)
+    result = find_qualifiers(best, load_minimas(conn), near_miss_pct)
+    conn.close()
+
+    print(f"Checked {len(best)} best times.")
+    for status, label in [(QUALIFIED, "Qualified"), (NEAR_MISS, f"Near misses (within {near_miss_pct}%)")]:
+        rows = result[result['status'] == status]
+        if status == NEAR_MISS and not near_miss_pct:
+            continue
+        print(f"\n{label}: {len(rows)}")
+        for _, r in rows.sort_values(['name', 'pool_size', 'event_name']).iterrows():
+            print(f"  {r['name']:<35} {r['age']:>3} {r['category_code']:<6} {r['pool_size']:<4} "
+                  f"{r['event_name']:<16} {r['time']:>9}  min {r['limit_seconds']:8.2f}  {r['margin']:+.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List swimmers meeting national minimum standards.")
+    parser.add_argument("--db", default=db_schema.DB_PATH)
+    parser.add_argument("--team", default=TEAM_ID)
+    parser.add_argument("--near", type=float, default=0.0, help="also list times within this %% over the minima")
+    args = parser.parse_args()
+    run(args.db, args.team, args.near)
@@ -0,0 +1,18 @@
+import sys
+import db_schema
+
+# Recomputes the personal_bests table from `results`. The triggers from
+# migration 006 keep it current on every insert/update/delete; use this after
+# restoring a backup, bulk-editing with triggers off, or to verify the table.
+#
+#   python rebuild_personal_bests.py [path/to/natacion.db]
+
+def run(db_path=db_schema.DB_PATH):
+    conn = db_schema.connect(db_path)
+    count = db_schema.rebuild_personal_bests(conn)
+    conn.commit()
+    conn.close()
+    print(f"Rebuilt personal_bests: {count} rows.")
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else db_schema.DB_PATH)
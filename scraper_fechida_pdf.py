@@ -1,14 +1,23 @@
 import sqlite3
-import urllib.request
 from bs4 import BeautifulSoup
 import ssl
 import re
 import os
 import pdfplumber
-import pandas as pd
 from difflib import SequenceMatcher
 from datetime import datetime
+import sys
 import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import db_schema
+import time_codec
+import meet_dates
+import event_catalog
+import http_cache
+import sync_metrics
+import pdf_parse_cache
+import name_matcher
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/natacion.db")
 if not os.path.exists(DB_PATH):
@@ -17,6 +26,12 @@ if not os.path.exists(DB_PATH):
     if os.path.exists(alt_path):
         DB_PATH = alt_path
 
+# Championship pages/PDFs downloaded at once, PDF text extraction processes,
+# and PDF pages per extraction task (large PDFs are split across processes)
+DOWNLOAD_WORKERS = 6
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+PAGES_PER_TASK = 4
+
 TEAMS_REGEX = ["penalolen", "peñalolen", "peñalolén", "rama de natacion penalolen", "rama natacion penalolen", "crnp", "penilolen", "peñilolen", "penálolen"]
 
 def get_db_connection():
@@ -24,14 +39,7 @@ def get_db_connection():
 
 def init_db():
     conn = get_db_connection()
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS fechida_scrapes (
-            url_id TEXT PRIMARY KEY,
-            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
+    db_schema.migrate(conn)
     conn.close()
 
 def is_already_scraped(url_id):
@@ -93,89 +101,104 @@ def map_pool_size(raw_event_line):
         return '25m'
     return '50m' # CL usually means 50m (Course Long)
 
-def parse_pdf(pdf_path, meet_id):
+def extract_pdf_pages(pdf_path, start=0, stop=None):
+    """Text of pages [start, stop) ("" for pages without text). Runs in the parse pool."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+def pdf_page_count(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def _extract_pages_job(pdf_path, start, stop):
+    # Process pool entry point: the parent records the time under "parse_pdf"
+    t0 = time.perf_counter()
+    pages = extract_pdf_pages(pdf_path, start, stop)
+    return time.perf_counter() - t0, pages
+
+def parse_result_lines(pages):
+    """Club results from the text of a Resultados PDF, pages in order (events run across pages)."""
     results = []
     current_event = None
     
     # sort teams just in case
     teams = sorted(TEAMS_REGEX, key=len, reverse=True)
     
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text: continue
+    for text in pages:
+        if not text: continue
+        
+        for line in text.split('\n'):
+            if re.match(r'^(?:Event|Evento)\s+\d+', line, re.IGNORECASE):
+                current_event = line.strip()
+                continue
                 
-                for line in text.split('\n'):
-                    if re.match(r'^(?:Event|Evento)\s+\d+', line, re.IGNORECASE):
-                        current_event = line.strip()
+            if current_event:
+                found_team = None
+                for t in teams:
+                    idx = line.lower().find(t)
+                    if idx != -1:
+                        found_team = line[idx:idx+len(t)]
+                        break
+                        
+                if found_team:
+                    parts = line.split(found_team)
+                    prefix = parts[0].strip()
+                    suffix = parts[1].strip()
+                    
+                    m_prefix = re.match(r'^([\w\-]*)\s+(.+?)\s+(\d+)$', prefix)
+                    if m_prefix:
+                        rank = m_prefix.group(1)
+                        name = m_prefix.group(2) # Surname, Name
+                        age = m_prefix.group(3)
+                    else:
+                        continue # not a swimmer line
+                        
+                    s_tokens = suffix.split()
+                    if len(s_tokens) >= 2:
+                        finals_time = s_tokens[1]
+                    elif len(s_tokens) == 1:
+                        finals_time = s_tokens[0]
+                    else:
                         continue
                         
-                    if current_event:
-                        found_team = None
-                        for t in teams:
-                            idx = line.lower().find(t)
-                            if idx != -1:
-                                found_team = line[idx:idx+len(t)]
-                                break
-                                
-                        if found_team:
-                            parts = line.split(found_team)
-                            prefix = parts[0].strip()
-                            suffix = parts[1].strip()
-                            
-                            m_prefix = re.match(r'^([\w\-]*)\s+(.+?)\s+(\d+)$', prefix)
-                            if m_prefix:
-                                rank = m_prefix.group(1)
-                                name = m_prefix.group(2) # Surname, Name
-                                age = m_prefix.group(3)
-                            else:
-                                continue # not a swimmer line
-                                
-                            s_tokens = suffix.split()
-                            if len(s_tokens) >= 2:
-                                finals_time = s_tokens[1]
-                            elif len(s_tokens) == 1:
-                                finals_time = s_tokens[0]
-                            else:
-                                continue
-                                
-                            if finals_time.upper() in ['DQ', 'NS', 'NT']:
-                                finals_time = finals_time.upper()
-                            else:
-                                # standardize time format from 2:00,46 to 2:00.46
-                                finals_time = finals_time.replace(',', '.')
-                                
-                            results.append({
-                                'raw_name': name,
-                                'age': age,
-                                'raw_event': current_event,
-                                'finals_time': finals_time,
-                                'rank': rank
-                            })
+                    # 2:00,46 -> 2:00.46, dq -> DQ
+                    finals_time = time_codec.normalize_time_text(finals_time)
+                        
+                    results.append({
+                        'raw_name': name,
+                        'age': age,
+                        'raw_event': current_event,
+                        'finals_time': finals_time,
+                        'rank': rank
+                    })
+    return results
+
+def find_club_place(pages):
+    """Club ranking from the text of a Puntajes PDF (first line naming the club), or None."""
+    teams = sorted(TEAMS_REGEX, key=len, reverse=True)
+    for text in pages:
+        if not text: continue
+        for line in text.split('\n'):
+            lower_line = line.lower()
+            if any(t in lower_line for t in teams):
+                m = re.match(r'^\s*(\d+)', line)
+                if m:
+                    return m.group(1)
+    return None
+
+def parse_pdf(pdf_path, meet_id):
+    try:
+        return parse_result_lines(extract_pdf_pages(pdf_path))
     except Exception as e:
         print(f"Error parsing PDF: {e}")
-        
-    return results
+        return []
 
 def parse_puntajes_pdf(pdf_path):
-    club_place = None
-    teams = sorted(TEAMS_REGEX, key=len, reverse=True)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text: continue
-                for line in text.split('\n'):
-                    lower_line = line.lower()
-                    if any(t in lower_line for t in teams):
-                        m = re.match(r'^\s*(\d+)', line)
-                        if m:
-                            club_place = m.group(1)
-                            return club_place
+        return find_club_place(extract_pdf_pages(pdf_path))
     except Exception as e:
         print(f"Error parsing Puntajes PDF: {e}")
-    return club_place
+        return None
 
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
@@ -201,7 +224,8 @@ def sync_results_to_db(results, meet_name, meet_date, meet_location=None, meet_p
         meet_id = meet_row[0]
         # Actualizar metadatos del torneo existente si es necesario
         if meet_date and meet_date != datetime.now().strftime("%Y-%m-%d"):
-            c.execute("UPDATE meets SET date = ? WHERE id = ?", (meet_date, meet_id))
+            c.execute("UPDATE meets SET date = ?, start_date = ?, end_date = ? WHERE id = ?",
+                      (meet_date, *meet_dates.normalize_meet_date(meet_date), meet_id))
         if meet_location:
             c.execute("UPDATE meets SET location = ? WHERE id = ?", (meet_location, meet_id))
         if meet_pool:
@@ -211,12 +235,15 @@ def sync_results_to_db(results, meet_name, meet_date, meet_location=None, meet_p
     else:
         import random
         meet_id = f"F_{int(time.time())}_{random.randint(100,999)}"
-        c.execute("INSERT INTO meets (id, name, date, location, pool_size, address) VALUES (?, ?, ?, ?, ?, ?)",
-                  (meet_id, meet_name, meet_date, meet_location, meet_pool, str(club_place) if club_place else None))
+        start_date, end_date = meet_dates.normalize_meet_date(meet_date)
+        c.execute("INSERT INTO meets (id, name, date, start_date, end_date, location, pool_size, address) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                  (meet_id, meet_name, meet_date, start_date, end_date, meet_location, meet_pool, str(club_place) if club_place else None))
     
-    # Load swimmers for matching (Now including birth_date)
+    # Load swimmers for matching (Now including birth_date). The matcher only
+    # scores swimmers sharing a name token / sound and a plausible birth year.
     c.execute("SELECT id, name, birth_date FROM swimmers")
-    swimmers = c.fetchall()
+    matcher = name_matcher.NameMatcher(((sid, sname.lower(), sbirth) for sid, sname, sbirth in c.fetchall()),
+                                       min_score=0.75)
     
     inserts = 0
     for r in results:
@@ -228,31 +255,9 @@ def sync_results_to_db(results, meet_name, meet_date, meet_location=None, meet_p
         except ValueError:
             result_age_val = None
         
-        # Match swimmer
-        best_match_id = None
-        best_score = 0
-        for sid, sname, sbirth in swimmers:
-            score = similar(formatted_name.lower(), sname.lower())
-            
-            # If name is a strong match, verify age parity to avoid matching adults with kids
-            if score > 0.75:
-                age_is_plausible = True
-                if result_age_val is not None and sbirth:
-                    try:
-                        # Calculate approximate age in DB
-                        birth_year = pd.to_datetime(sbirth).year
-                        current_year = datetime.now().year
-                        db_age = current_year - birth_year
-                        
-                        # Fechida "Master" category ages can be reported weirdly, but if the difference is huge (> 3 years), reject match
-                        if abs(db_age - result_age_val) > 3:
-                            age_is_plausible = False
-                    except:
-                        pass # if date parsing fails, give benefit of doubt
-                        
-                if age_is_plausible and score > best_score:
-                    best_score = score
-                    best_match_id = sid
+        # Match swimmer; Fechida "Master" category ages can be reported weirdly,
+        # but a difference > 3 years rejects the swimmer (adults vs kids)
+        best_match_id, best_score = matcher.match(formatted_name.lower(), result_age_val)
                 
         if best_match_id and best_score > 0.75:
             db_event = map_event_name(r['raw_event'])
@@ -263,151 +268,312 @@ def sync_results_to_db(results, meet_name, meet_date, meet_location=None, meet_p
                       (best_match_id, db_event, meet_id))
             exist = c.fetchone()
             
+            time_seconds, time_status = time_codec.parse_result_time(r['finals_time'])
             if exist:
                 # OVERWRITE!
-                c.execute("UPDATE results SET time=?, pool_size=?, place=? WHERE id=?", 
-                          (r['finals_time'], db_pool, r['rank'], exist[0]))
+                c.execute("UPDATE results SET time=?, pool_size=?, place=?, time_seconds=?, time_status=? WHERE id=?", 
+                          (r['finals_time'], db_pool, r['rank'], time_seconds, time_status, exist[0]))
             else:
-                c.execute("INSERT INTO results (swimmer_id, meet_id, event_name, time, pool_size, place) VALUES (?, ?, ?, ?, ?, ?)",
-                          (best_match_id, meet_id, db_event, r['finals_time'], db_pool, r['rank']))
+                event_id = event_catalog.resolve_event_id(conn, db_event)
+                c.execute("INSERT INTO results (swimmer_id, meet_id, event_name, event_id, time, pool_size, place, time_seconds, time_status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                          (best_match_id, meet_id, db_event, event_id, r['finals_time'], db_pool, r['rank'], time_seconds, time_status))
             inserts += 1
             
     conn.commit()
     conn.close()
     return inserts
 
-def scrape_fechida(log_callback=print):
+def scrape_fechida(log_callback=print, cache=None, recheck=False):
+    """recheck=True also revisits championships already scraped: their PDFs are
+    downloaded again, and only results that changed are written."""
+    # Stage timings and rows of this run go to sync_runs (see sync_metrics.py)
+    metrics = sync_metrics.SyncRun("fechida")
+    status, error = "ok", None
+    try:
+        result = _scrape_fechida(log_callback, cache, metrics, recheck)
+    except Exception as e:
+        status, error = "error", e
+        raise
+    finally:
+        conn = get_db_connection()
+        metrics.finish(conn, status, error)
+        conn.close()
+        log_callback(metrics.summary())
+    result["run_id"] = metrics.run_id
+    return result
+
+def download_championship(cache, fetch, metrics, link, c_id):
+    """Championship page metadata plus its PDFs saved to /tmp (download pool).
+
+    Returns a dict with the meet fields, pdf_path / puntajes_path (None when
+    not published) and `logs`, replayed by the caller in completion order.
+    """
+    logs = []
+    full_url = f"https://fechida.cl/{link}"
+    chtml = cache.get(full_url, fetch)
+    csoup = metrics.timed("parse", BeautifulSoup, chtml, 'html.parser')
+    
+    pdf_url = None
+    meet_name = f"Campeonato Fechida {c_id}"
+    meet_date = datetime.now().strftime("%Y-%m-%d")
+    meet_location = None
+    meet_pool = None
+    
+    # Extraer Metadatos (Fecha, Lugar, Piscina)
+    try:
+        for tag in csoup.find_all('strong'):
+            text = tag.get_text(strip=True)
+            val = tag.next_sibling.strip() if (tag.next_sibling and hasattr(tag.next_sibling, 'strip')) else None
+            if not val:
+                parent_text = tag.parent.get_text(strip=True)
+                val = parent_text.replace(text, "").strip()
+            if not val: continue
+            
+            if "Lugar" in text:
+                meet_location = val
+            elif "Fecha" in text:
+                m = re.search(r'(\d{2})/(\d{2})/(\d{4})', val)
+                if m:
+                    meet_date = f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
+            elif "Piscina" in text:
+                meet_pool = f"{val}m" if val.isdigit() else val
+    except Exception as e:
+        logs.append(f"Error extrayendo metadatos de HTML: {e}")
+        
+    puntajes_pdf_url = None
+    for text_node in csoup.find_all(string=lambda text: text and ('puntaje' in text.lower() or 'consolidado' in text.lower())):
+        row = text_node.find_parent('tr')
+        if row:
+            a = row.find('a', href=True)
+            if a:
+                puntajes_pdf_url = a['href']
+                break
+                
+    for text_node in csoup.find_all(string=lambda text: text and 'resultados completos' in text.lower()):
+        row = text_node.find_parent('tr')
+        if row:
+            a = row.find('a', href=True)
+            if a:
+                pdf_url = a['href']
+                clean_name = text_node.strip().replace('.pdf', '')
+                if len(clean_name) > 5:
+                    meet_name = clean_name.title()
+                break
+    
+    puntajes_path = full_p_url = None
+    if puntajes_pdf_url:
+        full_p_url = f"https://fechida.cl/{puntajes_pdf_url}" if not puntajes_pdf_url.startswith("http") else puntajes_pdf_url
+        logs.append(f"  Encontrado Puntajes PDF: Descargando {full_p_url}...")
+        try:
+            puntajes_path = f"/tmp/fechida_puntaje_{c_id}.pdf"
+            with open(puntajes_path, 'wb') as pf:
+                pf.write(fetch(full_p_url, {})[2])
+        except Exception as e:
+            puntajes_path = None
+            logs.append(f"  Error procesando Puntajes PDF: {e}")
+
+    pdf_path = full_pdf_url = None
+    if pdf_url:
+        full_pdf_url = f"https://fechida.cl/{pdf_url}" if not pdf_url.startswith("http") else pdf_url
+        logs.append(f"  Encontrado PDF de Resultados: Descargando...")
+        pdf_path = f"/tmp/fechida_{c_id}.pdf"
+        with open(pdf_path, 'wb') as out_file:
+            out_file.write(fetch(full_pdf_url, {})[2])
+
+    return {
+        "c_id": c_id, "meet_name": meet_name, "meet_date": meet_date, "meet_location": meet_location,
+        "meet_pool": meet_pool, "published": bool(pdf_url or puntajes_pdf_url), "logs": logs,
+        "pdfs": {
+            kind: {"path": path, "url": url, "size": os.path.getsize(path), "sha256": pdf_parse_cache.sha256_file(path)}
+            for kind, path, url in ((pdf_parse_cache.PUNTAJES, puntajes_path, full_p_url),
+                                    (pdf_parse_cache.RESULTADOS, pdf_path, full_pdf_url))
+            if path
+        },
+    }
+
+def submit_pdf_pages(parsers, pdf_path):
+    """Queues the PDF's text extraction on the parse pool in PAGES_PER_TASK-page chunks."""
+    n = pdf_page_count(pdf_path)
+    return [parsers.submit(_extract_pages_job, pdf_path, start, min(start + PAGES_PER_TASK, n))
+            for start in range(0, n, PAGES_PER_TASK)]
+
+def collect_pdf_pages(jobs, metrics):
+    """Page texts of a submitted PDF, in page order."""
+    pages = []
+    for job in jobs:
+        seconds, chunk = job.result()
+        metrics.observe("parse_pdf", seconds)
+        pages += chunk
+    return pages
+
+PDF_PARSERS = {pdf_parse_cache.RESULTADOS: parse_result_lines, pdf_parse_cache.PUNTAJES: find_club_place}
+
+def plan_pdf(parsers, pdf_cache, pdf):
+    """Known PDFs (same sha256) skip pdfplumber; new ones go to the parse pool."""
+    entry = pdf_cache.lookup(pdf["sha256"])
+    if entry is None:
+        pdf_cache.stats["misses"] += 1
+        pdf["jobs"] = submit_pdf_pages(parsers, pdf["path"])
+    elif entry["parser_version"] == pdf_parse_cache.PARSER_VERSION:
+        pdf_cache.stats["hits"] += 1
+        pdf["records"] = entry["records"]
+    else:
+        # Parser changed since: re-parse the stored text
+        pdf_cache.stats["reparsed"] += 1
+        pdf["pages"] = entry["pages"]
+
+def finish_pdf(pdf_cache, kind, pdf, metrics):
+    """Parsed output of a planned PDF; fresh parses are stored in the cache."""
+    if "records" in pdf:
+        return pdf["records"]
+    pages = pdf["pages"] if "pages" in pdf else collect_pdf_pages(pdf["jobs"], metrics)
+    records = PDF_PARSERS[kind](pages)
+    pdf_cache.store(pdf["sha256"], kind, pdf["url"], pdf["size"], pages, records)
+    return records
+
+def meet_exists(meet_name):
+    conn = get_db_connection()
+    try:
+        return conn.execute("SELECT 1 FROM meets WHERE name = ?", (meet_name,)).fetchone() is not None
+    finally:
+        conn.close()
+
+def _scrape_fechida(log_callback, cache, metrics, recheck=False):
     init_db()
     ctx = get_ctx()
+    # Index and championship pages go through the on-disk cache: unchanged
+    # pages cost a 304 (or nothing inside the freshness window). PDFs are
+    # fetched directly with the same fetch(), so cassettes record them too.
+    cache = cache if cache is not None else http_cache.HttpCache()
+    urllib_fetch = http_cache.urllib_fetch(context=ctx)
+
+    def fetch(url, headers):
+        with metrics.stage("fetch") as obs:
+            status, resp_headers, body = urllib_fetch(url, headers)
+            obs["bytes"] = len(body)
+        return status, resp_headers, body
     
     log_callback("Iniciando acceso a Fechida: /campeonatos-natacion/")
-    html = urllib.request.urlopen("https://fechida.cl/campeonatos-natacion/", context=ctx).read()
-    soup = BeautifulSoup(html, 'html.parser')
+    html = cache.get("https://fechida.cl/campeonatos-natacion/", fetch)
+    soup = metrics.timed("parse", BeautifulSoup, html, 'html.parser')
     
     links = [a['href'] for a in soup.find_all('a', href=True) if 'campeonato-info' in a['href']]
     links = list(set(links))
     
     log_callback(f"Encontrados {len(links)} campeonatos. Verificando nuevos...")
     
+    pending = []
+    for l in links:
+        url_id_match = re.search(r'id=(\d+)', l)
+        if url_id_match and (recheck or not is_already_scraped(url_id_match.group(1))):
+            pending.append((l, url_id_match.group(1)))
+    
     total_new = 0
     added_meets = []
     
-    for l in links:
-        try:
-            url_id_match = re.search(r'id=(\d+)', l)
-            if not url_id_match: continue
-            
-            c_id = url_id_match.group(1)
-            if is_already_scraped(c_id):
-                continue
-                
-            full_url = f"https://fechida.cl/{l}"
+    # Pipeline: championship pages and PDFs download concurrently; each PDF's
+    # text extraction is split by pages over a process pool as soon as it
+    # arrives; results are then written by this thread alone, one
+    # championship at a time. Spawned workers: this may run inside the
+    # Streamlit server, where forking a threaded process is unsafe.
+    # PDFs parsed before (same sha256) skip pdfplumber, see pdf_parse_cache.py.
+    pdf_cache = pdf_parse_cache.PdfParseCache(get_db_connection())
+    parsed = []
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloads, \
+            ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")) as parsers:
+        futures = {downloads.submit(download_championship, cache, fetch, metrics, l, c_id): (l, c_id) for l, c_id in pending}
+        for future in as_completed(futures):
+            l, c_id = futures[future]
             log_callback(f"Investigando Campeonato ID {c_id}...")
-            
-            chtml = urllib.request.urlopen(full_url, context=ctx).read()
-            csoup = BeautifulSoup(chtml, 'html.parser')
-            
-            pdf_url = None
-            meet_name = f"Campeonato Fechida {c_id}"
-            meet_date = datetime.now().strftime("%Y-%m-%d")
-            meet_location = None
-            meet_pool = None
-            
-            # Extraer Metadatos (Fecha, Lugar, Piscina)
             try:
-                for tag in csoup.find_all('strong'):
-                    text = tag.get_text(strip=True)
-                    val = tag.next_sibling.strip() if (tag.next_sibling and hasattr(tag.next_sibling, 'strip')) else None
-                    if not val:
-                        parent_text = tag.parent.get_text(strip=True)
-                        val = parent_text.replace(text, "").strip()
-                    if not val: continue
-                    
-                    if "Lugar" in text:
-                        meet_location = val
-                    elif "Fecha" in text:
-                        m = re.search(r'(\d{2})/(\d{2})/(\d{4})', val)
-                        if m:
-                            meet_date = f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
-                    elif "Piscina" in text:
-                        meet_pool = f"{val}m" if val.isdigit() else val
+                champ = future.result()
+                for msg in champ["logs"]:
+                    log_callback(msg)
+                for pdf in champ["pdfs"].values():
+                    plan_pdf(parsers, pdf_cache, pdf)
+                parsed.append((l, champ))
             except Exception as e:
-                log_callback(f"Error extrayendo metadatos de HTML: {e}")
+                log_callback(f"Error procesando {l}: {e}")
+        
+        for l, champ in parsed:
+            try:
+                if not champ["published"]:
+                    # No complete results yet, don't mark as scraped so we can check later
+                    log_callback(f"Campeonato ID {champ['c_id']}: Aún no publican 'Resultados Completos'.")
+                    continue
+                meet_name = champ["meet_name"]
+                c_id = champ["c_id"]
+                pdfs = champ["pdfs"]
+                # Versions already written for this championship: an identical
+                # PDF is skipped and a changed one only writes its differences
+                # (unless the meet was deleted since, then everything is written)
+                known_meet = meet_exists(meet_name)
+                applied = []
                 
-            puntajes_pdf_url = None
-            for text_node in csoup.find_all(string=lambda text: text and ('puntaje' in text.lower() or 'consolidado' in text.lower())):
-                row = text_node.find_parent('tr')
-                if row:
-                    a = row.find('a', href=True)
-                    if a:
-                        puntajes_pdf_url = a['href']
-                        break
-                        
-            for text_node in csoup.find_all(string=lambda text: text and 'resultados completos' in text.lower()):
-                row = text_node.find_parent('tr')
-                if row:
-                    a = row.find('a', href=True)
-                    if a:
-                        pdf_url = a['href']
-                        clean_name = text_node.strip().replace('.pdf', '')
-                        if len(clean_name) > 5:
-                            meet_name = clean_name.title()
-                        break
-                        
-            if pdf_url or puntajes_pdf_url:
                 club_place = None
-                if puntajes_pdf_url:
-                    full_p_url = f"https://fechida.cl/{puntajes_pdf_url}" if not puntajes_pdf_url.startswith("http") else puntajes_pdf_url
-                    log_callback(f"  Encontrado Puntajes PDF: Descargando {full_p_url}...")
+                puntajes = pdfs.get(pdf_parse_cache.PUNTAJES)
+                if puntajes:
                     try:
-                        req_p = urllib.request.Request(full_p_url, headers={'User-Agent': 'Mozilla/5.0'})
-                        p_pdf_path = f"/tmp/fechida_puntaje_{c_id}.pdf"
-                        with urllib.request.urlopen(req_p, context=ctx) as p_resp, open(p_pdf_path, 'wb') as pf:
-                            pf.write(p_resp.read())
-                        club_place = parse_puntajes_pdf(p_pdf_path)
+                        club_place = finish_pdf(pdf_cache, pdf_parse_cache.PUNTAJES, puntajes, metrics)
+                        applied.append((pdf_parse_cache.PUNTAJES, puntajes["sha256"]))
                         if club_place:
                             log_callback(f"  Lugar del Club encontrado: {club_place}")
+                        last = pdf_cache.last_applied(c_id, pdf_parse_cache.PUNTAJES)
+                        if known_meet and last and last[0] == puntajes["sha256"]:
+                            club_place = None
                     except Exception as e:
                         log_callback(f"  Error procesando Puntajes PDF: {e}")
-
+                
                 results = []
-                if pdf_url:
-                    full_pdf_url = f"https://fechida.cl/{pdf_url}" if not pdf_url.startswith("http") else pdf_url
-                    log_callback(f"  Encontrado PDF de Resultados: Descargando...")
-                    req = urllib.request.Request(full_pdf_url, headers={'User-Agent': 'Mozilla/5.0'})
-                    pdf_path = f"/tmp/fechida_{c_id}.pdf"
-                    
-                    with urllib.request.urlopen(req, context=ctx) as response, open(pdf_path, 'wb') as out_file:
-                        out_file.write(response.read())
-                        
+                resultados = pdfs.get(pdf_parse_cache.RESULTADOS)
+                if resultados:
                     log_callback(f"  Parseando PDF para {meet_name}...")
-                    results = parse_pdf(pdf_path, meet_name)
+                    try:
+                        results = finish_pdf(pdf_cache, pdf_parse_cache.RESULTADOS, resultados, metrics)
+                        applied.append((pdf_parse_cache.RESULTADOS, resultados["sha256"]))
+                        last = pdf_cache.last_applied(c_id, pdf_parse_cache.RESULTADOS)
+                        if known_meet and last and last[0] == resultados["sha256"]:
+                            log_callback(f"  PDF de Resultados sin cambios ({resultados['sha256'][:12]}), se omite.")
+                            results = []
+                        elif known_meet and last:
+                            added, changed, removed = pdf_parse_cache.diff_results(last[1], results)
+                            log_callback(f"  PDF de Resultados modificado: {len(added)} resultados nuevos, "
+                                         f"{len(changed)} modificados, {len(removed)} ya no aparecen (se conservan).")
+                            results = added + changed
+                    except Exception as e:
+                        log_callback(f"  Error parsing PDF: {e}")
                 
                 if results or club_place:
                     log_callback(f"  Encontrados {len(results)} resultados de Peñalolén. Guardando en DB...")
-                    inserted = sync_results_to_db(results, meet_name, meet_date, meet_location, meet_pool, club_place)
+                    inserted = metrics.timed("db_write", sync_results_to_db, results, meet_name, champ["meet_date"],
+                                             champ["meet_location"], champ["meet_pool"], club_place)
+                    metrics.add_rows("results", inserted)
                     log_callback(f"  -> {inserted} registros actualizados/insertados.")
                     if inserted > 0 or club_place:
                         added_meets.append(meet_name)
                     total_new += inserted
                 else:
-                    log_callback("  No se encontraron resultados de Peñalolén en este torneo.")
+                    log_callback(f"  Sin resultados nuevos de Peñalolén en {meet_name}.")
+                
+                for kind, sha256 in applied:
+                    pdf_cache.mark_applied(c_id, kind, sha256)
                     
                 # Mark scraped regardless if penalized or not
                 mark_as_scraped(c_id)
-            else:
-                # No complete results yet, don't mark as scraped so we can check later
-                log_callback("  Aún no publican 'Resultados Completos'.")
-                
-        except Exception as e:
-            log_callback(f"Error procesando {l}: {e}")
+                    
+            except Exception as e:
+                log_callback(f"Error procesando {l}: {e}")
             
     log_callback(f"Proceso finalizado. {total_new} nuevos resultados integrados.")
+    log_callback(cache.summary())
+    log_callback(pdf_cache.summary())
+    pdf_cache.conn.close()
+    cache.close()
     
     # Get the last registered meet
     conn = get_db_connection()
     c = conn.cursor()
-    c.execute("SELECT name FROM meets ORDER BY date DESC LIMIT 1")
+    c.execute("SELECT name FROM meets ORDER BY start_date DESC LIMIT 1")
     row = c.fetchone()
     last_meet = row[0] if row else "Ninguna"
     conn.close()
@@ -419,4 +585,5 @@ def scrape_fechida(log_callback=print):
     }
 
 if __name__ == "__main__":
-    scrape_fechida()
+    # --recheck: also look for re-published PDFs of championships already scraped
+    scrape_fechida(recheck="--recheck" in sys.argv)
@@ -10,6 +10,9 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from normalize_events import normalize_event_name_v2
+import db_schema
+import event_catalog
+import time_codec
 
 DB_PATH = "data/natacion.db"
 
@@ -18,35 +21,9 @@ def get_connection():
 
 def init_db():
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS minimum_standards (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_name TEXT,
-            time_text TEXT,
-            time_seconds REAL,
-            category_code TEXT,
-            gender TEXT,
-            pool_size TEXT,
-            source_url TEXT,
-            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(event_name, category_code, gender, pool_size)
-        )
-    """)
-    conn.commit()
+    db_schema.migrate(conn)
     conn.close()
 
-def parse_time_str(t_str):
-    try:
-        if not t_str or not t_str[0].isdigit(): return None
-        # Format M:S.ms or S.ms
-        parts = t_str.split(':')
-        if len(parts) == 2:
-            return float(parts[0])*60 + float(parts[1])
-        return float(t_str)
-    except:
-        return None
-
 def setup_driver():
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
@@ -106,7 +83,7 @@ def scrape_page_url(driver, url, pool_label):
                             records.append({
                                 'event_name': event,
                                 'time_text': time_val,
-                                'time_seconds': parse_time_str(time_val),
+                                'time_seconds': time_codec.parse_time(time_val),
                                 'category_code': current_cat,
                                 'gender': current_gender,
                                 'pool_size': pool_label,
@@ -119,6 +96,8 @@ def save_to_db(records):
     conn = get_connection()
     cursor = conn.cursor()
     count = 0
+    # Map new names (e.g. "4x100 IM") to their event before the insert trigger sets event_id
+    event_catalog.register_aliases(conn, [r['event_name'] for r in records])
     for r in records:
         try:
             cursor.execute("""
@@ -11,6 +11,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+import db_schema
+import event_catalog
 
 # DB Setup
 DB_PATH = 'data/natacion.db'
@@ -211,20 +213,10 @@ def save_to_db(records):
     c = conn.cursor()
     # Clear old records? Or upsert?
     # Let's Clear for now to avoid dupes (it's a full scrape)
-    # Create table if not exists
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS national_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_name TEXT,
-            pool_size TEXT,
-            gender TEXT,
-            category_code TEXT,
-            time TEXT,
-            swimmer_name TEXT,
-            date TEXT
-        )
-    """)
+    db_schema.migrate(conn)
     c.execute("DELETE FROM national_records")
+    # Map new names (e.g. "4x100 IM") to their event before the insert trigger sets event_id
+    event_catalog.register_aliases(conn, [r[0] for r in records])
     
     c.executemany("""
         INSERT INTO national_records (event_name, pool_size, gender, category_code, time, swimmer_name, date)
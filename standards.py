@@ -0,0 +1,83 @@
+import pandas as pd
+import categories
+import time_codec
+
+# In-memory index over minimum_standards and national_records.
+# Both tables are small (a few hundred rows), but the app looked them up per
+# chart/row by filtering DataFrames and re-parsing category codes ("11-12 años",
+# "ABSOLUTO") and record times. StandardsIndex parses everything once and
+# expands each category's age range into per-age keys, so a lookup is a dict get:
+#
+#   idx = StandardsIndex.load(conn)
+#   idx.lookup(event_id, "50m", "F", 13) -> (minima_seconds, record_seconds)
+
+MAX_AGE = 99
+
+
+class StandardsIndex:
+    def __init__(self, minimas_df, records_df):
+        self.minimas = minimas_df
+        self.records = records_df
+        # (event_id, pool_size, gender, age) -> (seconds, text)
+        self._minima = self._expand(minimas_df, 'time_seconds', 'time_text')
+        records = records_df.copy()
+        records['time_seconds'] = time_codec.parse_time_series(records['time']) if not records.empty else []
+        self._record = self._expand(records, 'time_seconds', 'time')
+
+    @classmethod
+    def load(cls, conn):
+        minimas = pd.read_sql("SELECT * FROM minimum_standards", conn)
+        records = pd.read_sql("SELECT * FROM national_records", conn)
+        return cls(minimas, records)
+
+    @staticmethod
+    def _expand(df, seconds_col, text_col):
+        index = {}
+        if df.empty:
+            return index
+        df = df.dropna(subset=[seconds_col, 'event_id']).copy()
+        bounds = categories.category_bounds(df['category_code'])
+        df['low'] = bounds['low'].clip(lower=0)
+        df['high'] = bounds['high'].clip(upper=MAX_AGE)
+        df = df.dropna(subset=['low', 'high'])
+        # Wider ranges first so a specific category ("13-14 años") overrides
+        # an open one ("ABSOLUTO") for the ages both cover.
+        df = df.assign(width=df['high'] - df['low']).sort_values('width', ascending=False, kind='stable')
+        for event_id, pool, gender, low, high, seconds, text in df[
+                ['event_id', 'pool_size', 'gender', 'low', 'high', seconds_col, text_col]].itertuples(index=False):
+            for age in range(int(low), int(high) + 1):
+                index[(int(event_id), pool, gender, age)] = (float(seconds), text)
+        return index
+
+    def minima(self, event_id, pool_size, gender, age):
+        """(seconds, text) of the minima covering `age`, or None."""
+        return self._get(self._minima, event_id, pool_size, gender, age)
+
+    def record(self, event_id, pool_size, gender, age):
+        """(seconds, text) of the national record for `age`'s category, or None."""
+        return self._get(self._record, event_id, pool_size, gender, age)
+
+    def lookup(self, event_id, pool_size, gender, age):
+        """(minima_seconds, record_seconds); None where there is no standard."""
+        m = self.minima(event_id, pool_size, gender, age)
+        r = self.record(event_id, pool_size, gender, age)
+        return (m[0] if m else None, r[0] if r else None)
+
+    def best_minima(self, event_ids, gender, age, pools=("25m", "50m")):
+        """Fastest minima across several event ids/pools: (seconds, text) or None."""
+        return self._best(self._minima, event_ids, gender, age, pools)
+
+    def best_record(self, event_ids, gender, age, pools=("25m", "50m")):
+        """Fastest record across several event ids/pools: (seconds, text) or None."""
+        return self._best(self._record, event_ids, gender, age, pools)
+
+    @staticmethod
+    def _get(index, event_id, pool_size, gender, age):
+        if event_id is None or age is None or pd.isna(event_id) or pd.isna(age):
+            return None
+        return index.get((int(event_id), pool_size, gender, int(age)))
+
+    def _best(self, index, event_ids, gender, age, pools):
+        hits = [self._get(index, e, p, gender, age) for e in event_ids for p in pools]
+        hits = [h for h in hits if h]
+        return min(hits, key=lambda h: h[0]) if hits else None
@@ -1,12 +1,21 @@
 import sqlite3
+import sys
+import hashlib
+from datetime import datetime
 import pandas as pd
 import shutil
 import os
 import unicodedata
-from fuzzywuzzy import process, fuzz
+from fuzzywuzzy import fuzz
 import re
 import csv
 from normalize_events import normalize_event_name_v2
+import db_schema
+import time_codec
+import meet_dates
+import event_catalog
+import sync_metrics
+import name_matcher
 
 # --- CONFIG ---
 LIVE_DB_PATH = '/Users/jrb/Library/Containers/7F2BC93B-8FAC-48B0-BF83-D128B1ADF11C/Data/Documents/MeetMobile.db'
@@ -169,192 +178,379 @@ def get_mm_connection():
     return sqlite3.connect(MM_DB_PATH)
 
 def get_local_connection():
-    return sqlite3.connect(LOCAL_DB_PATH)
+    return db_schema.connect(LOCAL_DB_PATH)
 
 def fetch_local_swimmers(conn):
     """Returns dict {Name: ID}"""
     df = pd.read_sql("SELECT id, name FROM swimmers", conn)
     return dict(zip(df['name'], df['id']))
 
-def sync_data():
-    mm_conn = get_mm_connection()
+# Team(s) whose swimmers are synced
+TEAM_FILTER = "name LIKE '%Penalolen%' OR name LIKE '%CRNP%' OR name LIKE '%Rama%'"
+# Meet Mobile placeholders that are never created as swimmers
+BLACKLIST = ('[Relay] [Swimmer]', 'Unknown Swimmer 4')
+
+# Staging tables of one sync (TEMP: private to the connection, gone when it closes)
+_STAGING = [
+    """CREATE TEMP TABLE mm_meets (
+        seq INTEGER PRIMARY KEY, mm_id INTEGER UNIQUE, id TEXT, name TEXT, date TEXT, end_date TEXT,
+        location TEXT, address TEXT, pool_size TEXT, after_entry INTEGER NOT NULL DEFAULT 0)""",
+    "CREATE TEMP TABLE mm_swimmer_map (mm_swimmer_id INTEGER PRIMARY KEY, swimmer_id TEXT NOT NULL)",
+    """CREATE TEMP TABLE mm_rows (
+        seq INTEGER PRIMARY KEY, heat_entry_id INTEGER, swimmer_id TEXT, meet_id TEXT, event_name TEXT,
+        time TEXT, points, place, pool_size TEXT, result_id INTEGER)""",
+    "CREATE INDEX temp.idx_mm_rows_result ON mm_rows(result_id)",
+    "CREATE TEMP TABLE mm_event_ids (event_name TEXT PRIMARY KEY, event_id INTEGER)",
+    "CREATE TEMP TABLE mm_splits (heat_entry_id INTEGER, sequence INTEGER, distance, time, cumulative_time)",
+    "CREATE TEMP TABLE mm_split_src (result_id INTEGER PRIMARY KEY, heat_entry_id INTEGER)",
+]
+
+# Meet Mobile result -> (local result) match, as the old per-row duplicate check
+_SAME_RESULT = """x.swimmer_id = r.swimmer_id AND x.meet_id = r.meet_id
+                  AND x.event_name = r.event_name AND x.time = r.time"""
+
+
+# Team heat entries of the dump (with their splits), grouped by meet for mm_sync_state
+_MEET_SUMMARY = f"""
+    SELECT s.meetId, MAX(he.id), COUNT(DISTINCT he.id), mm_checksum({{entry}}),
+           COUNT(DISTINCT CASE WHEN he.id <= st.max_heat_entry_id THEN he.id END),
+           mm_checksum(CASE WHEN he.id <= st.max_heat_entry_id THEN he.id END, {{columns}})
+    FROM mm.Swimmer s
+    JOIN mm.SwimmerHeatEntry she ON she.swimmerId = s.id
+    JOIN mm.HeatEntry he ON she.heatEntryId = he.id
+    JOIN mm.Heat h ON he.heatId = h.id
+    JOIN mm.Round r ON h.roundId = r.id
+    JOIN mm.Event e ON r.eventId = e.id
+    LEFT JOIN mm.SplitTime sp ON sp.heatEntryId = he.id
+    LEFT JOIN mm_sync_state st ON st.mm_meet_id = s.meetId
+    WHERE s.teamId IN (SELECT id FROM mm.Team WHERE {TEAM_FILTER})
+    GROUP BY s.meetId
+"""
+_SUMMARY_COLUMNS = ("s.id, s.firstName, s.lastName, e.name, he.timeInSecs, he.pointsEarned, he.overallPlace, "
+                    "sp.sequence, sp.distance, sp.time, sp.cumulativeTime")
+
+
+class RowChecksum:
+    """Order-independent checksum of the rows aggregated (sum of 64-bit row
+    digests); rows whose first value is NULL are left out."""
+
+    def __init__(self):
+        self.total = 0
+
+    def step(self, *values):
+        if values[0] is not None:
+            digest = hashlib.blake2b(repr(values).encode("utf-8"), digest_size=8).digest()
+            self.total = (self.total + int.from_bytes(digest, "big")) % (1 << 64)
+
+    def finalize(self):
+        return f"{self.total:016x}"
+
+
+def whitelist_digest(whitelist_tokens):
+    names = sorted(" ".join(sorted(tokens)) for tokens in whitelist_tokens)
+    return hashlib.blake2b("\n".join(names).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def mm_time(value):
+    """Time text as stored on results/splits; None for empty values (not synced)."""
+    return time_codec.normalize_time_text(value) if value else None
+
+
+def register_functions(conn):
+    # Python normalizers used inside the INSERT ... SELECT statements
+    conn.create_function("mm_time", 1, mm_time, deterministic=True)
+    conn.create_function("mm_event_name", 1, normalize_event_name_v2, deterministic=True)
+    conn.create_function("mm_time_seconds", 1, lambda t: time_codec.parse_result_time(t)[0], deterministic=True)
+    conn.create_function("mm_time_status", 1, lambda t: time_codec.parse_result_time(t)[1], deterministic=True)
+    conn.create_aggregate("mm_checksum", -1, RowChecksum)
+
+
+def meet_row(meet):
+    mm_id, name, start_utc, city, country, facility = meet
+    meet_date, meet_end = meet_dates.normalize_meet_date(int(start_utc))
+    parts = []
+    if facility: parts.append(str(facility).title())
+    if city: parts.append(str(city).title())
+    if country: parts.append(str(country).upper())
+    return (mm_id, f"MM_{mm_id}", name, meet_date, meet_end, f"{city}, {country}", ", ".join(parts))
+
+
+def meet_changes(conn, whitelist, full=False):
+    """{mm meet id: heat entries to skip (0: all, None: whole meet unchanged)}
+    from the dump compared with mm_sync_state, plus the new state rows.
+
+    A meet is unchanged when its entry count and checksum match the stored
+    ones (and the whitelist is the same); when only entries above the stored
+    max HeatEntry.id are new, just those are synced.
+    """
+    stored = {row[0]: row[1:] for row in conn.execute(
+        "SELECT mm_meet_id, max_heat_entry_id, entry_count, checksum, whitelist FROM mm_sync_state")}
+    now = datetime.now().isoformat(timespec="seconds")
+    changes, state = {}, []
+    sql = _MEET_SUMMARY.format(entry=f"he.id, {_SUMMARY_COLUMNS}", columns=_SUMMARY_COLUMNS)
+    for mm_id, max_entry, count, checksum, old_count, old_checksum in conn.execute(sql):
+        state.append((mm_id, max_entry, count, checksum, whitelist, now))
+        prev = None if full else stored.get(mm_id)
+        if prev is None or prev[3] != whitelist:
+            changes[mm_id] = 0
+        elif (count, checksum) == (prev[1], prev[2]):
+            changes[mm_id] = None
+        elif (old_count, old_checksum) == (prev[1], prev[2]):
+            changes[mm_id] = prev[0]
+        else:
+            changes[mm_id] = 0
+    return changes, state
+
+
+def stage_meets(conn, changes):
+    """Team meets of the dump with new or changed entries into temp.mm_meets;
+    creates the missing ones. Returns (meets found, meets staged, created)."""
+    meets = conn.execute(f"""
+        SELECT DISTINCT m.id, m.name, m.startDateUtc, m.city, m.country, m.facilityName
+        FROM mm.Meet m
+        JOIN mm.Swimmer s ON s.meetId = m.id
+        WHERE s.teamId IN (SELECT id FROM mm.Team WHERE {TEAM_FILTER})
+          AND m.startDateUtc >= ?
+        ORDER BY m.startDateUtc, m.id
+    """, (JAN_1_2000_TIMESTAMP,)).fetchall()
+    # Meets without heat entries have no summary: nothing to sync
+    staged = [meet_row(m) + (changes[m[0]],) for m in meets if changes.get(m[0]) is not None]
+    conn.executemany("""
+        INSERT INTO temp.mm_meets (mm_id, id, name, date, end_date, location, address, after_entry)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, staged)
+    # Existing meets: refresh the address, keep a pool size set by hand
+    conn.execute("""
+        UPDATE meets SET address = (SELECT t.address FROM temp.mm_meets t WHERE t.id = meets.id)
+        WHERE id IN (SELECT id FROM temp.mm_meets)
+    """)
+    conn.execute("""
+        UPDATE meets SET pool_size = '25m'
+        WHERE id IN (SELECT id FROM temp.mm_meets) AND (pool_size IS NULL OR pool_size = '')
+    """)
+    created = conn.execute("""
+        INSERT INTO meets (id, name, date, start_date, end_date, location, url, pool_size, address)
+        SELECT id, name, date, date, end_date, location, 'MeetMobile', '25m', address
+        FROM temp.mm_meets t WHERE NOT EXISTS (SELECT 1 FROM meets WHERE meets.id = t.id)
+        ORDER BY seq
+    """).rowcount
+    conn.execute("UPDATE temp.mm_meets SET pool_size = (SELECT pool_size FROM meets WHERE meets.id = mm_meets.id)")
+    return len(meets), len(staged), created
+
+
+def build_swimmer_map(conn, whitelist_tokens):
+    """Fills temp.mm_swimmer_map (Meet Mobile swimmer -> swimmers.id) for the
+    whitelisted team swimmers with results, creating those not found locally.
+    Names are matched once per Meet Mobile swimmer instead of once per result.
+    Returns the number of swimmers created."""
+    local_swimmers = fetch_local_swimmers(conn)
+    # Fuzzy fallback: names sharing a token / sound with the row are scored
+    # first, the whole roster only when none of them reaches 90
+    matcher = name_matcher.NameMatcher(((sid, name, None) for name, sid in local_swimmers.items()),
+                                       scorer=fuzz.token_set_ratio, min_score=90)
+    rows = conn.execute(f"""
+        SELECT s.id, s.meetId, s.firstName || ' ' || s.lastName
+        FROM temp.mm_meets t
+        JOIN mm.Swimmer s ON s.meetId = t.mm_id
+        WHERE s.teamId IN (SELECT id FROM mm.Team WHERE {TEAM_FILTER})
+          AND EXISTS (SELECT 1 FROM mm.SwimmerHeatEntry she
+                      JOIN mm.HeatEntry he ON she.heatEntryId = he.id
+                      JOIN mm.Heat h ON he.heatId = h.id
+                      JOIN mm.Round r ON h.roundId = r.id
+                      JOIN mm.Event e ON r.eventId = e.id
+                      WHERE she.swimmerId = s.id AND he.id > t.after_entry)
+        ORDER BY t.seq, s.id
+    """).fetchall()
+
+    mapping, created, current_meet = [], [], None
+    for mm_swimmer_id, mm_meet_id, full_name in rows:
+        if mm_meet_id != current_meet:
+            matcher.clear_memo()
+            current_meet = mm_meet_id
+        if full_name is None:
+            continue
+        s_name = normalize_name(full_name)
+
+        # --- WHITELIST CHECK ---
+        if not is_whitelisted(s_name, whitelist_tokens):
+            continue
+        swimmer_id = local_swimmers.get(s_name)
+        if not swimmer_id:
+            # Fuzzy Match Fallback (Still useful for small variations even with whitelist)
+            best_id, score = matcher.match(s_name)
+            if score >= 90:
+                swimmer_id = best_id
+
+        if not swimmer_id:
+            if s_name in BLACKLIST:
+                continue
+            # CREATE NEW SWIMMER (kept if the id already exists)
+            swimmer_id = f"MM_{mm_swimmer_id}"
+            created.append((swimmer_id, s_name, "MeetMobile", "MM_TEAM", None, None))
+            local_swimmers[s_name] = swimmer_id
+            matcher.add(swimmer_id, s_name)
+        mapping.append((mm_swimmer_id, swimmer_id))
+
+    inserted = conn.executemany("""
+        INSERT OR IGNORE INTO swimmers (id, name, url, team_id, birth_date, gender) VALUES (?, ?, ?, ?, ?, ?)
+    """, created).rowcount
+    conn.executemany("INSERT INTO temp.mm_swimmer_map (mm_swimmer_id, swimmer_id) VALUES (?, ?)", mapping)
+    return inserted
+
+
+def stage_results(conn):
+    """Heat entries of the mapped swimmers into temp.mm_rows, normalized as stored on results."""
+    return conn.execute("""
+        INSERT INTO temp.mm_rows (heat_entry_id, swimmer_id, meet_id, event_name, time, points, place, pool_size)
+        SELECT he.id, map.swimmer_id, t.id, mm_event_name(e.name), mm_time(he.timeInSecs),
+               he.pointsEarned, he.overallPlace, t.pool_size
+        FROM temp.mm_meets t
+        JOIN mm.Swimmer s ON s.meetId = t.mm_id
+        JOIN temp.mm_swimmer_map map ON map.mm_swimmer_id = s.id
+        JOIN mm.SwimmerHeatEntry she ON she.swimmerId = s.id
+        JOIN mm.HeatEntry he ON she.heatEntryId = he.id
+        JOIN mm.Heat h ON he.heatId = h.id
+        JOIN mm.Round r ON h.roundId = r.id
+        JOIN mm.Event e ON r.eventId = e.id
+        WHERE he.id > t.after_entry AND mm_time(he.timeInSecs) IS NOT NULL
+        ORDER BY t.seq, s.id, she.rowid
+    """).rowcount
+
+
+def insert_results(conn):
+    """New results (no local row with the same swimmer/meet/event/time); returns how many.
+    Every staged row then gets the id of its local result."""
+    # Event ids are resolved once per distinct name (registers new aliases)
+    names = [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT event_name FROM temp.mm_rows r
+        WHERE NOT EXISTS (SELECT 1 FROM results x WHERE {_SAME_RESULT})
+    """)]
+    conn.executemany("INSERT INTO temp.mm_event_ids (event_name, event_id) VALUES (?, ?)",
+                     [(name, event_catalog.resolve_event_id(conn, name)) for name in names])
+    # A result listed twice is inserted once, from its first heat entry
+    inserted = conn.execute(f"""
+        INSERT INTO results (swimmer_id, meet_id, event_name, event_id, time, points, place, pool_size, time_url,
+                             time_seconds, time_status, mm_heat_entry_id)
+        SELECT r.swimmer_id, r.meet_id, r.event_name, ev.event_id, r.time, r.points, r.place, r.pool_size,
+               'MeetMobile', mm_time_seconds(r.time), mm_time_status(r.time), r.heat_entry_id
+        FROM temp.mm_rows r
+        JOIN temp.mm_event_ids ev ON ev.event_name = r.event_name
+        WHERE r.seq IN (SELECT MIN(seq) FROM temp.mm_rows GROUP BY swimmer_id, meet_id, event_name, time)
+          AND NOT EXISTS (SELECT 1 FROM results x WHERE {_SAME_RESULT})
+        ORDER BY r.seq
+    """).rowcount
+    conn.execute(f"UPDATE temp.mm_rows SET result_id = (SELECT MIN(x.id) FROM results x, temp.mm_rows r "
+                 f"WHERE r.seq = mm_rows.seq AND {_SAME_RESULT})")
+    # Results synced before mm_heat_entry_id existed get their source heat entry
+    conn.execute("""
+        UPDATE results SET mm_heat_entry_id =
+            (SELECT r.heat_entry_id FROM temp.mm_rows r WHERE r.result_id = results.id ORDER BY r.seq LIMIT 1)
+        WHERE mm_heat_entry_id IS NULL AND id IN (SELECT result_id FROM temp.mm_rows)
+    """)
+    return inserted
+
+
+def replace_splits(conn):
+    """Splits of every staged result that has them in the dump, replacing the
+    local ones; a result listed twice takes its last heat entry's. Returns rows written."""
+    conn.execute("""
+        INSERT INTO temp.mm_splits (heat_entry_id, sequence, distance, time, cumulative_time)
+        SELECT heatEntryId, sequence, distance, time, cumulativeTime FROM mm.SplitTime
+        WHERE heatEntryId IN (SELECT heat_entry_id FROM temp.mm_rows)
+    """)
+    conn.execute("CREATE INDEX temp.idx_mm_splits_entry ON mm_splits(heat_entry_id, sequence)")
+    conn.execute("""
+        INSERT OR REPLACE INTO temp.mm_split_src (result_id, heat_entry_id)
+        SELECT result_id, heat_entry_id FROM temp.mm_rows
+        WHERE heat_entry_id IN (SELECT heat_entry_id FROM temp.mm_splits)
+        ORDER BY seq
+    """)
+    conn.execute("DELETE FROM splits WHERE result_id IN (SELECT result_id FROM temp.mm_split_src)")
+    return conn.execute("""
+        INSERT INTO splits (result_id, distance, split_time, cumulative_time)
+        SELECT src.result_id, st.distance, mm_time(st.time), mm_time(st.cumulative_time)
+        FROM temp.mm_split_src src
+        JOIN temp.mm_splits st ON st.heat_entry_id = src.heat_entry_id
+        ORDER BY src.result_id, st.sequence
+    """).rowcount
+
+
+def sync_data(full=False):
+    """Syncs the meets with new or changed heat entries since the last run
+    (mm_sync_state); full=True re-checks every meet."""
+    # Stage timings go to sync_runs (see sync_metrics.py), one stage per phase
+    # of the set-based sync in _sync_data.
+    metrics = sync_metrics.SyncRun("meet_mobile")
     local_conn = get_local_connection()
-    local_cursor = local_conn.cursor()
-    
+    status, error = "ok", None
+    try:
+        status = _sync_data(local_conn, metrics, full)
+    except Exception as e:
+        local_conn.rollback()
+        status, error = "error", e
+        raise
+    finally:
+        if any(db[1] == "mm" for db in local_conn.execute("PRAGMA database_list")):
+            local_conn.execute("DETACH DATABASE mm")
+        metrics.finish(local_conn, status, error)
+        print(metrics.summary())
+        local_conn.close()
+
+def _sync_data(local_conn, metrics, full=False):
+    """The Meet Mobile dump is ATTACHed to natacion.db and meets, results and
+    splits move with a few INSERT ... SELECT statements, all in one transaction.
+    Only the name matching runs in Python, once per Meet Mobile swimmer, into a
+    mapping table the statements join."""
     # 0. Load Whitelist
     whitelist_tokens = load_whitelist()
     if not whitelist_tokens:
         print("ABORTING: No whitelist loaded from CSV.")
-        return
+        return "aborted"
 
-    # 1. Get Target Meets (ALL HISTORY + Team Filter)
-    # Re-using logic from extract_full_report but focused on Meets
+    with metrics.stage("attach"):
+        refresh_mm_db()
+        local_conn.execute("ATTACH DATABASE ? AS mm", (MM_DB_PATH,))
+        register_functions(local_conn)
+        for statement in _STAGING:
+            local_conn.execute(statement)
+
+    # 1. Target Meets (ALL HISTORY + Team Filter), skipping the ones unchanged since the last sync
     print("Finding Meets (History)...")
-    # Find team IDs first
-    teams = pd.read_sql("SELECT id FROM Team WHERE name LIKE '%Penalolen%' OR name LIKE '%CRNP%' OR name LIKE '%Rama%'", mm_conn)
-    team_ids = tuple(teams['id'].tolist())
-    if len(team_ids) == 1: team_ids = f"({team_ids[0]})"
-    
-    meet_query = f"""
-    SELECT DISTINCT m.id, m.name, m.startDateUtc, m.city, m.country, m.facilityName
-    FROM Meet m
-    JOIN Swimmer s ON s.meetId = m.id
-    WHERE s.teamId IN {team_ids}
-      AND m.startDateUtc >= {JAN_1_2000_TIMESTAMP}
-    """
-    meets_df = pd.read_sql(meet_query, mm_conn)
-    print(f"Found {len(meets_df)} meets to sync.")
-    
-    # 2. Load Local Swimmers
-    local_swimmers = fetch_local_swimmers(local_conn)
-    local_swimmer_names = list(local_swimmers.keys())
-    
-    # 3. Iterate Meets
-    for _, meet in meets_df.iterrows():
-        mm_meet_id = meet['id']
-        meet_name = meet['name']
-        meet_date = pd.to_datetime(meet['startDateUtc'], unit='s').strftime('%Y-%m-%d')
-        meet_loc = f"{meet['city']}, {meet['country']}"
-        
-        # Build Address
-        parts = []
-        if meet.get('facilityName'): parts.append(str(meet['facilityName']).title())
-        if meet.get('city'): parts.append(str(meet['city']).title())
-        if meet.get('country'): parts.append(str(meet['country']).upper())
-        address_str = ", ".join(parts)
-        
-        # Check if Meet Exists
-        new_meet_id = f"MM_{mm_meet_id}"
-        
-        # Check existence
-        res = local_cursor.execute("SELECT id, pool_size FROM meets WHERE id = ?", (new_meet_id,)).fetchone()
-        
-        target_pool = "25m" # Default
-        
-        if not res:
-            local_cursor.execute(
-                "INSERT INTO meets (id, name, date, location, url, pool_size, address) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (new_meet_id, meet_name, meet_date, meet_loc, "MeetMobile", target_pool, address_str)
-            )
-        else:
-            # Upsert Address (if was missing)
-            local_cursor.execute("UPDATE meets SET address = ? WHERE id = ?", (address_str, new_meet_id))
-            
-            # Use existing pool size from DB (which allows manual override persistence)
-            if res[1]:
-                target_pool = res[1]
-            else:
-                local_cursor.execute("UPDATE meets SET pool_size = '25m' WHERE id = ?", (new_meet_id,))
-            pass
-            
-        # 4. Get Results for this Meet + Team
-        r_query = f"""
-        SELECT 
-            s.id as MMSwimmerId,
-            s.firstName || ' ' || s.lastName as SwimmerName,
-            he.id as HeatEntryId,
-            e.name as EventName,
-            he.timeInSecs as Time,
-            he.pointsEarned as Points,
-            he.overallPlace as Place
-        FROM Swimmer s
-        JOIN SwimmerHeatEntry she ON s.id = she.swimmerId
-        JOIN HeatEntry he ON she.heatEntryId = he.id
-        JOIN Heat h ON he.heatId = h.id
-        JOIN Round r ON h.roundId = r.id
-        JOIN Event e ON r.eventId = e.id
-        WHERE s.meetId = {mm_meet_id}
-          AND s.teamId IN {team_ids}
-        """
-        results_df = pd.read_sql(r_query, mm_conn)
-        
-        for _, row in results_df.iterrows():
-            s_name = normalize_name(row['SwimmerName'])
-            
-            # --- WHITELIST CHECK ---
-            if not is_whitelisted(s_name, whitelist_tokens):
-                # print(f"  [SKIP] {s_name} not in whitelist.")
-                continue
-            
-            swimmer_id = local_swimmers.get(s_name)
-            
-            if not swimmer_id:
-                # Fuzzy Match Fallback (Still useful for small variations even with whitelist)
-                best_match, score = process.extractOne(s_name, local_swimmer_names, scorer=fuzz.token_set_ratio)
-                if score >= 90:
-                    swimmer_id = local_swimmers[best_match]
-            
-            if not swimmer_id:
-                # 2. BLACKLIST CHECK (Redundant with whitelist but safe)
-                if s_name in ['[Relay] [Swimmer]', 'Unknown Swimmer 4']:
-                    continue
+    with metrics.stage("changes"):
+        changes, state = meet_changes(local_conn, whitelist_digest(whitelist_tokens), full)
+    with metrics.stage("meets"):
+        found, staged_meets, created = stage_meets(local_conn, changes)
+    metrics.add_rows("meets", created)
+    appended = sum(1 for after in changes.values() if after)
+    print(f"Found {found} meets: {staged_meets} new or changed ({appended} with new heat entries only).")
+    if not staged_meets:
+        local_conn.rollback()
+        print("Sync Complete! Nothing changed since the last sync.")
+        return "ok"
 
-                # CREATE NEW SWIMMER
-                new_sw_id = f"MM_{row['MMSwimmerId']}"
-                
-                # Double check existence by ID
-                chk = local_cursor.execute("SELECT id FROM swimmers WHERE id = ?", (new_sw_id,)).fetchone()
-                if not chk:
-                    # print(f"  [NEW] Creating Swimmer: {s_name} (ID: {new_sw_id})")
-                    local_cursor.execute(
-                        "INSERT INTO swimmers (id, name, url, team_id, birth_date, gender) VALUES (?, ?, ?, ?, ?, ?)",
-                        (new_sw_id, s_name, "MeetMobile", "MM_TEAM", None, None)
-                    )
-                    local_conn.commit()
-                
-                swimmer_id = new_sw_id
-                # Update cache
-                local_swimmers[s_name] = swimmer_id
-                local_swimmer_names.append(s_name)
-            
-            # Check if result exists (avoid dupes based on TIME as well)
-            # Use NORMALIZED event name
-            norm_event = normalize_event_name_v2(row['EventName'])
-            
-            raw_time = row['Time']
-            if not raw_time: continue
-            raw_time = raw_time.replace(',', '.')
-            
-            check_sql = "SELECT id FROM results WHERE swimmer_id = ? AND meet_id = ? AND event_name = ? AND time = ?"
-            existing = local_cursor.execute(check_sql, (swimmer_id, new_meet_id, norm_event, raw_time)).fetchone()
-            
-            if existing:
-                result_id = existing[0]
-            else:
-                local_cursor.execute("""
-                    INSERT INTO results (swimmer_id, meet_id, event_name, time, points, place, pool_size, time_url)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (swimmer_id, new_meet_id, norm_event, raw_time, row['Points'], row['Place'], target_pool, "MeetMobile"))
-                result_id = local_cursor.lastrowid
-            
-            # 5. Sync Splits
-            # Get Splits for this HeatEntryId
-            s_query = f"""
-            SELECT sequence, distance, time, cumulativeTime, stroke
-            FROM SplitTime
-            WHERE heatEntryId = {row['HeatEntryId']}
-            ORDER BY sequence ASC
-            """
-            splits_df = pd.read_sql(s_query, mm_conn)
-            
-            if splits_df.empty: continue
-            
-            # Clear old splits for this result?
-            local_cursor.execute("DELETE FROM splits WHERE result_id = ?", (result_id,))
-            
-            for _, split in splits_df.iterrows():
-                s_time = split['time'].replace(',', '.') if split['time'] else None
-                s_cum = split['cumulativeTime'].replace(',', '.') if split['cumulativeTime'] else None
-                
-                local_cursor.execute("""
-                    INSERT INTO splits (result_id, distance, split_time, cumulative_time)
-                    VALUES (?, ?, ?, ?)
-                """, (result_id, split['distance'], s_time, s_cum))
-                
-    local_conn.commit()
-    local_conn.close()
-    mm_conn.close()
-    print("Sync Complete!")
+    # 2. Meet Mobile swimmer -> local swimmer
+    with metrics.stage("match"):
+        metrics.add_rows("swimmers", build_swimmer_map(local_conn, whitelist_tokens))
+
+    # 3. Results (skipping the ones already synced)
+    with metrics.stage("results"):
+        staged = stage_results(local_conn)
+        metrics.add_rows("results", insert_results(local_conn))
+
+    # 4. Splits
+    with metrics.stage("splits"):
+        metrics.add_rows("splits", replace_splits(local_conn))
+
+    with metrics.stage("commit"):
+        local_conn.executemany("""
+            INSERT OR REPLACE INTO mm_sync_state
+                (mm_meet_id, max_heat_entry_id, entry_count, checksum, whitelist, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, state)
+        local_conn.commit()
+    print(f"Sync Complete! {staged} Meet Mobile results, {metrics.rows.get('results', 0)} new.")
+    return "ok"
 
 if __name__ == "__main__":
-    sync_data()
+    # --full: re-check every meet, ignoring mm_sync_state
+    sync_data(full="--full" in sys.argv)
@@ -0,0 +1,183 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import db_schema
+
+# Per-run instrumentation for the sync jobs (Swimcloud crawlers,
+# scraper_fechida_pdf, sync_meet_mobile).
+#
+# A SyncRun times named stages into latency histograms:
+#   fetch      one HTTP request (Meet Mobile: one query against the dump)
+#   parse      one page (parse_pdf: one PDF; Meet Mobile: matching one row)
+#   db_write   one write transaction / batch
+# and counts response bytes and rows written per table. finish() stores the run
+# in sync_runs (migration 9); the admin "Ingreso" section shows the report.
+#
+#   python sync_metrics.py [runs] [--db data/natacion.db]
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _new_stage():
+    return {"count": 0, "total_s": 0.0, "max_ms": 0.0, "bytes": 0, "errors": 0,
+            "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _bucket(ms):
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS)
+
+
+def bucket_labels():
+    labels, low = [], 0
+    for bound in BUCKETS_MS:
+        labels.append(f"{low}-{bound} ms")
+        low = bound
+    return labels + [f">{low} ms"]
+
+
+def quantile_ms(stage, q):
+    """Upper bound of the histogram bucket holding quantile `q` (None if empty)."""
+    target = q * stage["count"]
+    seen = 0
+    for i, n in enumerate(stage["buckets"]):
+        seen += n
+        if n and seen >= target:
+            # The open-ended bucket is capped by the largest observation
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else stage["max_ms"]
+    return None
+
+
+class SyncRun:
+    """Collects one sync's stage timings; thread-safe (the async crawler parses and writes off-loop)."""
+
+    def __init__(self, source):
+        self.source = source
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.rows = {}
+        self.lock = threading.Lock()
+        self.run_id = None
+
+    def observe(self, stage, seconds, nbytes=0, error=False):
+        ms = seconds * 1000
+        with self.lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = _new_stage()
+            s["count"] += 1
+            s["total_s"] += seconds
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["bytes"] += nbytes
+            s["errors"] += bool(error)
+            s["buckets"][_bucket(ms)] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Times the block as one `name` observation; set obs["bytes"] inside it to count bytes."""
+        obs = {"bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield obs
+        except BaseException:
+            self.observe(name, time.perf_counter() - start, obs["bytes"], error=True)
+            raise
+        self.observe(name, time.perf_counter() - start, obs["bytes"])
+
+    def timed(self, name, fn, *args):
+        with self.stage(name):
+            return fn(*args)
+
+    def add_rows(self, table, n):
+        if n:
+            with self.lock:
+                self.rows[table] = self.rows.get(table, 0) + n
+
+    def totals(self):
+        fetch = self.stages.get("fetch", {})
+        return {
+            "requests": fetch.get("count", 0),
+            "bytes": fetch.get("bytes", 0),
+            "errors": sum(s["errors"] for s in self.stages.values()),
+            "rows_written": sum(self.rows.values()),
+        }
+
+    def summary(self):
+        t = self.totals()
+        parts = [f"{name} {s['count']}x {s['total_s']:.2f}s" for name, s in self.stages.items()]
+        return (f"Sync run ({self.source}): {t['requests']} requests, {t['bytes'] / 1e6:.1f} MB, "
+                f"{t['rows_written']} rows, {time.perf_counter() - self.started:.1f}s"
+                + (f" [{', '.join(parts)}]" if parts else ""))
+
+    def finish(self, conn, status="ok", error=None):
+        """Stores the run in sync_runs; returns its id."""
+        t = self.totals()
+        with self.lock:
+            stages, rows = json.dumps(self.stages), json.dumps(self.rows)
+        with conn:
+            cur = conn.execute('''
+                INSERT INTO sync_runs (source, started_at, finished_at, duration_s, status, error,
+                                       requests, bytes, errors, rows_written, stages, rows_by_table)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self.source, self.started_at, datetime.now().isoformat(timespec="seconds"),
+                  time.perf_counter() - self.started, status, str(error)[:1000] if error else None,
+                  t["requests"], t["bytes"], t["errors"], t["rows_written"], stages, rows))
+        self.run_id = cur.lastrowid
+        return self.run_id
+
+
+def recent_runs(conn, limit=20):
+    """Latest runs as dicts, stages/rows_by_table decoded."""
+    cur = conn.execute('''
+        SELECT id, source, started_at, finished_at, duration_s, status, error, requests, bytes, errors,
+               rows_written, stages, rows_by_table
+        FROM sync_runs ORDER BY id DESC LIMIT ?
+    ''', (limit,))
+    cols = [c[0] for c in cur.description]
+    runs = []
+    for row in cur.fetchall():
+        run = dict(zip(cols, row))
+        run["stages"] = json.loads(run["stages"] or "{}")
+        run["rows_by_table"] = json.loads(run["rows_by_table"] or "{}")
+        runs.append(run)
+    return runs
+
+
+def stage_breakdown(run):
+    """[(stage, count, total_s, share of run, mean_ms, p50_ms, p95_ms, max_ms, bytes, errors)], slowest first."""
+    duration = run["duration_s"] or 0
+    out = []
+    for name, s in sorted(run["stages"].items(), key=lambda kv: -kv[1]["total_s"]):
+        mean = s["total_s"] * 1000 / s["count"] if s["count"] else 0
+        share = s["total_s"] / duration if duration else 0
+        out.append((name, s["count"], s["total_s"], share, mean, quantile_ms(s, 0.5), quantile_ms(s, 0.95),
+                    s["max_ms"], s["bytes"], s["errors"]))
+    return out
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    db_path = db_schema.DB_PATH
+    if "--db" in args:
+        i = args.index("--db")
+        db_path = args[i + 1]
+        del args[i:i + 2]
+    conn = db_schema.connect(db_path)
+    runs = recent_runs(conn, int(args[0]) if args else 10)
+    for run in runs:
+        print(f"#{run['id']:<5} {run['started_at']}  {run['source']:<18} {run['status']:<12} "
+              f"{run['duration_s'] or 0:8.1f}s {run['requests']:>6} req {run['bytes'] / 1e6:7.1f} MB "
+              f"{run['rows_written']:>7} rows")
+    if runs:
+        print(f"\nRun #{runs[0]['id']} by stage:")
+        for name, n, total, share, mean, p50, p95, mx, nbytes, errors in stage_breakdown(runs[0]):
+            print(f"  {name:<10} {n:>7}x {total:8.2f}s {share:6.1%}  mean {mean:8.1f} ms  p50 <={p50} ms  "
+                  f"p95 <={p95} ms  max {mx:.0f} ms  {errors} errors")
+    conn.close()
@@ -0,0 +1,114 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Shared swim-time parsing used by every ingester and the app.
+# Times arrive as "32.09", "1:16.29", "1:02:03.4", Fechida's "2:00,46" or a
+# status code (DQ, NS, ...). They are parsed once at ingest into
+# results.time_seconds / results.time_status.
+#
+# The *_series variants do the same on a whole pandas column, decoding each
+# distinct value once (see bench_time_codec.py); use them for backfills and
+# for anything the app renders per row.
+
+STATUS_OK = "OK"
+STATUS_INVALID = "INVALID"
+# Codes that appear instead of a time (Hy-Tek, Meet Mobile, Swimcloud).
+STATUS_CODES = {"DQ", "NS", "NT", "DNF", "SCR", "DFS"}
+
+_CODE_RE = re.compile(r'^\s*(' + '|'.join(sorted(STATUS_CODES)) + r')\b', re.IGNORECASE)
+
+
+def normalize_time_text(time_str):
+    """'2:00,46' -> '2:00.46'. Status codes are upper-cased; None stays None."""
+    if time_str is None:
+        return None
+    text = str(time_str).strip()
+    if text.upper() in STATUS_CODES:
+        return text.upper()
+    return text.replace(',', '.')
+
+
+def parse_time(time_str):
+    """'1:16.29' -> 76.29. Returns None for status codes and unparseable text."""
+    try:
+        if time_str is None:
+            return None
+        time_str = str(time_str).strip().replace(',', '.')
+        if not time_str or not time_str[0].isdigit():
+            return None
+        if ':' in time_str:
+            parts = time_str.split(':')
+            if len(parts) == 2:
+                return float(parts[0]) * 60 + float(parts[1])
+            elif len(parts) == 3:
+                return float(parts[0]) * 3600 + float(parts[1]) * 60 + float(parts[2])
+            return None
+        return float(time_str)
+    except (TypeError, ValueError):
+        return None
+
+
+def time_status(time_str, seconds=None):
+    """Classifies a time string: 'OK', a status code ('DQ', 'NS', ...) or 'INVALID'."""
+    if seconds is None:
+        seconds = parse_time(time_str)
+    if seconds is not None:
+        return STATUS_OK
+    if time_str is not None:
+        m = _CODE_RE.match(str(time_str))
+        if m:
+            return m.group(1).upper()
+    return STATUS_INVALID
+
+
+def parse_result_time(time_str):
+    """Returns (time_seconds, time_status) as stored on `results`."""
+    seconds = parse_time(time_str)
+    return seconds, time_status(time_str, seconds)
+
+
+
+def format_seconds(total_seconds):
+    """76.29 -> '1:16.29'."""
+    try:
+        minutes = int(total_seconds // 60)
+        seconds = total_seconds % 60
+        return f"{minutes}:{seconds:05.2f}"
+    except (TypeError, ValueError, OverflowError):
+        return f"{total_seconds:.2f}"
+
+
+def _map_unique(values, fn, dtype):
+    # Swim times repeat heavily (hundredths over a narrow range), so hashing
+    # the column and running the scalar codec once per distinct value beats a
+    # per-row .apply() and keeps the results identical to the scalar path.
+    values = pd.Series(values, copy=False)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = np.array([fn(u) for u in uniques] + [None], dtype=dtype)
+    return pd.Series(mapped[codes], index=values.index)
+
+
+def _none_to_nan(seconds):
+    return np.nan if seconds is None else seconds
+
+
+def parse_time_series(times):
+    """Vectorized parse_time: Series of time strings -> float64 Series (NaN = no time)."""
+    return _map_unique(times, lambda t: _none_to_nan(parse_time(t)), "float64")
+
+
+def time_status_series(times):
+    """Vectorized time_status -> object Series of 'OK' / status code / 'INVALID'."""
+    return _map_unique(times, time_status, object).fillna(STATUS_INVALID)
+
+
+def parse_result_time_series(times):
+    """Vectorized parse_result_time -> (time_seconds Series, time_status Series)."""
+    return parse_time_series(times), time_status_series(times)
+
+
+def format_seconds_series(seconds):
+    """Vectorized format_seconds: float Series -> 'M:SS.hh' strings (None for NaN)."""
+    values = pd.to_numeric(pd.Series(seconds, copy=False), errors="coerce")
+    return _map_unique(values, format_seconds, object)